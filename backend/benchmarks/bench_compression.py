@@ -0,0 +1,110 @@
+"""
+Mide el costo de CPU de comprimir los listados frente a los bytes que se ahorran,
+para cada codificación disponible y con los niveles que usa core/compression.py
+(dinámico: por request; cacheado: una vez por versión de la caché).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_compression --rows 100 1000 10000 --repeat 20 --mbps 10
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from core.compression import ENCODINGS
+from core.serialization import dumps
+from benchmarks.bench_serialization import make_contacts
+
+
+def make_logos(rows: int) -> List[dict]:
+    base = datetime(2025, 1, 1)
+    logos = []
+    for i in range(rows):
+        logo_id = str(uuid.uuid4())
+        sha = uuid.uuid4().hex
+        logos.append({
+            "id": logo_id,
+            "nombre": f"Logo {i}",
+            "content_type": "image/png",
+            "size": 20000 + i,
+            "processing_status": "ready",
+            "created_at": base + timedelta(minutes=i),
+            "imagen_url": f"/api/logos/{logo_id}/image?variant=slider&v={sha[:16]}",
+            "imagen_original_url": f"/api/logos/{logo_id}/image?v={sha[16:]}",
+            "variantes": {
+                name: f"/api/logos/{logo_id}/image?variant={name}&v={sha[:16]}"
+                for name in ("slider", "slider_avif", "thumb")
+            },
+        })
+    return logos
+
+
+def measure(function: Callable[[], bytes], repeat: int) -> float:
+    """Tiempo medio en ms (mejor de 3 tandas, para descartar ruido)"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--mbps", type=float, default=10.0,
+                        help="Ancho de banda del cliente para estimar el tiempo de transferencia ahorrado")
+    parser.add_argument("--json", dest="json_output", help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    cases = [
+        ("GET /api/logos", make_logos),
+        ("GET /api/contactos", make_contacts),
+    ]
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+
+    results = []
+    print(f"codificaciones disponibles: {', '.join(ENCODINGS)}")
+    print(f"{'endpoint':<20}{'filas':>7}{'cod.':>6}{'nivel':>7}{'bytes':>11}{'comprimido':>12}"
+          f"{'ratio':>7}{'CPU ms':>9}{'ms ahorrados':>14}")
+    for name, factory in cases:
+        for rows in args.rows:
+            body = dumps({"success": True, "items": factory(rows), "total": rows})
+            for encoding in ENCODINGS.values():
+                for mode, level in (("dinámico", encoding.dynamic_level), ("cacheado", encoding.cached_level)):
+                    compressed = encoding.compress(body, level)
+                    cpu_ms = measure(lambda: encoding.compress(body, level), args.repeat)
+                    saved_bytes = len(body) - len(compressed)
+                    # Tiempo de transferencia que se ahorra el cliente con ese ancho de banda
+                    transfer_saved_ms = saved_bytes / bytes_per_ms
+                    results.append({
+                        "endpoint": name,
+                        "rows": rows,
+                        "encoding": encoding.name,
+                        "mode": mode,
+                        "level": level,
+                        "bytes": len(body),
+                        "compressed_bytes": len(compressed),
+                        "ratio": round(len(compressed) / len(body), 4),
+                        "cpu_ms": round(cpu_ms, 3),
+                        "saved_bytes": saved_bytes,
+                        "transfer_saved_ms": round(transfer_saved_ms, 3),
+                        "saved_kb_per_cpu_ms": round(saved_bytes / 1024 / cpu_ms, 1) if cpu_ms else None,
+                    })
+                    print(f"{name:<20}{rows:>7}{encoding.name:>6}{level:>7}{len(body):>11}{len(compressed):>12}"
+                          f"{len(compressed) / len(body):>7.1%}{cpu_ms:>9.2f}{transfer_saved_ms:>14.1f}")
+
+    print("\nEl nivel cacheado se paga una vez por versión (GET /api/logos); "
+          "el dinámico, en cada request (GET /api/contactos).")
+
+    if args.json_output:
+        with open(args.json_output, "w") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compara el costo de CPU por request entre la serialización anterior de los listados
+(conversión en Python + jsonable_encoder + json) y la capa de core/serialization.py.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization --rows 1000 10000 --repeat 20
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from core.serialization import dumps
+from models.status import StatusCheck
+
+
+def make_contacts(rows: int) -> List[dict]:
+    base = datetime(2025, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "nombre": f"Contacto {i}",
+            "email": f"contacto{i}@ejemplo.com",
+            "telefono": "+54 264 123-4567",
+            "empresa": "Municipalidad de San Juan",
+            "tipo_empresa": "Gestor Ambiental",
+            "mensaje": "Quiero más información sobre el software de gestión de residuos",
+            "created_at": base + timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+def make_status_checks(rows: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"cliente-{i % 10}", "timestamp": (now - timedelta(seconds=i)).isoformat()}
+        for i in range(rows)
+    ]
+
+
+def render_json(content) -> bytes:
+    # Lo que hace JSONResponse.render de Starlette
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def contacts_before(documents: List[dict]) -> bytes:
+    contactos = [dict(document) for document in documents]
+    for contacto in contactos:
+        contacto["_id"] = str(contacto["_id"])
+        contacto["created_at"] = contacto["created_at"].isoformat()
+    payload = {"success": True, "contactos": contactos, "total": len(contactos)}
+    return render_json(jsonable_encoder(payload))
+
+
+def contacts_after(documents: List[dict]) -> bytes:
+    return dumps({"success": True, "contactos": documents, "total": len(documents)})
+
+
+STATUS_LIST = TypeAdapter(List[StatusCheck])
+
+
+def status_before(documents: List[dict]) -> bytes:
+    models = [StatusCheck(**document) for document in documents]
+    # FastAPI valida el resultado contra response_model y luego lo codifica
+    validated = STATUS_LIST.validate_python([model.model_dump() for model in models])
+    return render_json(jsonable_encoder(validated))
+
+
+def status_after(documents: List[dict]) -> bytes:
+    return dumps(documents)
+
+
+def measure(function, documents, repeat: int) -> float:
+    """Milisegundos de CPU por request (mediana de `repeat` corridas)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        function(documents)
+        samples.append((time.process_time() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", dest="json_output", help="Guardar los resultados en este archivo JSON")
+    args = parser.parse_args()
+
+    cases = [
+        ("GET /api/contactos", make_contacts, contacts_before, contacts_after),
+        ("GET /api/status", make_status_checks, status_before, status_after),
+    ]
+
+    results = []
+    print(f"{'endpoint':<22}{'filas':>8}{'antes ms':>12}{'después ms':>12}{'ahorro':>10}")
+    for name, factory, before, after in cases:
+        for rows in args.rows:
+            documents = factory(rows)
+            before_ms = measure(before, documents, args.repeat)
+            after_ms = measure(after, documents, args.repeat)
+            saved = 1 - after_ms / before_ms if before_ms else 0
+            results.append({
+                "endpoint": name,
+                "rows": rows,
+                "before_ms": round(before_ms, 3),
+                "after_ms": round(after_ms, 3),
+                "saved_ratio": round(saved, 3),
+            })
+            print(f"{name:<22}{rows:>8}{before_ms:>12.2f}{after_ms:>12.2f}{saved:>10.0%}")
+
+    if args.json_output:
+        with open(args.json_output, "w") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
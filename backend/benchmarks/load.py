@@ -0,0 +1,308 @@
+"""
+Benchmark de carga y latencia de la API.
+
+Levanta la app en el mismo proceso (httpx + ASGI), bajo uvicorn (--uvicorn) o usa
+un servidor ya corriendo (--base-url). Siembra un dataset en una base temporal,
+ejecuta cada escenario con la concurrencia indicada y reporta RPS y p50/p95/p99.
+
+Uso (desde backend/; --in-memory necesita pip install -r benchmarks/requirements.txt):
+    python -m benchmarks.load --mongo-url mongodb://localhost:27017 --json resultados.json
+    python -m benchmarks.load --in-memory --contacts 5000 --concurrency 20
+    python -m benchmarks.load --uvicorn --json nuevo.json --compare resultados.json
+    python -m benchmarks.load --uvicorn --serve-profile production --compare resultados.json
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CONTACT_BODY = {
+    "nombre": "Contacto Benchmark",
+    "telefono": "+54 264 123-4567",
+    "empresa": "Municipalidad de San Juan",
+    "tipoEmpresa": "Gestor Ambiental",
+    "mensaje": "Quiero más información sobre el software",
+}
+
+
+def contact_request(i: int):
+    body = {**CONTACT_BODY, "email": f"bench{i}-{uuid.uuid4().hex[:8]}@ejemplo.com"}
+    return "POST", "/api/contacto", {"json": body}
+
+
+# Escenario -> función que arma el request número i
+SCENARIOS = {
+    "get_root": lambda i: ("GET", "/api/", {}),
+    "post_contacto": contact_request,
+    "get_contactos": lambda i: ("GET", "/api/contactos", {"params": {"limit": 50}}),
+    "get_logos": lambda i: ("GET", "/api/logos", {}),
+    "get_status": lambda i: ("GET", "/api/status", {}),
+    "post_status": lambda i: ("POST", "/api/status", {"json": {"client_name": f"bench-{i % 10}"}}),
+}
+
+
+async def seed(db, contacts: int, logos: int, status_checks: int) -> None:
+    """Carga el dataset directamente en MongoDB, en lotes"""
+    base = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(contacts):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "nombre": f"Contacto {i}",
+            "email": f"contacto{i}@ejemplo.com",
+            "telefono": "+54 264 123-4567",
+            "empresa": f"Empresa {i % 500}",
+            "tipo_empresa": "Gestor Ambiental",
+            "mensaje": "Quiero más información sobre el software",
+            "created_at": base + timedelta(seconds=i * 30),
+        })
+        if len(batch) == 5000:
+            await db.contactos.insert_many(batch)
+            batch = []
+    if batch:
+        await db.contactos.insert_many(batch)
+
+    if logos:
+        await db.logos.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "nombre": f"Logo {i}",
+                "content_type": "image/png",
+                "size": 1024,
+                "sha256": uuid.uuid4().hex * 2,
+                "processing_status": "ready",
+                "variants": {},
+                "created_at": base + timedelta(days=i),
+            }
+            for i in range(logos)
+        ])
+
+    if status_checks:
+        await db.status_checks.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "client_name": f"cliente-{i % 10}",
+                "timestamp": base + timedelta(seconds=i),
+            }
+            for i in range(status_checks)
+        ])
+
+
+def percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return samples[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, requests: int, concurrency: int) -> dict:
+    build = SCENARIOS[name]
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, kwargs = build(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def compare(current: dict, baseline_path: str, threshold: float) -> bool:
+    """Imprime la diferencia contra un resultado anterior. Devuelve False si hay regresiones"""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    ok = True
+    print(f"\nComparación contra {baseline_path} ({baseline['meta'].get('commit')})")
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if not previous:
+            continue
+        rps_change = result["rps"] / previous["rps"] - 1 if previous["rps"] else 0
+        p95_change = result["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0
+        regression = rps_change < -threshold or p95_change > threshold
+        ok = ok and not regression
+        flag = "REGRESIÓN" if regression else "ok"
+        print(f"  {name:<16} rps {rps_change:+.1%}  p95 {p95_change:+.1%}  {flag}")
+    return ok
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/api/")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {base_url}")
+
+
+async def main_async(args) -> dict:
+    db_name = args.db_name or f"bench_{int(time.time())}"
+    os.environ["DB_NAME"] = db_name
+    # Todo el tráfico sale de una sola IP: sin esto POST /api/contacto mediría solo 429
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    server_process = None
+
+    if args.in_memory:
+        from mongomock_motor import AsyncMongoMockClient
+        os.environ["LOGO_STORAGE"] = "memory"
+        mongo_client = AsyncMongoMockClient()
+
+        import server
+        server.create_mongo_client = lambda **options: mongo_client
+    else:
+        from core.database import create_mongo_client
+        mongo_client = create_mongo_client()
+
+    db = mongo_client[db_name]
+    print(f"Sembrando dataset en {db_name}: {args.contacts} contactos, {args.logos} logos, {args.status} status")
+    await seed(db, args.contacts, args.logos, args.status)
+
+    try:
+        if args.base_url or args.uvicorn:
+            base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+            if args.uvicorn:
+                if args.serve_profile:
+                    command = [sys.executable, "manage.py", "serve", "--profile", args.serve_profile,
+                               "--host", "127.0.0.1", "--port", str(args.port)]
+                else:
+                    command = [sys.executable, "-m", "uvicorn", "server:app", "--port", str(args.port)]
+                command += args.uvicorn_args.split() if args.uvicorn_args else []
+                server_process = subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+                await wait_until_ready(base_url)
+            client_context = httpx.AsyncClient(base_url=base_url, timeout=30)
+            results = await run_all(client_context, args)
+        else:
+            import server
+            app = server.app
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                client_context = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30)
+                results = await run_all(client_context, args)
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait()
+        if not args.keep_db and not args.in_memory:
+            await mongo_client.drop_database(db_name)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "mode": "uvicorn" if args.uvicorn else ("http" if args.base_url else "asgi"),
+            "serve_profile": args.serve_profile,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "dataset": {"contacts": args.contacts, "logos": args.logos, "status": args.status},
+        },
+        "results": results,
+    }
+
+
+async def run_all(client: httpx.AsyncClient, args) -> dict:
+    results = {}
+    async with client:
+        for name in args.scenarios:
+            # Calentamiento: primeras conexiones, cachés y carga de módulos
+            await run_scenario(client, name, min(args.warmup, args.requests), args.concurrency)
+            results[name] = await run_scenario(client, name, args.requests, args.concurrency)
+            result = results[name]
+            print(
+                f"{name:<16} {result['rps']:>9.1f} rps  p50 {result['p50_ms']:>8.2f} ms  "
+                f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  errores {result['errors']}"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL"))
+    parser.add_argument("--db-name", help="Base a usar (por defecto una temporal bench_<timestamp>)")
+    parser.add_argument("--keep-db", action="store_true", help="No borrar la base al terminar")
+    parser.add_argument("--in-memory", action="store_true", help="Usar mongomock-motor en lugar de mongod")
+    parser.add_argument("--base-url", help="Apuntar a un servidor ya levantado")
+    parser.add_argument("--uvicorn", action="store_true", help="Levantar la app con uvicorn en un subproceso")
+    parser.add_argument("--uvicorn-args", default="", help="Argumentos extra para uvicorn")
+    parser.add_argument("--serve-profile", help="Con --uvicorn, levantar con `manage.py serve --profile`")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="Requests por escenario")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--logos", type=int, default=30)
+    parser.add_argument("--status", type=int, default=10000)
+    parser.add_argument("--json", dest="json_output", help="Guardar los resultados en este archivo JSON")
+    parser.add_argument("--compare", help="Resultado JSON anterior contra el cual comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tolerancia de regresión (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.in_memory and (args.uvicorn or args.base_url):
+        parser.error("--in-memory solo funciona con la app en el mismo proceso")
+    if args.in_memory and importlib.util.find_spec("mongomock_motor") is None:
+        parser.error("--in-memory requiere mongomock-motor: pip install -r benchmarks/requirements.txt")
+    if not args.in_memory and not args.mongo_url:
+        parser.error("Falta --mongo-url (o MONGO_URL en el entorno)")
+
+    report = asyncio.run(main_async(args))
+
+    if args.json_output:
+        with open(args.json_output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare and not compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from core.compression import (
+    COMPRESSION_MIN_BYTES,
+    compress,
+    compression_enabled,
+    negotiate_encoding,
+    weak_etag
+)
+
+
+@dataclass
+class CachedResponse:
+    """
+    Cuerpo ya serializado de una respuesta, con su ETag fuerte y las versiones
+    comprimidas que se fueron pidiendo (una por Content-Encoding)
+    """
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+
+def compute_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Compara el header If-None-Match (lista de ETags o '*') con el ETag actual"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """
+    Caché en memoria de respuestas pre-serializadas, con límite de bytes y desalojo LRU.
+    Cada espacio de nombres (p. ej. "logos") tiene una versión que se incrementa
+    con cada escritura: las entradas de versiones anteriores dejan de usarse.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, int, str], CachedResponse]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def add_invalidation_listener(self, listener: Callable[[str], None]) -> None:
+        """Registra una función que se llama con el espacio de nombres en cada invalidación local"""
+        self._listeners.append(listener)
+
+    def invalidate(self, namespace: str, notify: bool = True) -> None:
+        """
+        Descarta las entradas del espacio de nombres. Con notify=False no se avisa a
+        los listeners (se usa cuando la invalidación ya viene de otro worker).
+        """
+        with self._lock:
+            self._versions[namespace] = self.version(namespace) + 1
+            for key in [key for key in self._entries if key[0] == namespace]:
+                self._size -= self._entries.pop(key).size
+
+        if notify:
+            for listener in self._listeners:
+                listener(namespace)
+
+    def get(self, namespace: str, key: str) -> Optional[CachedResponse]:
+        cache_key = (namespace, self.version(namespace), key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+            return entry
+
+    def put(self, namespace: str, key: str, body: bytes, version: int,
+            media_type: str = "application/json") -> CachedResponse:
+        """
+        Guarda el cuerpo calculado con los datos de `version`. Si hubo una escritura
+        mientras se consultaba la base, la entrada se devuelve pero no se guarda.
+        """
+        entry = CachedResponse(body=body, etag=compute_etag(body), media_type=media_type)
+        if version != self.version(namespace) or len(body) > self.max_bytes:
+            return entry
+
+        cache_key = (namespace, version, key)
+        with self._lock:
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[cache_key] = entry
+            self._size += len(body)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+        return entry
+
+    async def encoded_body(self, entry: CachedResponse, encoding: str) -> bytes:
+        """
+        Cuerpo comprimido con `encoding`. Se comprime (al nivel más alto, en un thread
+        para no frenar el event loop) la primera vez que se pide y se reutiliza
+        mientras la entrada siga en la caché.
+        """
+        data = entry.encoded.get(encoding)
+        if data is not None:
+            return data
+
+        data = await run_in_threadpool(compress, entry.body, encoding, True)
+        with self._lock:
+            if encoding not in entry.encoded:
+                entry.encoded[encoding] = data
+                if any(cached is entry for cached in self._entries.values()):
+                    self._size += len(data)
+                    while self._size > self.max_bytes and len(self._entries) > 1:
+                        _, evicted = self._entries.popitem(last=False)
+                        self._size -= evicted.size
+        return data
+
+
+async def cached_response(request: Request, cache: ResponseCache, entry: CachedResponse,
+                    headers: Dict[str, str]) -> Response:
+    """
+    Respuesta para una entrada de la caché: 304 si el cliente ya tiene el ETag; si no,
+    el cuerpo en la codificación que acepte, precomprimido una sola vez por versión
+    """
+    headers = {**headers, "ETag": entry.etag, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = None
+    if compression_enabled() and len(entry.body) >= COMPRESSION_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is None:
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    headers["Content-Encoding"] = encoding
+    headers["ETag"] = weak_etag(entry.etag)
+    return Response(content=await cache.encoded_body(entry, encoding), media_type=entry.media_type, headers=headers)
+
+
+def create_response_cache() -> ResponseCache:
+    return ResponseCache(max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 8 * 1024 * 1024)))
+
+
+def get_response_cache(request: Request) -> ResponseCache:
+    """Dependencia de FastAPI: caché de respuestas creada en el lifespan"""
+    return request.app.state.response_cache
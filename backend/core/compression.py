@@ -0,0 +1,191 @@
+import gzip
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli y zstandard son opcionales: si no están instalados solo se ofrece gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+
+# Tipos que vale la pena comprimir; las imágenes (salvo SVG) ya vienen comprimidas
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+@dataclass(frozen=True)
+class Encoding:
+    """
+    Codificación de Content-Encoding. Las respuestas dinámicas usan un nivel bajo
+    (se comprimen en cada request); las cacheadas, uno alto (se comprimen una vez).
+    """
+    name: str
+    compress: Callable[[bytes, int], bytes]
+    dynamic_level: int
+    cached_level: int
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    # mtime=0: mismo cuerpo, mismos bytes comprimidos
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _available_encodings() -> Dict[str, Encoding]:
+    # Orden de preferencia del servidor cuando el cliente acepta varias con el mismo q:
+    # zstd y brotli comprimen más que gzip, y zstd lo hace con menos CPU
+    encodings = []
+    if zstandard is not None:
+        encodings.append(Encoding("zstd", _zstd, dynamic_level=3, cached_level=19))
+    if brotli is not None:
+        encodings.append(Encoding("br", _brotli, dynamic_level=4, cached_level=11))
+    encodings.append(Encoding("gzip", _gzip, dynamic_level=6, cached_level=9))
+    return {encoding.name: encoding for encoding in encodings}
+
+
+ENCODINGS = _available_encodings()
+
+
+def compression_enabled() -> bool:
+    return os.environ.get("COMPRESSION_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    return content_type.split(";")[0].strip().lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige la codificación según Accept-Encoding: la de mayor q entre las disponibles,
+    y a igual q la preferida por el servidor. Devuelve None si ninguna es aceptable.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name] = q
+
+    wildcard = qualities.get("*", 0.0)
+    best = None
+    best_q = 0.0
+    for name in ENCODINGS:
+        q = qualities.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(data: bytes, encoding: str, cached: bool = False) -> bytes:
+    codec = ENCODINGS[encoding]
+    return codec.compress(data, codec.cached_level if cached else codec.dynamic_level)
+
+
+def weak_etag(etag: str) -> str:
+    # El ETag fuerte identifica los bytes sin comprimir; la versión comprimida es otra
+    # representación del mismo contenido
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def varies_by_encoding(headers) -> bool:
+    """Si Vary ya incluye Accept-Encoding (p. ej. lo puso cached_response)"""
+    tokens = {token.strip().lower() for token in headers.get("vary", "").split(",")}
+    return "accept-encoding" in tokens or "*" in tokens
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI puro que comprime las respuestas de un solo mensaje (las de
+    FastAPI con el cuerpo completo) según Accept-Encoding. No toca las respuestas
+    que ya traen Content-Encoding (p. ej. las cacheadas, que llegan precomprimidas),
+    las que no son de un tipo comprimible ni las que se envían por partes.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            compressible = "content-encoding" not in headers and is_compressible(headers.get("content-type"))
+            if compressible and not varies_by_encoding(headers):
+                headers.add_vary_header("Accept-Encoding")
+
+            if not compressible or message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            if "etag" in headers:
+                headers["ETag"] = weak_etag(headers["etag"])
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,81 @@
+import importlib.util
+import logging
+import os
+
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from core.metrics import metrics_enabled, mongo_command_metrics
+
+logger = logging.getLogger(__name__)
+
+# Variables de entorno (.env) -> opción de pymongo. Solo se aplican las definidas,
+# el resto queda con los valores por defecto del driver o de MONGO_URL.
+INT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_CONNECTING": "maxConnecting",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+}
+
+STR_OPTIONS = {
+    "MONGO_READ_PREFERENCE": "readPreference",
+    "MONGO_APP_NAME": "appname",
+}
+
+# Compresor de red -> módulo de Python que necesita pymongo
+COMPRESSOR_MODULES = {
+    "zstd": "zstandard",
+    "snappy": "snappy",
+    "zlib": "zlib",
+}
+
+
+def _available_compressors(value: str) -> list:
+    compressors = []
+    for name in (c.strip() for c in value.split(",") if c.strip()):
+        module = COMPRESSOR_MODULES.get(name)
+        if module and importlib.util.find_spec(module):
+            compressors.append(name)
+        else:
+            logger.warning("Compresor de MongoDB no disponible, se omite: %s", name)
+    return compressors
+
+
+def mongo_client_options() -> dict:
+    """
+    Opciones del pool de conexiones leídas del entorno (MONGO_MAX_POOL_SIZE,
+    MONGO_COMPRESSORS=zstd,snappy, MONGO_READ_PREFERENCE=secondaryPreferred, ...)
+    """
+    options = {}
+    for env_name, option in INT_OPTIONS.items():
+        if os.environ.get(env_name):
+            options[option] = int(os.environ[env_name])
+
+    for env_name, option in STR_OPTIONS.items():
+        if os.environ.get(env_name):
+            options[option] = os.environ[env_name]
+
+    if os.environ.get("MONGO_COMPRESSORS"):
+        compressors = _available_compressors(os.environ["MONGO_COMPRESSORS"])
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+
+    return options
+
+
+def create_mongo_client(**extra_options) -> AsyncIOMotorClient:
+    """Crea el cliente único de MongoDB del proceso"""
+    options = {**mongo_client_options(), **extra_options}
+    if metrics_enabled():
+        options.setdefault("event_listeners", []).append(mongo_command_metrics)
+    return AsyncIOMotorClient(os.environ["MONGO_URL"], **options)
+
+
+def get_db(request: Request) -> AsyncIOMotorDatabase:
+    """Dependencia de FastAPI: base de datos compartida creada en el lifespan"""
+    return request.app.state.db
@@ -0,0 +1,170 @@
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Registro de índices por colección. Se aplica al iniciar la app y desde manage.py;
+# create_indexes es idempotente si la definición no cambió.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "contactos": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_desc"),
+        # Multikey sobre los tokens normalizados: búsquedas por prefijo (^token)
+        IndexModel([("busqueda", ASCENDING)], name="busqueda_prefix"),
+    ],
+    "logos": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("orden", ASCENDING), ("created_at", ASCENDING)], name="orden_asc"),
+        IndexModel([("sha256", ASCENDING), ("processing_status", ASCENDING)], name="sha256_status"),
+    ],
+    "status_checks": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("timestamp", DESCENDING)], name="timestamp_desc"),
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    # Rollups de heartbeats: un documento por client_name y bucket, cada nivel con su retención
+    "status_rollups_minute": [
+        IndexModel([("client_name", ASCENDING), ("bucket", ASCENDING)], name="client_bucket_unique", unique=True),
+        IndexModel([("bucket", ASCENDING)], name="bucket_asc"),
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    "status_rollups_hour": [
+        IndexModel([("client_name", ASCENDING), ("bucket", ASCENDING)], name="client_bucket_unique", unique=True),
+        IndexModel([("bucket", ASCENDING)], name="bucket_asc"),
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    # Contadores del rate limit y respuestas por Idempotency-Key (modo mongo): expiran solos
+    "rate_limits": [
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    "idempotency_keys": [
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Formas de consulta de los endpoints más usados: no deben resolverse con COLLSCAN
+HOT_QUERIES = [
+    {
+        "name": "contactos: primera página",
+        "collection": "contactos",
+        "filter": {},
+        "sort": {"created_at": -1, "_id": -1},
+        "limit": 51,
+    },
+    {
+        "name": "contactos: página siguiente",
+        "collection": "contactos",
+        "filter": {
+            "$or": [
+                {"created_at": {"$lt": "$$NOW"}},
+                {"created_at": "$$NOW", "_id": {"$lt": "$$ID"}},
+            ]
+        },
+        "sort": {"created_at": -1, "_id": -1},
+        "limit": 51,
+    },
+    {
+        "name": "contactos: búsqueda por prefijo",
+        "collection": "contactos",
+        "filter": {"$and": [{"busqueda": {"$regex": "^muni"}}, {"busqueda": {"$regex": "^san"}}]},
+        "limit": 500,
+    },
+    {
+        "name": "status: últimos heartbeats",
+        "collection": "status_checks",
+        "filter": {},
+        "sort": {"timestamp": -1},
+        "limit": 1000,
+    },
+    {
+        "name": "status: serie por minuto de un cliente",
+        "collection": "status_rollups_minute",
+        "filter": {"client_name": "monitor", "bucket": {"$gte": "$$NOW", "$lt": "$$NOW"}},
+        "sort": {"bucket": 1, "client_name": 1},
+    },
+    {
+        "name": "logos: listado del slider",
+        "collection": "logos",
+        "filter": {},
+        "sort": {"orden": 1, "created_at": 1},
+    },
+    {
+        "name": "logos: por id",
+        "collection": "logos",
+        "filter": {"id": "$$ID"},
+    },
+    {
+        "name": "logos: derivados ya procesados",
+        "collection": "logos",
+        "filter": {"sha256": "$$ID", "processing_status": "ready"},
+    },
+]
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Crea los índices declarados en INDEXES. Los conflictos se registran sin frenar el arranque"""
+    for collection, indexes in INDEXES.items():
+        try:
+            names = await db[collection].create_indexes(indexes)
+            logger.info("Índices verificados en %s: %s", collection, ', '.join(names))
+        except OperationFailure as e:
+            logger.error("No se pudieron crear los índices de %s: %s", collection, e)
+
+
+def _bind_placeholders(value):
+    # Los valores concretos no cambian el plan: solo importa la forma de la consulta
+    if value == "$$NOW":
+        return datetime.utcnow()
+    if value == "$$ID":
+        return ObjectId()
+    if isinstance(value, dict):
+        return {key: _bind_placeholders(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_bind_placeholders(item) for item in value]
+    return value
+
+
+def _plan_stages(plan) -> List[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def check_query_plans(db: AsyncIOMotorDatabase) -> List[dict]:
+    """
+    Ejecuta explain() sobre cada consulta de HOT_QUERIES y devuelve las etapas
+    del plan ganador, marcando las que caen en COLLSCAN
+    """
+    results = []
+    for query in HOT_QUERIES:
+        command = {
+            "find": query["collection"],
+            "filter": _bind_placeholders(query["filter"]),
+        }
+        if query.get("sort"):
+            command["sort"] = query["sort"]
+        if query.get("limit"):
+            command["limit"] = query["limit"]
+
+        explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+        results.append({
+            "name": query["name"],
+            "collection": query["collection"],
+            "stages": stages,
+            "ok": "COLLSCAN" not in stages,
+        })
+    return results
@@ -0,0 +1,193 @@
+import atexit
+import logging
+import os
+import queue
+import re
+import sys
+import time
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Tuple
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+
+# (request_id, inicio del request según perf_counter) del request en curso
+request_context: ContextVar[Optional[Tuple[str, float]]] = ContextVar("request_context", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Solo se acepta el ID del cliente (o del balanceador) si es corto y sin caracteres raros
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Atributos propios de LogRecord: el resto son campos pasados con extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+request_logger = logging.getLogger("api.request")
+
+
+def current_request_id() -> Optional[str]:
+    context = request_context.get()
+    return context[0] if context else None
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Agrega request_id y elapsed_ms al registro. Corre en el event loop, al emitir,
+    porque el contextvar no existe en el thread que después formatea
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context is not None:
+            record.request_id = context[0]
+            record.elapsed_ms = round((time.perf_counter() - context[1]) * 1000, 2)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los campos de extra={...} al nivel superior"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = "".join(traceback.format_exception(*record.exc_info))
+        return orjson.dumps(payload, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Encola los registros sin formatearlos (getMessage, JSON y traceback se resuelven
+    en el thread del QueueListener) y nunca bloquea el event loop: con la cola por
+    encima de `pressure` los DEBUG se muestrean 1 de cada `debug_sample`, y con la
+    cola llena se descartan y se avisa cuántos cuando vuelve a haber lugar.
+    """
+
+    def __init__(self, log_queue: queue.Queue, pressure: float = 0.5, debug_sample: int = 10):
+        super().__init__(log_queue)
+        self.pressure_size = int(log_queue.maxsize * pressure) if log_queue.maxsize > 0 else 0
+        self.debug_sample = debug_sample
+        self.dropped = 0
+        self._debug_seen = 0
+        self.addFilter(RequestContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare formatea el mensaje acá; se deja para el listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno <= logging.DEBUG and self.pressure_size and self.queue.qsize() >= self.pressure_size:
+            self._debug_seen += 1
+            if self._debug_seen % self.debug_sample:
+                return
+
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self._dropped_record())
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.LogRecord(
+            "core.log", logging.WARNING, __file__, 0,
+            "Cola de logs llena: se descartaron %d registros", (self.dropped,), None
+        )
+
+
+def configure_logging() -> Optional[QueueListener]:
+    """
+    Reemplaza los handlers sincrónicos por una cola: el event loop solo encola y un
+    thread formatea y escribe en stdout. LOG_LEVEL, LOG_FORMAT (json|text),
+    LOG_QUEUE_SIZE. Los logs de uvicorn pasan por la misma cola.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.environ.get("LOG_FORMAT", "json") == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000")))
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers = [NonBlockingQueueHandler(log_queue)]
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # El registro de cada request lo emite RequestContextMiddleware (con ID y duración)
+    logging.getLogger("uvicorn.access").disabled = True
+
+    return _listener
+
+
+def requests_logging_enabled() -> bool:
+    return os.environ.get("LOG_REQUESTS", "1").lower() not in ("0", "false", "no")
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI puro: asigna un request ID (el de X-Request-ID si viene uno
+    válido), lo deja en el contextvar para los logs, lo devuelve en la respuesta y
+    al terminar registra método, ruta, status y duración.
+    """
+
+    def __init__(self, app, log_requests: bool = True):
+        self.app = app
+        self.log_requests = log_requests
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if not request_id or not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        start = time.perf_counter()
+        token = request_context.set((request_id, start))
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self.log_requests:
+                request_logger.info(
+                    "%s %s %d", scope["method"], scope["path"], status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    }
+                )
+            request_context.reset(token)
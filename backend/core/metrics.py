@@ -0,0 +1,223 @@
+import glob
+import hmac
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+
+UNMATCHED_ROUTE = "unmatched"
+
+# Buckets pensados para una API chica: la mayoría de los requests deberían caer bajo 100 ms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests HTTP atendidos", ["method", "route", "status"]
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "Duración de los requests HTTP", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de las respuestas", ["method", "route"],
+    buckets=SIZE_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests HTTP en curso", ["method"],
+    multiprocess_mode="livesum"
+)
+
+MONGO_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "Duración de los comandos de MongoDB", ["command", "collection"],
+    buckets=MONGO_BUCKETS
+)
+MONGO_ERRORS = Counter(
+    "mongodb_command_errors_total", "Comandos de MongoDB fallidos", ["command", "collection"]
+)
+
+
+def metrics_enabled() -> bool:
+    # Apagado por defecto: /metrics expone rutas, latencias y colecciones de MongoDB
+    return os.environ.get("METRICS_ENABLED", "0") == "1"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware, que agrega una tarea y copia el
+    cuerpo por request). Las métricas se etiquetan con la plantilla de la ruta
+    (/api/logos/{logo_id}/image) y no con el path, para no multiplicar las series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[object, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = self._route_path(scope)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_DURATION.labels(method, route).observe(elapsed)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(size)
+
+    def _route_path(self, scope) -> str:
+        # Las rutas de FastAPI dejan la ruta resuelta en el scope
+        route = scope.get("route")
+        if route is not None:
+            return route.path_format
+
+        # Rutas de Starlette (p. ej. /metrics): se resuelven por endpoint, con caché
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        if endpoint not in self._route_paths:
+            self._route_paths[endpoint] = _find_route_path(scope, endpoint)
+        return self._route_paths[endpoint]
+
+
+def _find_route_path(scope, endpoint) -> str:
+    for route in scope["app"].router.routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return getattr(route, "path_format", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Listener de comandos de pymongo: latencia y errores por comando y colección.
+    pymongo lo invoca en el hilo que ejecuta el comando, así que tiene que ser liviano.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, object], Tuple[str, str]] = {}
+
+    def started(self, event):
+        command_name = event.command_name
+        if command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        self._pending[(event.request_id, event.connection_id)] = (command_name, collection)
+
+    def _finish(self, event) -> Optional[Tuple[str, str]]:
+        labels = self._pending.pop((event.request_id, event.connection_id), None)
+        if labels is None:
+            return None
+        MONGO_DURATION.labels(*labels).observe(event.duration_micros / 1_000_000)
+        return labels
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        labels = self._finish(event)
+        if labels is not None:
+            MONGO_ERRORS.labels(*labels).inc()
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+def _registry():
+    # Con varios workers (PROMETHEUS_MULTIPROC_DIR) se agregan los archivos de cada proceso
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _authorized(request: Request) -> bool:
+    token = os.environ.get("METRICS_TOKEN")
+    if not token:
+        return True
+    expected = f"Bearer {token}".encode("utf-8")
+    return hmac.compare_digest(request.headers.get("authorization", "").encode("utf-8"), expected)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    GET /metrics en formato de exposición de texto de Prometheus. Con METRICS_TOKEN
+    exige `Authorization: Bearer <token>` (el scraper de Prometheus lo manda con
+    `authorization.credentials`).
+    """
+    if not _authorized(request):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def _live_gauge_pids(directory: str):
+    # Archivos de los gauges "live" por proceso: gauge_livesum_<pid>.db
+    for path in glob.glob(os.path.join(directory, "gauge_live*_*.db")):
+        pid = os.path.basename(path)[:-len(".db")].rsplit("_", 1)[-1]
+        if pid.isdigit():
+            yield int(pid)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def mark_dead_workers() -> None:
+    """
+    Al arrancar un worker: descarta los gauges "live" (requests en curso) de workers
+    que murieron sin apagarse. uvicorn no tiene un hook de salida de workers como el
+    child_exit de gunicorn, así que lo hace cada worker nuevo.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    for pid in set(_live_gauge_pids(directory)):
+        if pid != os.getpid() and not _process_alive(pid):
+            multiprocess.mark_process_dead(pid, directory)
+
+
+def mark_worker_exited() -> None:
+    """Al apagar un worker: sus requests en curso dejan de sumar en el gauge agregado"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        multiprocess.mark_process_dead(os.getpid(), directory)
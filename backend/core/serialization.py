@@ -0,0 +1,55 @@
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def _default(value: Any):
+    # orjson ya codifica datetime, UUID y dataclasses de forma nativa
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any, utc: bool = False) -> bytes:
+    """
+    Serializa a JSON con orjson. Los documentos de MongoDB se pueden pasar tal cual:
+    ObjectId se convierte a string y datetime a ISO 8601 (mismo formato que isoformat()).
+    Con utc=True las fechas sin zona (como las devuelve MongoDB) salen como UTC con
+    sufijo Z, igual que los modelos de Pydantic.
+    """
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z if utc else None
+    return orjson.dumps(payload, default=_default, option=option)
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON renderizada con orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(payload: Any, status_code: int = 200, headers: Optional[dict] = None,
+                  utc: bool = False) -> Response:
+    """
+    Devuelve el payload ya serializado. Al retornar un Response, FastAPI no vuelve
+    a pasar el resultado por jsonable_encoder ni lo valida contra response_model.
+    """
+    return Response(
+        content=dumps(payload, utc=utc),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serializa un modelo de Pydantic directamente con pydantic-core, sin revalidarlo"""
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json"
+    )
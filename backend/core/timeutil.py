@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_utc_naive(moment: datetime) -> datetime:
+    # MongoDB devuelve las fechas en UTC sin tzinfo; las consultas usan el mismo formato
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
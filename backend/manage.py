@@ -0,0 +1,209 @@
+import asyncio
+import importlib.util
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import typer
+import uvicorn
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env', override=False)
+
+from core.database import create_mongo_client
+from core.metrics import metrics_enabled
+from core.indexes import ensure_indexes, check_query_plans
+from services.contact_stats import rebuild_daily_counters
+from services.contact_search import backfill_search_tokens
+from services.status_rollups import migrate_status_checks
+from services.contact_archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_DIR, archive_contacts
+from services.logo_blob_gc import BLOB_GC_GRACE_SECONDS, collect_unused_blobs
+from services.logo_storage import create_logo_storage
+
+cli = typer.Typer(help="Tareas de mantenimiento del backend de VASTUM")
+
+
+# Presets de uvicorn para `serve --profile`. workers=None usa un worker por CPU disponible.
+# timeout_keep_alive queda por encima del idle timeout típico de los balanceadores (60 s)
+# para que sea el balanceador el que cierre las conexiones ociosas y no el backend.
+SERVE_PROFILES = {
+    "development": {
+        "workers": 1,
+        "reload": True,
+        "timeout_keep_alive": 5,
+        "backlog": 2048,
+        "timeout_graceful_shutdown": 5,
+        "access_log": True,
+    },
+    "production": {
+        "workers": None,
+        "reload": False,
+        "timeout_keep_alive": 75,
+        "backlog": 4096,
+        "timeout_graceful_shutdown": 30,
+        "access_log": False,
+    },
+    "benchmark": {
+        "workers": None,
+        "reload": False,
+        "timeout_keep_alive": 75,
+        "backlog": 8192,
+        "timeout_graceful_shutdown": 5,
+        "access_log": False,
+    },
+}
+
+
+def _cpu_count() -> int:
+    # En contenedores sched_getaffinity respeta el límite de CPUs asignadas
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _run_with_db(task):
+    async def runner():
+        client = create_mongo_client()
+        try:
+            return await task(client[os.environ['DB_NAME']])
+        finally:
+            client.close()
+
+    return asyncio.run(runner())
+
+
+@cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Crea (o verifica) los índices declarados en core/indexes.py"""
+    _run_with_db(ensure_indexes)
+    typer.echo("Índices verificados")
+
+
+@cli.command("check-indexes")
+def check_indexes_command():
+    """Corre explain() sobre las consultas críticas y falla si alguna usa COLLSCAN"""
+    results = _run_with_db(check_query_plans)
+
+    for result in results:
+        status = "OK  " if result["ok"] else "FAIL"
+        typer.echo(f"[{status}] {result['name']}: {' > '.join(result['stages'])}")
+
+    if not all(result["ok"] for result in results):
+        raise typer.Exit(code=1)
+
+
+@cli.command("rebuild-contact-counters")
+def rebuild_contact_counters_command():
+    """Recalcula los contadores diarios de contactos usados por /api/contactos/stats"""
+    days = _run_with_db(rebuild_daily_counters)
+    typer.echo(f"Contadores reconstruidos: {days} días")
+
+
+@cli.command("backfill-contact-search")
+def backfill_contact_search_command(
+    rebuild: bool = typer.Option(False, "--rebuild", help="Recalcular también los que ya tienen tokens")
+):
+    """Genera el campo de búsqueda normalizado de los contactos existentes"""
+    updated = _run_with_db(lambda db: backfill_search_tokens(db, rebuild=rebuild))
+    typer.echo(f"Contactos actualizados: {updated}")
+
+
+@cli.command("migrate-status")
+def migrate_status_command():
+    """Pasa status_checks a serie temporal: timestamps como fecha, TTL y rollups por minuto/hora"""
+    result = _run_with_db(migrate_status_checks)
+    typer.echo(f"Timestamps convertidos: {result['convertidos']}")
+    typer.echo(f"Heartbeats con vencimiento: {result['con_vencimiento']}")
+    for tier, buckets in result["rollups"].items():
+        typer.echo(f"Rollup {tier}: {buckets} buckets")
+
+
+@cli.command("archive-contacts")
+def archive_contacts_command(
+    older_than_days: int = typer.Option(ARCHIVE_AFTER_DAYS, help="Archivar contactos con más de estos días"),
+    batch_size: int = typer.Option(ARCHIVE_BATCH_SIZE, help="Contactos por lote (escritura y borrado)"),
+):
+    """Mueve los contactos viejos a archivos Parquet particionados por mes y los borra de MongoDB"""
+    result = _run_with_db(lambda db: archive_contacts(db, older_than_days=older_than_days, batch_size=batch_size))
+    typer.echo(f"Contactos archivados: {result['archivados']} en {result['archivos']} archivo(s) de {ARCHIVE_DIR}")
+    typer.echo(f"Límite del archivo: {result['hasta'].isoformat()}")
+
+
+@cli.command("collect-logo-blobs")
+def collect_logo_blobs_command(
+    grace_seconds: int = typer.Option(BLOB_GC_GRACE_SECONDS, help="Solo blobs marcados hace más de estos segundos"),
+):
+    """Borra los blobs de logos eliminados que ya no usa ningún logo"""
+    deleted = _run_with_db(lambda db: collect_unused_blobs(db, create_logo_storage(db), grace_seconds))
+    typer.echo(f"Blobs eliminados: {deleted}")
+
+
+@cli.command("serve")
+def serve_command(
+    profile: str = typer.Option("production", help=f"Preset: {', '.join(SERVE_PROFILES)}"),
+    host: str = typer.Option("0.0.0.0"),
+    port: int = typer.Option(8001),
+    workers: Optional[int] = typer.Option(None, help="Por defecto, según el perfil"),
+    keep_alive: Optional[int] = typer.Option(None, help="Segundos de keep-alive HTTP"),
+    backlog: Optional[int] = typer.Option(None, help="Conexiones pendientes en el socket"),
+    graceful_timeout: Optional[int] = typer.Option(None, help="Segundos para terminar requests al apagar"),
+    limit_concurrency: Optional[int] = typer.Option(None, help="Máximo de conexiones por worker antes de responder 503"),
+):
+    """Levanta la API con uvicorn: uvloop y httptools si están instalados, un worker por CPU"""
+    if profile not in SERVE_PROFILES:
+        raise typer.BadParameter(f"Perfil desconocido: {profile}", param_hint="--profile")
+
+    options = dict(SERVE_PROFILES[profile])
+    overrides = {
+        "workers": workers,
+        "timeout_keep_alive": keep_alive,
+        "backlog": backlog,
+        "timeout_graceful_shutdown": graceful_timeout,
+    }
+    options.update({name: value for name, value in overrides.items() if value is not None})
+
+    if options["reload"]:
+        options["workers"] = 1
+    elif options["workers"] is None:
+        options["workers"] = _cpu_count()
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    # El registro por request lo hace la app (con request ID y duración), no uvicorn
+    os.environ.setdefault("LOG_REQUESTS", "1" if options["access_log"] else "0")
+
+    # Con varios workers las métricas de Prometheus se agregan desde archivos compartidos.
+    # El directorio temporal es de esta ejecución: se borra al salir
+    metrics_dir = None
+    if options["workers"] > 1 and metrics_enabled() and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        metrics_dir = tempfile.mkdtemp(prefix="vastum_metrics_")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    typer.echo(
+        f"Perfil {profile}: {options['workers']} worker(s), loop={loop}, http={http}, "
+        f"keep-alive={options['timeout_keep_alive']}s, backlog={options['backlog']}"
+    )
+
+    try:
+        uvicorn.run(
+            "server:app",
+            app_dir=str(ROOT_DIR),
+            host=host,
+            port=port,
+            loop=loop,
+            http=http,
+            lifespan="on",
+            limit_concurrency=limit_concurrency,
+            **options
+        )
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    cli()
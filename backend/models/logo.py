@@ -1,16 +1,34 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
 class LogoCreate(BaseModel):
     nombre: str = Field(..., description="Nombre de la empresa")
     imagen_base64: str = Field(..., description="Imagen en base64")
+
+class LogoOrder(BaseModel):
+    ids: List[str] = Field(..., min_length=1, description="Ids de los logos en el orden del slider")
+
+class LogoBatchDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000, description="Ids de los logos a eliminar")
+
+class LogoVariant(BaseModel):
+    sha256: str
+    content_type: str
+    size: int
+    width: int
+    height: int
     
 class Logo(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     nombre: str
-    imagen_base64: str
+    content_type: str = Field(..., description="Content type de la imagen original")
+    size: int = Field(..., description="Tamaño en bytes de la imagen original")
+    sha256: str = Field(..., description="Hash del blob en el almacenamiento de logos")
+    processing_status: str = Field("pending", description="Estado de generación de derivados")
+    variants: Dict[str, LogoVariant] = Field(default_factory=dict, description="Derivados redimensionados")
+    orden: int = Field(0, description="Posición en el slider")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
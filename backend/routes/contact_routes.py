@@ -1,20 +1,65 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from models.contact import ContactCreate, Contact
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from core.database import get_db
+from core.serialization import json_response
+from core.timeutil import to_utc_naive
+from services.contact_ingest import ContactBatcher, IngestQueueFull, get_contact_batcher
+from services.contact_stats import contact_stats, record_contacts
+from services.rate_limit import RateLimitPolicy, get_rate_limit_policy, retry_after_header
+from services.idempotency import (
+    MAX_KEY_LENGTH,
+    STATE_DONE,
+    IdempotentReplay,
+    get_idempotency_store,
+    request_fingerprint
+)
+from services.pagination import encode_cursor, decode_cursor, after_cursor_filter
+from services.field_selection import FieldSources, select_fields, trim_fields
+from services.contact_search import (
+    CANDIDATE_LIMIT,
+    SEARCH_FIELD,
+    query_terms,
+    relevance,
+    search_filter,
+    search_tokens
+)
+from services.contact_archive import (
+    ARCHIVE_FIELDS,
+    archive_cutoff,
+    iter_archive,
+    merge_desc,
+    merge_streams_desc,
+    needs_archive,
+    read_archive_page
+)
+from services.contact_import import (
+    IMPORT_MAX_BYTES,
+    ImportFailed,
+    ImportTooLarge,
+    InvalidImport,
+    import_contacts,
+    limit_stream,
+    parse_csv,
+    parse_ndjson
+)
+from services.contact_export import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_PROJECTION,
+    iter_contacts_csv,
+    iter_contacts_ndjson,
+    gzip_stream
+)
+from typing import Optional, Tuple
+from datetime import datetime, date
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["contactos"])
 
-# MongoDB connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'vastum_db')]
-contactos_collection = db.contactos
-
 # Tipos de empresa válidos
 VALID_COMPANY_TYPES = [
     "Empresa de Recolección",
@@ -27,11 +72,97 @@ VALID_COMPANY_TYPES = [
     "Otro"
 ]
 
+def _peek_email(body: bytes) -> Optional[str]:
+    # Lectura mínima del JSON crudo, sin validar: solo para el rate limit por email
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return None
+    email = payload.get("email") if isinstance(payload, dict) else None
+    return email if isinstance(email, str) and email else None
+
+def _raise_for_existing(record: dict) -> None:
+    """La clave ya tiene un registro: respuesta guardada o conflicto"""
+    if record["state"] == STATE_DONE:
+        raise IdempotentReplay(record["status_code"], record["payload"])
+    raise HTTPException(
+        status_code=409,
+        detail="La solicitud con esta Idempotency-Key todavía se está procesando"
+    )
+
+async def guard_contact_submission(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    policy: Optional[RateLimitPolicy] = Depends(get_rate_limit_policy),
+    idempotency = Depends(get_idempotency_store)
+) -> Optional[Tuple[str, str]]:
+    """
+    Filtros previos al formulario de contacto. FastAPI resuelve las dependencias antes
+    de validar el body contra ContactCreate, así que los requests rechazados acá no
+    pasan por Pydantic ni por MongoDB. El rate limit va primero: con el almacén de
+    claves en MongoDB, ni siquiera la búsqueda de la Idempotency-Key corre para un
+    request que se va a rechazar.
+
+    La clave no se reserva acá (un body inválido la dejaría tomada): se devuelve
+    (clave, huella del body) para que el handler la reserve ya validado.
+    """
+    if idempotency_key and len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key demasiado larga")
+
+    if policy is not None:
+        retry_after = await policy.check_ip(request)
+        if not retry_after:
+            email = _peek_email(await request.body())
+            retry_after = await policy.check_email(email) if email else 0
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Demasiadas solicitudes, intenta nuevamente más tarde",
+                headers=retry_after_header(retry_after)
+            )
+
+    if not idempotency_key:
+        return None
+
+    # La clave se acota a la huella del body: solo quien manda exactamente el mismo
+    # contenido puede recibir la respuesta guardada u ocupar la clave
+    fingerprint = request_fingerprint(await request.body())
+    claim = (f"contacto:{fingerprint}:{idempotency_key}", fingerprint)
+    record = await idempotency.get(claim[0])
+    if record is not None:
+        _raise_for_existing(record)
+    return claim
+
+# Campos que se pueden pedir con fields=; meta=1 omite el mensaje (el campo más pesado)
+CONTACT_FIELDS: FieldSources = {
+    name: (name,) for name in (
+        "_id", "id", "nombre", "email", "telefono", "empresa", "tipo_empresa", "mensaje", "created_at"
+    )
+}
+CONTACT_HEAVY_FIELDS = ("mensaje",)
+
 @router.post("/contacto", status_code=201)
-async def create_contact(contact_data: ContactCreate):
+async def create_contact(
+    contact_data: ContactCreate,
+    claim: Optional[Tuple[str, str]] = Depends(guard_contact_submission),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    batcher: Optional[ContactBatcher] = Depends(get_contact_batcher),
+    idempotency = Depends(get_idempotency_store)
+):
     """
-    Crea un nuevo contacto desde el formulario de la landing page
+    Crea un nuevo contacto desde el formulario de la landing page.
+    Con el header Idempotency-Key, un reintento devuelve la respuesta original
+    sin volver a insertar el contacto.
     """
+    # El body ya está validado: recién ahora se reserva la clave
+    idempotency_key = None
+    if claim is not None:
+        record = await idempotency.begin(*claim)
+        if record is not None:
+            _raise_for_existing(record)
+        idempotency_key = claim[0]
+
+    completed = False
     try:
         # Validar tipo de empresa
         if contact_data.tipoEmpresa not in VALID_COMPANY_TYPES:
@@ -51,34 +182,232 @@ async def create_contact(contact_data: ContactCreate):
             created_at=datetime.utcnow()
         )
         
-        # Guardar en MongoDB
+        # Guardar en MongoDB (directo o agrupado en lotes durante picos de tráfico)
         contact_dict = contact.dict()
-        result = await contactos_collection.insert_one(contact_dict)
+        contact_dict[SEARCH_FIELD] = search_tokens(contact_dict)
+        if batcher is not None:
+            try:
+                await batcher.submit(contact_dict)
+            except IngestQueueFull:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Servicio saturado, intenta nuevamente en unos segundos",
+                    headers={"Retry-After": "1"}
+                )
+        else:
+            result = await db.contactos.insert_one(contact_dict)
+            await record_contacts(db, [contact_dict])
         
-        logger.info(f"Contacto creado exitosamente: {contact.email}")
+        logger.info("Contacto creado exitosamente: %s", contact.email)
         
-        return {
+        response = {
             "success": True,
             "message": "Contacto registrado exitosamente",
             "id": contact.id
         }
+        if idempotency_key:
+            await idempotency.complete(idempotency_key, 201, response)
+            completed = True
+        return response
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error al crear contacto: {str(e)}")
+        logger.error("Error al crear contacto: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Error interno al procesar el contacto"
         )
+    finally:
+        # Cualquier salida sin respuesta guardada (error o request cancelado) libera la
+        # clave para que el cliente pueda reintentar
+        if idempotency_key and not completed:
+            await idempotency.release(idempotency_key)
+
+def _import_failed(status_code: int, detail: str, error: ImportFailed):
+    """
+    Error de una importación cortada. Si ya se habían guardado filas, la respuesta
+    incluye el resumen para que el cliente sepa qué quedó importado.
+    """
+    if not error.report or not error.report["total_filas"]:
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    logger.warning(
+        "Importación de contactos cortada: %s de %s filas importadas (%s)",
+        error.report["importados"], error.report["total_filas"], detail
+    )
+    return json_response({"success": False, "detail": detail, **error.report}, status_code=status_code)
+
+@router.post("/contactos/import")
+async def import_contacts_file(
+    request: Request,
+    import_format: Optional[str] = Query(
+        None,
+        alias="format",
+        pattern="^(csv|ndjson)$",
+        description="Formato del archivo (por defecto, según Content-Type)"
+    ),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Importa contactos desde un CSV (acepta los encabezados del export) o NDJSON
+    enviado como body. El archivo se procesa a medida que llega: las filas se validan
+    con las mismas reglas del formulario y se guardan por lotes. Devuelve el resumen
+    con los errores por número de fila (las filas válidas se guardan igual).
+    """
+    try:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > IMPORT_MAX_BYTES:
+            raise ImportTooLarge("Archivo demasiado grande")
+
+        if import_format is None:
+            content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+            import_format = "ndjson" if content_type in ("application/x-ndjson", "application/jsonl", "application/json") else "csv"
+
+        chunks = limit_stream(request.stream())
+        rows = parse_csv(chunks) if import_format == "csv" else parse_ndjson(chunks)
+        report = await import_contacts(db, rows, VALID_COMPANY_TYPES)
+
+        logger.info(
+            "Importación de contactos: %s de %s filas importadas",
+            report["importados"], report["total_filas"]
+        )
+        return json_response({"success": True, **report})
+
+    except ImportTooLarge as e:
+        return _import_failed(413, f"El archivo supera el máximo de {IMPORT_MAX_BYTES / (1024 * 1024):g} MB", e)
+    except InvalidImport as e:
+        return _import_failed(400, str(e), e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al importar contactos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al importar los contactos"
+        )
+
+def _date_range(desde: Optional[datetime], hasta: Optional[datetime]):
+    """Normaliza desde/hasta a UTC sin tzinfo (como los guarda MongoDB) y valida el orden"""
+    desde = to_utc_naive(desde) if desde else None
+    hasta = to_utc_naive(hasta) if hasta else None
+    if desde and hasta and desde >= hasta:
+        raise HTTPException(
+            status_code=400,
+            detail="El inicio del rango debe ser anterior al fin"
+        )
+    return desde, hasta
+
+def _created_at_range(desde: Optional[datetime], hasta: Optional[datetime]) -> dict:
+    condition = {}
+    if desde:
+        condition["$gte"] = desde
+    if hasta:
+        condition["$lt"] = hasta
+    return condition
 
 @router.get("/contactos")
-async def get_contacts():
+async def get_contacts(
+    limit: int = Query(50, ge=1, le=500, description="Cantidad de contactos por página"),
+    after: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por coma"),
+    meta: bool = Query(False, description="Omitir el mensaje"),
+    desde: Optional[datetime] = Query(None, description="Solo contactos desde esta fecha (incluye el archivo si es anterior)"),
+    hasta: Optional[datetime] = Query(None, description="Solo contactos anteriores a esta fecha"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
     """
-    Obtiene todos los contactos (endpoint para administración)
+    Obtiene los contactos paginados por cursor, del más reciente al más antiguo
+    (endpoint para administración). Si `desde` es anterior al límite del archivo,
+    la página combina MongoDB con los contactos archivados en Parquet.
     """
     try:
-        # Proyección para optimizar la consulta - traer solo campos necesarios
+        # created_at y _id se leen siempre: arman el cursor de la página siguiente
+        try:
+            requested, projection = select_fields(
+                fields, meta, CONTACT_FIELDS, heavy=CONTACT_HEAVY_FIELDS, always=("created_at", "_id")
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+
+        desde, hasta = _date_range(desde, hasta)
+
+        conditions = []
+        position = None
+        if after:
+            try:
+                position = decode_cursor(after)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cursor de paginación inválido"
+                )
+            conditions.append(after_cursor_filter(*position))
+        if desde or hasta:
+            conditions.append({"created_at": _created_at_range(desde, hasta)})
+        query = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+
+        # Se pide un documento de más para saber si hay otra página
+        cursor = db.contactos.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+        contactos = await cursor.limit(limit + 1).to_list(limit + 1)
+
+        if needs_archive(await archive_cutoff(db) if desde else None, desde):
+            columns = [field for field, include in projection.items() if include and field in ARCHIVE_FIELDS]
+            archived = await read_archive_page(desde, hasta or datetime.utcnow(), position, limit + 1, columns)
+            contactos = merge_desc(contactos, archived)[:limit + 1]
+
+        next_cursor = None
+        if len(contactos) > limit:
+            contactos = contactos[:limit]
+            last = contactos[-1]
+            next_cursor = encode_cursor(last["created_at"], last["_id"])
+
+        if requested != list(CONTACT_FIELDS):
+            contactos = [trim_fields(contacto, requested) for contacto in contactos]
+        
+        # El total sale de los metadatos de la colección, sin recorrerla
+        total = await db.contactos.estimated_document_count()
+        
+        # ObjectId y datetime se serializan directamente con orjson
+        return json_response({
+            "success": True,
+            "contactos": contactos,
+            "total": total,
+            "next_cursor": next_cursor
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al obtener contactos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al obtener los contactos"
+        )
+
+@router.get("/contactos/search")
+async def search_contacts(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar"),
+    limit: int = Query(20, ge=1, le=100, description="Cantidad de resultados por página"),
+    offset: int = Query(0, ge=0, le=CANDIDATE_LIMIT, description="Resultados a saltear"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Busca contactos por nombre, empresa, email o mensaje, sin distinguir acentos ni
+    mayúsculas. Cada palabra se compara como prefijo ("muni" encuentra "Municipalidad")
+    y los resultados se ordenan por relevancia.
+    """
+    try:
+        terms = query_terms(q)
+        if not terms:
+            raise HTTPException(
+                status_code=400,
+                detail="La búsqueda debe tener al menos una palabra de 2 caracteres"
+            )
+
         projection = {
             "_id": 1,
             "id": 1,
@@ -90,24 +419,106 @@ async def get_contacts():
             "mensaje": 1,
             "created_at": 1
         }
-        
-        contactos = await contactos_collection.find({}, projection).sort("created_at", -1).to_list(1000)
-        
-        # Convertir ObjectId a string y formatear
-        for contacto in contactos:
-            contacto["_id"] = str(contacto["_id"])
-            if "created_at" in contacto:
-                contacto["created_at"] = contacto["created_at"].isoformat()
-        
-        return {
+
+        # Sin sort: el recorrido del índice corta al llegar al límite de candidatos,
+        # y los tokens idénticos al término aparecen antes que los que solo lo extienden
+        cursor = db.contactos.find(search_filter(terms), projection).limit(CANDIDATE_LIMIT)
+        candidates = await cursor.to_list(CANDIDATE_LIMIT)
+
+        for contacto in candidates:
+            contacto["relevancia"] = relevance(contacto, terms)
+        candidates.sort(key=lambda contacto: (contacto["relevancia"], contacto["created_at"]), reverse=True)
+
+        return json_response({
             "success": True,
-            "contactos": contactos,
-            "total": len(contactos)
-        }
-    
+            "contactos": candidates[offset:offset + limit],
+            "total": len(candidates),
+            "truncated": len(candidates) == CANDIDATE_LIMIT,
+            "offset": offset,
+            "limit": limit
+        })
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error al obtener contactos: {str(e)}")
+        logger.error("Error al buscar contactos: %s", e)
         raise HTTPException(
             status_code=500,
-            detail="Error al obtener los contactos"
+            detail="Error al buscar contactos"
+        )
+
+@router.get("/contactos/stats")
+async def get_contact_stats(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Estadísticas de contactos para el panel: totales por período y por tipo de empresa
+    """
+    try:
+        stats = await contact_stats(db)
+
+        return json_response({
+            "success": True,
+            **stats
+        })
+
+    except Exception as e:
+        logger.error("Error al obtener estadísticas de contactos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al obtener las estadísticas"
+        )
+
+@router.get("/contactos/export")
+async def export_contacts(
+    export_format: str = Query(
+        "csv",
+        alias="format",
+        pattern="^(csv|ndjson)$",
+        description="Formato de exportación"
+    ),
+    gzip: bool = Query(False, description="Comprimir la respuesta con gzip"),
+    desde: Optional[datetime] = Query(None, description="Solo contactos desde esta fecha (incluye el archivo si es anterior)"),
+    hasta: Optional[datetime] = Query(None, description="Solo contactos anteriores a esta fecha"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Exporta los contactos en streaming (CSV o NDJSON), con memoria constante. Si
+    `desde` es anterior al límite del archivo, se agregan los contactos archivados.
+    """
+    try:
+        desde, hasta = _date_range(desde, hasta)
+        query = {"created_at": _created_at_range(desde, hasta)} if desde or hasta else {}
+        with_archive = needs_archive(await archive_cutoff(db) if desde else None, desde)
+
+        # Para intercalar con el archivo hace falta el _id (desempata el orden)
+        projection = {**EXPORT_PROJECTION, "_id": 1} if with_archive else EXPORT_PROJECTION
+        cursor = db.contactos.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+        cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+        if with_archive:
+            cursor = merge_streams_desc(cursor, iter_archive(desde, hasta or datetime.utcnow()))
+
+        if export_format == "csv":
+            body = iter_contacts_csv(cursor)
+            media_type = "text/csv; charset=utf-8"
+        else:
+            body = iter_contacts_ndjson(cursor)
+            media_type = "application/x-ndjson"
+
+        filename = f"contactos_vastum_{date.today().isoformat()}.{export_format}"
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+        if gzip:
+            body = gzip_stream(body)
+            headers["Content-Encoding"] = "gzip"
+
+        logger.info("Exportación de contactos iniciada (%s)", export_format)
+
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al exportar contactos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al exportar los contactos"
         )
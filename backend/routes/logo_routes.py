@@ -1,112 +1,663 @@
-from fastapi import APIRouter, HTTPException
-from models.logo import LogoCreate, Logo
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from models.logo import LogoBatchDelete, LogoCreate, LogoOrder, Logo
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from core.database import get_db
+from core.cache import ResponseCache, cached_response, etag_matches, get_response_cache
+from core.serialization import dumps
+from services.logo_storage import LogoStorage, StoredBlob, content_sha256, decode_data_uri, sniff_image_type
+from services.field_selection import FieldSources, cache_key, select_fields, trim_fields
+from services.logo_sprite import LOGO_ORDER, get_sprite_manifest, schedule_sprite_rebuild
+from services.logo_blob_gc import logo_hashes, schedule_blob_collection
+from services.logo_blob_marks import mark_unused_blobs, reserve_blobs
+from services.logo_upload import (
+    LOGO_MAX_BYTES,
+    InvalidUpload,
+    UploadTooLarge,
+    max_body_bytes,
+    read_limited_body,
+    receive_multipart_logo
+)
+from services.logo_pipeline import (
+    STATUS_PENDING,
+    STATUS_READY,
+    SLIDER_VARIANT,
+    schedule_logo_processing
+)
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from typing import Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["logos"])
 
-# MongoDB connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'vastum_db')]
-logos_collection = db.logos
+# Las URLs versionadas por hash nunca cambian de contenido
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+URL_HASH_LENGTH = 16
 
-@router.post("/logos", status_code=201)
-async def create_logo(logo_data: LogoCreate):
+# El listado se cachea en memoria y los clientes revalidan siempre con If-None-Match
+LOGOS_CACHE_NAMESPACE = "logos"
+LIST_CACHE_CONTROL = "no-cache"
+
+# Campos que se pueden pedir con fields= (y de qué campos de MongoDB salen).
+# Las URLs de imagen son los campos "pesados" que omite meta=1.
+LOGO_FIELDS: FieldSources = {
+    "_id": ("_id",),
+    "id": ("id",),
+    "nombre": ("nombre",),
+    "content_type": ("content_type",),
+    "size": ("size",),
+    "sha256": ("sha256",),
+    "processing_status": ("processing_status",),
+    "orden": ("orden",),
+    "created_at": ("created_at",),
+    "imagen_url": ("id", "sha256", "variants"),
+    "imagen_original_url": ("id", "sha256"),
+    "variantes": ("id", "variants"),
+}
+LOGO_HEAVY_FIELDS = ("imagen_url", "imagen_original_url", "variantes")
+
+
+def get_logo_storage(request: Request) -> LogoStorage:
+    """Dependencia de FastAPI: almacenamiento de blobs creado en el lifespan"""
+    return request.app.state.logo_storage
+
+
+def logo_image_url(logo: dict, variant: Optional[str] = None) -> str:
+    """
+    Arma la URL pública de la imagen de un logo (o de uno de sus derivados),
+    versionada por el hash del contenido
+    """
+    url = f"/api/logos/{logo['id']}/image"
+    blob = (logo.get("variants") or {}).get(variant) if variant else None
+
+    # Mientras el derivado no esté listo se usa la URL de la imagen original
+    if blob:
+        url += f"?variant={variant}&v={blob['sha256'][:URL_HASH_LENGTH]}"
+    elif logo.get("sha256"):
+        url += f"?v={logo['sha256'][:URL_HASH_LENGTH]}"
+    return url
+
+
+def _notify_logos_changed(db, logo_storage: LogoStorage, cache: ResponseCache) -> None:
+    """Invalida el listado cacheado y regenera el sprite del slider en segundo plano"""
+    cache.invalidate(LOGOS_CACHE_NAMESPACE)
+    schedule_sprite_rebuild(
+        db,
+        logo_storage,
+        on_change=lambda: cache.invalidate(LOGOS_CACHE_NAMESPACE)
+    )
+
+
+def sprite_image_url(sha256: str) -> str:
+    return f"/api/logos/sprite/{sha256[:URL_HASH_LENGTH]}.webp"
+
+
+async def _release_blobs(db, logo_storage: LogoStorage, logos: list) -> None:
+    """
+    Los blobs se comparten entre logos con la misma imagen: los de los logos
+    eliminados se marcan para el borrado diferido, que solo borra los que nadie usa
+    """
+    await mark_unused_blobs(db, set().union(*(logo_hashes(logo) for logo in logos)))
+    schedule_blob_collection(db, logo_storage)
+
+
+async def _migrate_legacy_logo(
+    logos_collection,
+    logo_storage: LogoStorage,
+    cache: ResponseCache,
+    logo: dict
+) -> dict:
+    """
+    Mueve al almacenamiento de blobs la imagen de un logo guardado con el formato
+    anterior (imagen_base64 dentro del documento)
+    """
+    data, content_type = decode_data_uri(logo["imagen_base64"])
+    await reserve_blobs(logos_collection.database, [content_sha256(data)])
+    blob = await logo_storage.put(data, content_type)
+
+    fields = {
+        "sha256": blob.sha256,
+        "size": blob.size,
+        "content_type": blob.content_type,
+        "processing_status": STATUS_PENDING
+    }
+    await logos_collection.update_one(
+        {"id": logo["id"]},
+        {"$set": fields, "$unset": {"imagen_base64": ""}}
+    )
+    cache.invalidate(LOGOS_CACHE_NAMESPACE)
+    schedule_logo_processing(
+        logos_collection,
+        logo_storage,
+        blob.sha256,
+        on_change=lambda: cache.invalidate(LOGOS_CACHE_NAMESPACE)
+    )
+    logger.info("Logo migrado al almacenamiento de blobs: %s", logo['id'])
+
+    logo.update(fields)
+    logo.pop("imagen_base64", None)
+    return logo
+
+
+# El body se lee a mano (JSON o multipart), así que se documenta acá para OpenAPI
+CREATE_LOGO_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "nombre": {"type": "string"},
+                        "imagen": {"type": "string", "format": "binary"}
+                    },
+                    "required": ["imagen"]
+                }
+            },
+            "application/json": {"schema": LogoCreate.model_json_schema()}
+        }
+    }
+}
+
+
+async def _receive_json_logo(request: Request, logo_storage: LogoStorage, reserve_blob):
+    """Formato anterior: JSON con la imagen como data URI en base64"""
+    body = await read_limited_body(request, max_body_bytes(multipart=False))
+    try:
+        logo_data = LogoCreate.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+    data, _ = decode_data_uri(logo_data.imagen_base64)
+    if len(data) > LOGO_MAX_BYTES:
+        raise UploadTooLarge("Imagen demasiado grande")
+
+    # El content type declarado en el data URI no se usa: se identifica por los bytes
+    content_type = sniff_image_type(data)
+    if content_type is None:
+        raise InvalidUpload("Formato no soportado (se aceptan PNG, JPEG, GIF, WEBP y AVIF)")
+
+    await reserve_blob(content_sha256(data))
+    return logo_data.nombre, await logo_storage.put(data, content_type)
+
+
+@router.post("/logos", status_code=201, openapi_extra=CREATE_LOGO_OPENAPI)
+async def create_logo(
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage),
+    cache: ResponseCache = Depends(get_response_cache)
+):
     """
-    Crea un nuevo logo para el slider
+    Crea un nuevo logo para el slider. Acepta multipart/form-data (campos `nombre` e
+    `imagen`), que se guarda en streaming, o el JSON anterior con la imagen en base64.
     """
     try:
-        logo = Logo(
-            nombre=logo_data.nombre,
-            imagen_base64=logo_data.imagen_base64,
-            created_at=datetime.utcnow()
-        )
-        
-        logo_dict = logo.dict()
-        result = await logos_collection.insert_one(logo_dict)
-        
-        logger.info(f"Logo creado exitosamente: {logo.nombre}")
-        
+        is_multipart = request.headers.get("content-type", "").startswith("multipart/form-data")
+
+        # Rechazo temprano por Content-Length, sin leer el body
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body_bytes(is_multipart):
+            raise UploadTooLarge("Content-Length demasiado grande")
+
+        async def release_blob(stored: StoredBlob) -> None:
+            await _release_blobs(db, logo_storage, [{"sha256": stored.sha256}])
+
+        async def reserve_blob(sha256: str) -> None:
+            # Si el blob estaba marcado para borrar (un logo eliminado con la misma
+            # imagen), deja de estarlo antes de deduplicarlo
+            await reserve_blobs(db, [sha256])
+
+        try:
+            if is_multipart:
+                nombre, blob = await receive_multipart_logo(
+                    request,
+                    logo_storage,
+                    release_blob=release_blob,
+                    reserve_blob=reserve_blob
+                )
+            else:
+                nombre, blob = await _receive_json_logo(request, logo_storage, reserve_blob)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Imagen inválida: {str(e)}"
+            )
+
+        try:
+            # Si la misma imagen ya fue procesada se reutilizan sus derivados
+            processed = await db.logos.find_one(
+                {"sha256": blob.sha256, "processing_status": STATUS_READY},
+                {"_id": 0, "variants": 1}
+            )
+            if processed:
+                await reserve_blobs(db, logo_hashes(processed))
+
+            # Los logos nuevos van al final del slider
+            last = await db.logos.find_one({}, {"_id": 0, "orden": 1}, sort=[("orden", -1)])
+
+            logo = Logo(
+                nombre=nombre,
+                content_type=blob.content_type,
+                size=blob.size,
+                sha256=blob.sha256,
+                processing_status=STATUS_READY if processed else STATUS_PENDING,
+                variants=processed["variants"] if processed else {},
+                orden=last.get("orden", -1) + 1 if last else 0,
+                created_at=datetime.utcnow()
+            )
+
+            logo_dict = logo.dict()
+            result = await db.logos.insert_one(logo_dict)
+        except BaseException:
+            # Sin el documento del logo nadie referencia el blob recién guardado
+            await release_blob(blob)
+            raise
+
+        _notify_logos_changed(db, logo_storage, cache)
+
+        if not processed:
+            # Al terminar el procesamiento el sprite se regenera con el derivado chico
+            schedule_logo_processing(
+                db.logos,
+                logo_storage,
+                blob.sha256,
+                on_change=lambda: _notify_logos_changed(db, logo_storage, cache)
+            )
+
+        logger.info("Logo creado exitosamente: %s", logo.nombre)
+
         return {
             "success": True,
             "message": "Logo agregado exitosamente",
-            "id": logo.id
+            "id": logo.id,
+            "processing_status": logo.processing_status,
+            "imagen_url": logo_image_url(logo_dict, SLIDER_VARIANT)
         }
-    
+
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail=f"La imagen supera el tamaño máximo de {LOGO_MAX_BYTES / (1024 * 1024):g} MB"
+        )
+    except (HTTPException, RequestValidationError):
+        raise
     except Exception as e:
-        logger.error(f"Error al crear logo: {str(e)}")
+        logger.error("Error al crear logo: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Error al agregar el logo"
         )
 
 @router.get("/logos")
-async def get_logos():
+async def get_logos(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por coma"),
+    meta: bool = Query(False, description="Solo metadatos, sin las URLs de imagen"),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache)
+):
     """
-    Obtiene todos los logos para el slider
+    Obtiene todos los logos para el slider (solo metadatos, las imágenes se piden por URL).
+    La respuesta serializada se cachea, por selección de campos, hasta la próxima
+    escritura sobre los logos.
     """
     try:
-        # Proyección para optimizar la consulta
-        projection = {
-            "_id": 1,
-            "id": 1,
-            "nombre": 1,
-            "imagen_base64": 1,
-            "created_at": 1
-        }
-        
-        logos = await logos_collection.find({}, projection).sort("created_at", 1).to_list(1000)
-        
-        # Convertir ObjectId a string
-        for logo in logos:
-            logo["_id"] = str(logo["_id"])
-            if "created_at" in logo:
-                logo["created_at"] = logo["created_at"].isoformat()
-        
-        return {
-            "success": True,
-            "logos": logos,
-            "total": len(logos)
-        }
-    
+        try:
+            requested, projection = select_fields(fields, meta, LOGO_FIELDS, heavy=LOGO_HEAVY_FIELDS)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+
+        key = cache_key("list", requested, LOGO_FIELDS)
+        cached = cache.get(LOGOS_CACHE_NAMESPACE, key)
+
+        if cached is None:
+            # La versión se toma antes de consultar: si cambia en el medio no se cachea
+            version = cache.version(LOGOS_CACHE_NAMESPACE)
+
+            logos = await db.logos.find({}, projection).sort(LOGO_ORDER).to_list(None)
+
+            # Reemplazar los derivados por sus URLs (ObjectId y datetime los codifica orjson)
+            for index, logo in enumerate(logos):
+                if "imagen_url" in requested:
+                    logo["imagen_url"] = logo_image_url(logo, SLIDER_VARIANT)
+                if "imagen_original_url" in requested:
+                    logo["imagen_original_url"] = logo_image_url(logo)
+                if "variantes" in requested:
+                    logo["variantes"] = {
+                        name: logo_image_url(logo, name) for name in logo.get("variants") or {}
+                    }
+                logos[index] = trim_fields(logo, requested)
+
+            body = dumps({"success": True, "logos": logos, "total": len(logos)})
+            cached = cache.put(LOGOS_CACHE_NAMESPACE, key, body, version)
+
+        return await cached_response(request, cache, cached, {"Cache-Control": LIST_CACHE_CONTROL})
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error al obtener logos: {str(e)}")
+        logger.error("Error al obtener logos: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Error al obtener los logos"
         )
 
+@router.get("/logos/sprite")
+async def get_logo_sprite(
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage),
+    cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Manifiesto del sprite del slider: URL versionada de la imagen y la posición de
+    cada logo dentro de ella. La landing solo necesita este JSON y una imagen.
+    """
+    try:
+        cached = cache.get(LOGOS_CACHE_NAMESPACE, "sprite")
+
+        if cached is None:
+            version = cache.version(LOGOS_CACHE_NAMESPACE)
+            manifest = await get_sprite_manifest(db)
+
+            if manifest is None:
+                # Todavía no se generó: se pide la generación y el cliente usa las imágenes sueltas
+                _notify_logos_changed(db, logo_storage, cache)
+                manifest = {}
+
+            sha256 = manifest.get("sha256")
+            body = dumps({
+                "success": True,
+                "sprite_url": sprite_image_url(sha256) if sha256 else None,
+                "width": manifest.get("width", 0),
+                "height": manifest.get("height", 0),
+                "scale": manifest.get("scale", 1),
+                "logos": manifest.get("logos", [])
+            })
+            cached = cache.put(LOGOS_CACHE_NAMESPACE, "sprite", body, version)
+
+        return await cached_response(request, cache, cached, {"Cache-Control": LIST_CACHE_CONTROL})
+
+    except Exception as e:
+        logger.error("Error al obtener el sprite de logos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al obtener el sprite de logos"
+        )
+
+@router.get("/logos/sprite/{sprite_file}")
+async def get_logo_sprite_image(
+    sprite_file: str,
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage)
+):
+    """
+    Imagen del sprite, direccionada por su hash: se cachea para siempre. Se sirve
+    también la generación anterior, para clientes con el manifiesto viejo.
+    """
+    try:
+        version, _, extension = sprite_file.partition(".")
+        manifest = await get_sprite_manifest(db) or {}
+
+        candidates = [manifest.get("sha256"), manifest.get("previous_sha256")]
+        sha256 = next(
+            (candidate for candidate in candidates if candidate and candidate[:URL_HASH_LENGTH] == version),
+            None
+        )
+
+        if extension != "webp" or sha256 is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Sprite no encontrado"
+            )
+
+        etag = f'"{sha256}"'
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        stored = await logo_storage.open(sha256)
+        if stored is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Sprite no encontrado"
+            )
+
+        blob, chunks = stored
+        headers["Content-Length"] = str(blob.size)
+
+        return StreamingResponse(chunks, media_type=blob.content_type, headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al obtener la imagen del sprite: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al obtener la imagen del sprite"
+        )
+
+@router.get("/logos/{logo_id}/image")
+async def get_logo_image(
+    logo_id: str,
+    request: Request,
+    variant: Optional[str] = None,
+    v: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage),
+    cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Devuelve los bytes de la imagen de un logo (o de un derivado) en streaming,
+    con soporte de caché HTTP
+    """
+    try:
+        logo = await db.logos.find_one({"id": logo_id}, {"_id": 0})
+
+        if logo is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Logo no encontrado"
+            )
+
+        if not logo.get("sha256") and logo.get("imagen_base64"):
+            logo = await _migrate_legacy_logo(db.logos, logo_storage, cache, logo)
+
+        sha256 = logo["sha256"]
+        if variant and variant in (logo.get("variants") or {}):
+            sha256 = logo["variants"][variant]["sha256"]
+
+        etag = f'"{sha256}"'
+
+        # Solo las URLs que traen el hash correcto se pueden cachear para siempre
+        if v and v == sha256[:URL_HASH_LENGTH]:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = REVALIDATE_CACHE_CONTROL
+
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        created_at = logo.get("created_at")
+        if isinstance(created_at, datetime):
+            headers["Last-Modified"] = format_datetime(
+                created_at.replace(tzinfo=timezone.utc), usegmt=True
+            )
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        stored = await logo_storage.open(sha256)
+        if stored is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Imagen del logo no encontrada"
+            )
+
+        blob, chunks = stored
+        headers["Content-Length"] = str(blob.size)
+
+        return StreamingResponse(chunks, media_type=blob.content_type, headers=headers)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al obtener imagen del logo: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al obtener la imagen del logo"
+        )
+
 @router.delete("/logos/{logo_id}")
-async def delete_logo(logo_id: str):
+async def delete_logo(
+    logo_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage),
+    cache: ResponseCache = Depends(get_response_cache)
+):
     """
     Elimina un logo del slider
     """
     try:
-        result = await logos_collection.delete_one({"id": logo_id})
-        
-        if result.deleted_count == 0:
+        logo = await db.logos.find_one_and_delete(
+            {"id": logo_id},
+            {"sha256": 1, "variants": 1}
+        )
+
+        if logo is None:
             raise HTTPException(
                 status_code=404,
                 detail="Logo no encontrado"
             )
-        
-        logger.info(f"Logo eliminado: {logo_id}")
-        
+
+        _notify_logos_changed(db, logo_storage, cache)
+        await _release_blobs(db, logo_storage, [logo])
+
+        logger.info("Logo eliminado: %s", logo_id)
+
         return {
             "success": True,
             "message": "Logo eliminado exitosamente"
         }
-    
+
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error al eliminar logo: {str(e)}")
+        logger.error("Error al eliminar logo: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Error al eliminar el logo"
         )
+
+@router.patch("/logos/order")
+async def reorder_logos(
+    order: LogoOrder,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage),
+    cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Aplica un orden completo del slider con un solo bulk_write. Los logos que no
+    vienen en la lista quedan al final, en su orden actual.
+    """
+    try:
+        if len(set(order.ids)) != len(order.ids):
+            raise HTTPException(
+                status_code=400,
+                detail="La lista de logos tiene ids repetidos"
+            )
+
+        current = await db.logos.find({}, {"_id": 0, "id": 1, "orden": 1}).sort(LOGO_ORDER).to_list(None)
+        positions = {logo["id"]: logo.get("orden") for logo in current}
+
+        unknown = [logo_id for logo_id in order.ids if logo_id not in positions]
+        if unknown:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Logos no encontrados: {', '.join(unknown)}"
+            )
+
+        requested = set(order.ids)
+        ids = order.ids + [logo["id"] for logo in current if logo["id"] not in requested]
+
+        # Solo se escriben los logos que cambian de posición
+        operations = [
+            UpdateOne({"id": logo_id}, {"$set": {"orden": position}})
+            for position, logo_id in enumerate(ids)
+            if positions[logo_id] != position
+        ]
+        if operations:
+            await db.logos.bulk_write(operations, ordered=False)
+            _notify_logos_changed(db, logo_storage, cache)
+
+        logger.info("Orden de logos actualizado: %s cambios", len(operations))
+
+        return {
+            "success": True,
+            "message": "Orden de logos actualizado",
+            "actualizados": len(operations)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al ordenar logos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al actualizar el orden de los logos"
+        )
+
+@router.post("/logos/batch-delete")
+async def delete_logos(
+    batch: LogoBatchDelete,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    logo_storage: LogoStorage = Depends(get_logo_storage),
+    cache: ResponseCache = Depends(get_response_cache)
+):
+    """
+    Elimina varios logos del slider a la vez: un solo delete_many, una sola
+    invalidación de la caché y una sola regeneración del sprite
+    """
+    try:
+        ids = list(dict.fromkeys(batch.ids))
+        logos = await db.logos.find(
+            {"id": {"$in": ids}},
+            {"_id": 0, "id": 1, "sha256": 1, "variants": 1}
+        ).to_list(len(ids))
+
+        deleted = 0
+        if logos:
+            result = await db.logos.delete_many({"id": {"$in": [logo["id"] for logo in logos]}})
+            deleted = result.deleted_count
+            _notify_logos_changed(db, logo_storage, cache)
+            await _release_blobs(db, logo_storage, logos)
+
+        found = {logo["id"] for logo in logos}
+        logger.info("Logos eliminados en lote: %s", deleted)
+
+        return {
+            "success": True,
+            "message": f"{deleted} logos eliminados",
+            "eliminados": deleted,
+            "no_encontrados": [logo_id for logo_id in ids if logo_id not in found]
+        }
+
+    except Exception as e:
+        logger.error("Error al eliminar logos: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al eliminar los logos"
+        )
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from models.status import StatusCheck, StatusCheckCreate
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from core.database import get_db
+from core.serialization import json_response, model_response
+from core.timeutil import to_utc_naive
+from services.status_rollups import (
+    MAX_SERIES_POINTS,
+    RAW_COLLECTION,
+    TIERS,
+    choose_resolution,
+    query_series,
+    raw_expire_at,
+    record_heartbeat
+)
+from typing import List, Optional
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["status"])
+
+DEFAULT_SERIES_RANGE = timedelta(hours=24)
+
+@router.post("/status", response_model=StatusCheck)
+async def create_status_check(input: StatusCheckCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
+    status_dict = input.model_dump()
+    status_obj = StatusCheck(**status_dict)
+
+    # timestamp se guarda como fecha: lo necesitan el TTL (expire_at) y los rollups
+    doc = status_obj.model_dump()
+    doc['timestamp'] = to_utc_naive(doc['timestamp'])
+    doc['expire_at'] = raw_expire_at(doc['timestamp'])
+
+    _ = await db[RAW_COLLECTION].insert_one(doc)
+    await record_heartbeat(db, status_obj.client_name, doc['timestamp'])
+    return model_response(status_obj)
+
+@router.get("/status", response_model=List[StatusCheck])
+async def get_status_checks(db: AsyncIOMotorDatabase = Depends(get_db)):
+    # Proyección para optimizar la consulta: los documentos ya tienen la forma de
+    # StatusCheck, se serializan directo sin construir un modelo por fila
+    projection = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+    cursor = db[RAW_COLLECTION].find({}, projection).sort("timestamp", -1)
+    status_checks = await cursor.limit(1000).to_list(1000)
+
+    # Las fechas vuelven de MongoDB sin zona: se devuelven en UTC, como POST /api/status
+    return json_response(status_checks, utc=True)
+
+@router.get("/status/series")
+async def get_status_series(
+    desde: Optional[datetime] = Query(None, description="Inicio del rango (por defecto, 24 h antes de hasta)"),
+    hasta: Optional[datetime] = Query(None, description="Fin del rango (por defecto, ahora)"),
+    resolution: str = Query("auto", pattern="^(auto|minute|hour)$", description="Resolución de la serie"),
+    client_name: Optional[str] = Query(None, description="Filtrar por cliente"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Heartbeats agregados por minuto u hora y por client_name. Con resolution=auto se
+    lee el nivel más fino que cubre el rango, así el costo no depende del volumen crudo.
+    """
+    try:
+        hasta = to_utc_naive(hasta) if hasta else datetime.utcnow()
+        desde = to_utc_naive(desde) if desde else hasta - DEFAULT_SERIES_RANGE
+        if desde >= hasta:
+            raise HTTPException(
+                status_code=400,
+                detail="El inicio del rango debe ser anterior al fin"
+            )
+
+        if resolution == "auto":
+            resolution = choose_resolution(desde, hasta)
+
+        series = await query_series(db, resolution, desde, hasta, client_name)
+
+        return json_response({
+            "success": True,
+            "resolution": resolution,
+            "step_seconds": int(TIERS[resolution].step.total_seconds()),
+            "desde": desde,
+            "hasta": hasta,
+            "series": series,
+            "truncated": len(series) == MAX_SERIES_POINTS
+        }, utc=True)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error al obtener la serie de status: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error al obtener la serie de status"
+        )
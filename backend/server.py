@@ -1,26 +1,85 @@
 from fastapi import FastAPI, APIRouter
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List
-import uuid
-from datetime import datetime, timezone
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env', override=False)
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+from core.database import create_mongo_client
+from core.indexes import ensure_indexes
+from core.cache import create_response_cache
+from core.serialization import FastJSONResponse
+from core.compression import CompressionMiddleware, compression_enabled
+from core.log import RequestContextMiddleware, configure_logging, requests_logging_enabled
+from core.metrics import (
+    MetricsMiddleware,
+    mark_dead_workers,
+    mark_worker_exited,
+    metrics_enabled,
+    metrics_endpoint
+)
+from services.logo_storage import create_logo_storage
+from services.logo_pipeline import shutdown_pipeline
+from services.contact_import import shutdown_import_pool
+from services.logo_sprite import shutdown_sprite_builder
+from services.logo_blob_gc import schedule_blob_collection, shutdown_blob_collector
+from services.contact_ingest import create_contact_batcher
+from services.cache_sync import create_cache_sync
+from services.rate_limit import create_rate_limit_policy
+from services.idempotency import IdempotentReplay, create_idempotency_store, idempotent_replay_handler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if metrics_enabled():
+        mark_dead_workers()
+
+    # MongoDB connection: un único cliente (y pool) por proceso, compartido por todos los routers
+    client = create_mongo_client()
+    app.state.mongo_client = client
+    app.state.db = client[os.environ['DB_NAME']]
+    app.state.logo_storage = create_logo_storage(app.state.db)
+    app.state.response_cache = create_response_cache()
+    app.state.rate_limit_policy = create_rate_limit_policy(app.state.db)
+    app.state.idempotency_store = create_idempotency_store(app.state.db)
+
+    if os.environ.get('MONGO_ENSURE_INDEXES', '1') == '1':
+        await ensure_indexes(app.state.db)
+
+    # Con varios workers, las escrituras de uno invalidan la caché de los demás
+    app.state.cache_sync = create_cache_sync(app.state.db, app.state.response_cache)
+    if app.state.cache_sync is not None:
+        app.state.cache_sync.start()
+
+    app.state.contact_batcher = create_contact_batcher(app.state.db)
+    if app.state.contact_batcher is not None:
+        app.state.contact_batcher.start()
+
+    # Retoma el borrado diferido de blobs marcados antes de un reinicio
+    schedule_blob_collection(app.state.db, app.state.logo_storage)
+
+    yield
+
+    if app.state.cache_sync is not None:
+        await app.state.cache_sync.stop()
+    if app.state.contact_batcher is not None:
+        await app.state.contact_batcher.stop()
+    await shutdown_blob_collector()
+    await shutdown_sprite_builder()
+    await shutdown_pipeline()
+    await shutdown_import_pool()
+    client.close()
+    if metrics_enabled():
+        mark_worker_exited()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_exception_handler(IdempotentReplay, idempotent_replay_handler)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -28,44 +87,14 @@ api_router = APIRouter(prefix="/api")
 # Import contact routes
 from routes.contact_routes import router as contact_router
 from routes.logo_routes import router as logo_router
+from routes.status_routes import router as status_router
 
 
-# Define Models
-class StatusCheck(BaseModel):
-    model_config = ConfigDict(extra="ignore")  # Ignore MongoDB's _id field
-    
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class StatusCheckCreate(BaseModel):
-    client_name: str
-
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
-@api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.model_dump()
-    status_obj = StatusCheck(**status_dict)
-    
-    # Convert to dict and serialize datetime to ISO string for MongoDB
-    doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    
-    _ = await db.status_checks.insert_one(doc)
-    return status_obj
-
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    # Proyección para optimizar la consulta
-    projection = {"_id": 1, "id": 1, "client_name": 1, "timestamp": 1}
-    status_checks = await db.status_checks.find({}, projection).to_list(1000)
-    
-    return [StatusCheck(**status_check) for status_check in status_checks]
-
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -75,6 +104,9 @@ app.include_router(contact_router)
 # Include logo routes
 app.include_router(logo_router)
 
+# Include status routes
+app.include_router(status_router)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -83,13 +115,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+# Compresión según Accept-Encoding (las respuestas cacheadas ya llegan precomprimidas)
+if compression_enabled():
+    app.add_middleware(CompressionMiddleware)
+
+# Request ID y registro de cada request (método, ruta, status, duración)
+app.add_middleware(RequestContextMiddleware, log_requests=requests_logging_enabled())
+
+# Métricas de Prometheus: el middleware va último para envolver a todos los demás
+if metrics_enabled():
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+    app.add_middleware(MetricsMiddleware)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+# Configure logging: JSON por una cola, el formateo y la escritura van en otro thread
+configure_logging()
+logger = logging.getLogger(__name__)
\ No newline at end of file
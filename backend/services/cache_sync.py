@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Optional, Set
+
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from core.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSIONS_COLLECTION = "cache_versions"
+
+# Colección -> espacio de nombres de la caché que se arma con ella. El sprite se
+# cachea en el mismo espacio que el listado (LOGOS_CACHE_NAMESPACE en logo_routes)
+SYNCED_COLLECTIONS: Dict[str, str] = {
+    "logos": "logos",
+    "logo_sprites": "logos",
+}
+
+# $changeStream solo existe en replica sets y clusters sharded
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 115}
+# El token ya no sirve (salió del oplog o es inválido): hay que empezar de cero
+RESUME_FAILED_CODES = {260, 280, 286}
+
+MAX_BACKOFF_SECONDS = 30
+
+
+async def bump_cache_version(db, namespace: str) -> None:
+    """Avisa a los workers en modo polling que el espacio de nombres cambió"""
+    await db[CACHE_VERSIONS_COLLECTION].update_one(
+        {"_id": namespace},
+        {"$inc": {"version": 1}},
+        upsert=True
+    )
+
+
+class CacheSync:
+    """
+    Mantiene la caché de respuestas de este proceso al día con las escrituras de los
+    demás workers. Con un change stream sobre las colecciones cacheadas, cada cambio
+    invalida el espacio de nombres correspondiente; después de una desconexión se
+    retoma desde el último resume token. Si el servidor no soporta change streams
+    (MongoDB standalone), se consulta cada `poll_interval` segundos un contador de
+    versión en cache_versions, que cada invalidación local incrementa.
+    """
+
+    def __init__(self, db, cache: ResponseCache, collections: Dict[str, str] = SYNCED_COLLECTIONS,
+                 mode: str = "auto", poll_interval: float = 1.0):
+        self.db = db
+        self.cache = cache
+        self.collections = collections
+        self.namespaces = sorted(set(collections.values()))
+        self.poll_interval = poll_interval
+        # "change_stream" o "polling", una vez que se sabe qué soporta el servidor
+        self.mode: Optional[str] = "polling" if mode == "polling" else None
+        self._resume_token = None
+        self._task: Optional[asyncio.Task] = None
+        self._bumps: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self.cache.add_invalidation_listener(self._on_local_invalidate)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._bumps:
+            await asyncio.gather(*self._bumps, return_exceptions=True)
+
+    def _on_local_invalidate(self, namespace: str) -> None:
+        # Con change streams los demás workers ven la escritura misma; el contador
+        # solo hace falta mientras no se sabe o en modo polling
+        if namespace not in self.namespaces or self.mode == "change_stream":
+            return
+        task = asyncio.create_task(self._bump(namespace))
+        self._bumps.add(task)
+        task.add_done_callback(self._bumps.discard)
+
+    async def _bump(self, namespace: str) -> None:
+        try:
+            await bump_cache_version(self.db, namespace)
+        except Exception as e:
+            logger.error("No se pudo incrementar la versión de caché de %s: %s", namespace, e)
+
+    def _invalidate_all(self) -> None:
+        for namespace in self.namespaces:
+            self.cache.invalidate(namespace, notify=False)
+
+    async def _run(self) -> None:
+        if self.mode is None and await self._watch() is False:
+            logger.warning("Change streams no disponibles: la caché se sincroniza por polling")
+        self.mode = "polling"
+        await self._poll()
+
+    async def _watch(self) -> bool:
+        """Procesa el change stream indefinidamente; devuelve False si el servidor no lo soporta"""
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": list(self.collections)}}},
+            # Solo interesa qué colección cambió, no el documento
+            {"$project": {"ns": 1, "operationType": 1}},
+        ]
+        failures = 0
+
+        while True:
+            try:
+                async with self.db.watch(pipeline, resume_after=self._resume_token) as stream:
+                    change = await stream.try_next()
+                    if self.mode != "change_stream":
+                        logger.info("Sincronización de caché por change stream")
+                    self.mode = "change_stream"
+                    failures = 0
+                    # Sin token no se sabe qué cambió mientras no se escuchaba
+                    if self._resume_token is None:
+                        self._invalidate_all()
+
+                    while stream.alive:
+                        if change is not None and not self._apply(change):
+                            break
+                        self._resume_token = stream.resume_token
+                        change = await stream.try_next()
+
+            except OperationFailure as e:
+                if self.mode is None and e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    return False
+                if e.code in RESUME_FAILED_CODES:
+                    logger.warning("No se pudo retomar el change stream, se reinicia: %s", e)
+                    self._resume_token = None
+                    continue
+                failures += 1
+                logger.error("Error en el change stream de caché: %s", e)
+            except ConnectionFailure as e:
+                failures += 1
+                logger.warning("Change stream de caché desconectado: %s", e)
+            except Exception as e:
+                if self.mode is None:
+                    logger.warning("No se pudo abrir el change stream de caché: %s", e)
+                    return False
+                failures += 1
+                logger.error("Error en el change stream de caché: %s", e)
+
+            await asyncio.sleep(min(2 ** failures, MAX_BACKOFF_SECONDS))
+
+    def _apply(self, change: dict) -> bool:
+        """Invalida según el evento; devuelve False si el stream hay que reabrirlo de cero"""
+        if change["operationType"] in ("invalidate", "dropDatabase"):
+            # Después de estos eventos el stream se cierra y el token no se puede retomar
+            self._resume_token = None
+            self._invalidate_all()
+            return False
+
+        namespace = self.collections.get(change.get("ns", {}).get("coll"))
+        if namespace is not None:
+            self.cache.invalidate(namespace, notify=False)
+        return True
+
+    async def _poll(self) -> None:
+        seen: Optional[Dict[str, int]] = None
+
+        while True:
+            try:
+                cursor = self.db[CACHE_VERSIONS_COLLECTION].find({"_id": {"$in": self.namespaces}})
+                versions = {document["_id"]: document["version"] async for document in cursor}
+                if seen is not None:
+                    for namespace in self.namespaces:
+                        if versions.get(namespace) != seen.get(namespace):
+                            self.cache.invalidate(namespace, notify=False)
+                seen = versions
+            except Exception as e:
+                # Sin poder leer las versiones no hay forma de saber si la caché sigue válida
+                logger.error("Error al consultar las versiones de caché: %s", e)
+                seen = None
+                self._invalidate_all()
+
+            await asyncio.sleep(self.poll_interval)
+
+
+def create_cache_sync(db, cache: ResponseCache) -> Optional[CacheSync]:
+    """
+    CACHE_SYNC_MODE: auto (change stream si está disponible, si no polling), polling
+    u off (un solo worker: la invalidación local alcanza)
+    """
+    mode = os.environ.get("CACHE_SYNC_MODE", "auto")
+    if mode == "off":
+        return None
+
+    return CacheSync(
+        db,
+        cache,
+        mode=mode,
+        poll_interval=float(os.environ.get("CACHE_SYNC_POLL_SECONDS", "1"))
+    )
+
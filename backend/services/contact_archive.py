@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from bson import ObjectId
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Directorio compartido por todos los workers (con varios pods, un volumen montado)
+ARCHIVE_DIR = Path(os.environ.get("CONTACT_ARCHIVE_DIR", Path(__file__).parent.parent / "archive" / "contactos"))
+ARCHIVE_AFTER_DAYS = int(os.environ.get("CONTACT_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_COMPRESSION = "zstd"
+
+# Estado del archivo: hasta qué fecha se movieron contactos
+ARCHIVE_STATE_COLLECTION = "contact_archive"
+ARCHIVE_STATE_ID = "contactos"
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("id", pa.string()),
+    ("nombre", pa.string()),
+    ("email", pa.string()),
+    ("telefono", pa.string()),
+    ("empresa", pa.string()),
+    ("tipo_empresa", pa.string()),
+    ("mensaje", pa.string()),
+    ("created_at", pa.timestamp("ms")),
+])
+ARCHIVE_FIELDS = ARCHIVE_SCHEMA.names
+
+# (created_at, _id) de la última fila entregada, en orden descendente
+Position = Tuple[datetime, ObjectId]
+
+
+def partition_dir(year: int, month: int) -> Path:
+    """Una partición por mes, con nombres estilo Hive (year=2024/month=03)"""
+    return ARCHIVE_DIR / f"year={year}" / f"month={month:02d}"
+
+
+def _months_desc(desde: datetime, hasta: datetime) -> List[Tuple[int, int]]:
+    """Meses que tocan el rango [desde, hasta), del más reciente al más antiguo"""
+    year, month = hasta.year, hasta.month
+    months = []
+    while (year, month) >= (desde.year, desde.month):
+        months.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months
+
+
+def _write_partition(rows: List[dict], year: int, month: int) -> Path:
+    """
+    Escribe las filas de un mes en su partición. El archivo se nombra con el primer
+    _id del grupo: si el job se corta antes de borrar de MongoDB y se vuelve a correr,
+    el mismo lote reescribe el mismo archivo en lugar de duplicar filas.
+    """
+    directory = partition_dir(year, month)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"part-{rows[0]['_id']}.parquet"
+    table = pa.Table.from_pylist(rows, schema=ARCHIVE_SCHEMA)
+    temporary = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, temporary, compression=ARCHIVE_COMPRESSION)
+    os.replace(temporary, path)
+    return path
+
+
+def _archive_row(contacto: dict) -> dict:
+    row = {field: contacto.get(field) for field in ARCHIVE_FIELDS}
+    row["_id"] = str(contacto["_id"])
+    return row
+
+
+async def archive_contacts(db, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                           batch_size: int = ARCHIVE_BATCH_SIZE) -> dict:
+    """
+    Mueve a Parquet los contactos con created_at anterior a `older_than_days` días:
+    por lotes, primero escribe las particiones del lote y recién después lo borra
+    de MongoDB. Los contadores diarios no se tocan (las estadísticas siguen
+    incluyendo los contactos archivados).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    projection = {field: 1 for field in ARCHIVE_FIELDS}
+    archived = 0
+    files = set()
+
+    while True:
+        cursor = db.contactos.find({"created_at": {"$lt": cutoff}}, projection)
+        batch = await cursor.sort([("created_at", 1), ("_id", 1)]).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        by_month = {}
+        for contacto in batch:
+            created_at = contacto["created_at"]
+            by_month.setdefault((created_at.year, created_at.month), []).append(_archive_row(contacto))
+
+        for (year, month), rows in by_month.items():
+            files.add(await asyncio.to_thread(_write_partition, rows, year, month))
+
+        result = await db.contactos.delete_many({"_id": {"$in": [contacto["_id"] for contacto in batch]}})
+        archived += result.deleted_count
+        logger.info("Contactos archivados: %s (hasta %s)", archived, batch[-1]["created_at"].isoformat())
+
+    # Solo se avanza: una corrida con menos días no retrocede el límite del archivo
+    state = await db[ARCHIVE_STATE_COLLECTION].find_one({"_id": ARCHIVE_STATE_ID}) or {}
+    if state.get("cutoff") is None or cutoff > state["cutoff"]:
+        await db[ARCHIVE_STATE_COLLECTION].update_one(
+            {"_id": ARCHIVE_STATE_ID},
+            {"$set": {"cutoff": cutoff, "updated_at": datetime.utcnow()}, "$inc": {"archivados": archived}},
+            upsert=True
+        )
+
+    return {"archivados": archived, "archivos": len(files), "hasta": cutoff}
+
+
+async def archive_cutoff(db) -> Optional[datetime]:
+    """Fecha límite del archivo: los contactos anteriores pueden estar en Parquet"""
+    state = await db[ARCHIVE_STATE_COLLECTION].find_one({"_id": ARCHIVE_STATE_ID}, {"cutoff": 1})
+    return state.get("cutoff") if state else None
+
+
+def needs_archive(cutoff: Optional[datetime], desde: Optional[datetime]) -> bool:
+    """El archivo solo se lee si el request pide explícitamente un rango anterior al límite"""
+    return cutoff is not None and desde is not None and desde < cutoff
+
+
+def _read_month(year: int, month: int, desde: datetime, hasta: datetime,
+                after: Optional[Position], columns: List[str]) -> List[dict]:
+    directory = partition_dir(year, month)
+    if not directory.is_dir():
+        return []
+
+    created_at = ds.field("created_at")
+    expression = (created_at >= pa.scalar(desde, pa.timestamp("ms"))) & (created_at < pa.scalar(hasta, pa.timestamp("ms")))
+    if after is not None:
+        after_at = pa.scalar(after[0], pa.timestamp("ms"))
+        expression &= (created_at < after_at) | ((created_at == after_at) & (ds.field("_id") < str(after[1])))
+
+    # _id y created_at se leen siempre: ordenan y arman el cursor
+    read_columns = list(dict.fromkeys(columns + ["_id", "created_at"]))
+    dataset = ds.dataset(directory, format="parquet", schema=ARCHIVE_SCHEMA)
+    table = dataset.to_table(columns=read_columns, filter=expression)
+    table = table.take(pc.sort_indices(table, sort_keys=[("created_at", "descending"), ("_id", "descending")]))
+
+    rows = table.to_pylist()
+    for row in rows:
+        row["_id"] = ObjectId(row["_id"])
+    return rows
+
+
+def _month_bounds(desde: datetime, hasta: datetime, after: Optional[Position]) -> datetime:
+    # El cursor acota el rango: no hace falta leer meses posteriores a la última fila
+    return min(hasta, after[0] + timedelta(milliseconds=1)) if after is not None else hasta
+
+
+async def read_archive_page(desde: datetime, hasta: datetime, after: Optional[Position],
+                            limit: int, columns: List[str] = ARCHIVE_FIELDS) -> List[dict]:
+    """Hasta `limit` contactos archivados del rango, después del cursor, en orden descendente"""
+    rows: List[dict] = []
+    for year, month in _months_desc(desde, _month_bounds(desde, hasta, after)):
+        rows.extend(await run_in_threadpool(_read_month, year, month, desde, hasta, after, columns))
+        if len(rows) >= limit:
+            break
+    return rows[:limit]
+
+
+async def iter_archive(desde: datetime, hasta: datetime,
+                       columns: List[str] = ARCHIVE_FIELDS) -> AsyncIterator[dict]:
+    """Recorre el archivo del rango mes a mes (memoria acotada a un mes), en orden descendente"""
+    for year, month in _months_desc(desde, hasta):
+        for row in await run_in_threadpool(_read_month, year, month, desde, hasta, None, columns):
+            yield row
+
+
+def _sort_key(contacto: dict) -> Position:
+    return contacto["created_at"], contacto["_id"]
+
+
+def merge_desc(first: List[dict], second: List[dict]) -> List[dict]:
+    """Une dos páginas ya ordenadas por (created_at, _id) descendente"""
+    return sorted(first + second, key=_sort_key, reverse=True)
+
+
+async def merge_streams_desc(first: AsyncIterator[dict], second: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    """Une dos flujos ordenados por (created_at, _id) descendente sin acumularlos"""
+    iterators = [first.__aiter__(), second.__aiter__()]
+    heads = []
+    for iterator in iterators:
+        heads.append(await anext(iterator, None))
+
+    while True:
+        candidates = [index for index, head in enumerate(heads) if head is not None]
+        if not candidates:
+            return
+        index = max(candidates, key=lambda candidate: _sort_key(heads[candidate]))
+        yield heads[index]
+        heads[index] = await anext(iterators[index], None)
@@ -0,0 +1,88 @@
+import csv
+import io
+import logging
+import zlib
+from typing import AsyncIterator
+
+from core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Documentos que Motor trae por cada round trip al servidor
+EXPORT_BATCH_SIZE = 1000
+# Filas acumuladas antes de emitir un bloque de la respuesta
+ROWS_PER_CHUNK = 500
+
+EXPORT_COLUMNS = [
+    ("Fecha", "created_at"),
+    ("Nombre", "nombre"),
+    ("Email", "email"),
+    ("Teléfono", "telefono"),
+    ("Empresa", "empresa"),
+    ("Tipo Empresa", "tipo_empresa"),
+    ("Mensaje", "mensaje"),
+]
+
+EXPORT_PROJECTION = {"_id": 0, **{field: 1 for _, field in EXPORT_COLUMNS}}
+
+
+def _export_value(contacto: dict, field: str):
+    value = contacto.get(field)
+    if field == "created_at" and value is not None:
+        return value.isoformat()
+    return value
+
+
+def _export_record(contacto: dict) -> dict:
+    return {field: contacto.get(field) for _, field in EXPORT_COLUMNS}
+
+
+async def iter_contacts_csv(cursor) -> AsyncIterator[bytes]:
+    """
+    Recorre el cursor de Motor y emite el CSV por bloques, sin acumular el resultado
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # BOM para que Excel detecte UTF-8 (acentos en nombres y empresas)
+    buffer.write("\ufeff")
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+
+    rows = 0
+    async for contacto in cursor:
+        writer.writerow([_export_value(contacto, field) or "" for _, field in EXPORT_COLUMNS])
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+    logger.info("Exportación CSV completada: %s contactos", rows)
+
+
+async def iter_contacts_ndjson(cursor) -> AsyncIterator[bytes]:
+    """Emite un objeto JSON por línea, agrupando las líneas en bloques"""
+    lines = []
+    rows = 0
+    async for contacto in cursor:
+        record = _export_record(contacto)
+        lines.append(dumps(record))
+        rows += 1
+        if len(lines) == ROWS_PER_CHUNK:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+    logger.info("Exportación NDJSON completada: %s contactos", rows)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Comprime en gzip un flujo de bloques sin bufferizarlo completo"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
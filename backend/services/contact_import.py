@@ -0,0 +1,453 @@
+import asyncio
+import codecs
+import csv
+import multiprocessing
+import os
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from pymongo.errors import BulkWriteError
+
+from core.timeutil import to_utc_naive
+from models.contact import ContactCreate
+from services.contact_export import EXPORT_COLUMNS
+from services.contact_search import SEARCH_FIELD, search_tokens
+from services.contact_stats import record_contacts
+
+IMPORT_MAX_BYTES = int(os.environ.get("CONTACT_IMPORT_MAX_BYTES", 64 * 1024 * 1024))
+# Un registro (o línea NDJSON) más largo es un error de fila: una comilla sin cerrar
+# no puede tragarse el resto del archivo
+IMPORT_MAX_RECORD_CHARS = int(os.environ.get("CONTACT_IMPORT_MAX_RECORD_CHARS", 64 * 1024))
+# Filas validadas juntas y escritas en un mismo insert_many
+IMPORT_BATCH_SIZE = 1000
+# Lotes validándose en el pool de procesos a la vez (acota la memoria)
+MAX_BATCHES_IN_FLIGHT = int(os.environ.get("CONTACT_IMPORT_BATCHES_IN_FLIGHT", "3"))
+# El reporte lista como máximo estas filas con error (el total se informa igual)
+MAX_REPORTED_ERRORS = 1000
+# Pool propio: una importación grande no demora los derivados ni el sprite de los logos
+IMPORT_WORKERS = int(os.environ.get("CONTACT_IMPORT_WORKERS", "2"))
+
+# Columnas aceptadas: los campos del formulario, los del documento y los encabezados
+# del export CSV, así un export se puede volver a importar tal cual
+COLUMN_ALIASES: Dict[str, str] = {
+    "nombre": "nombre",
+    "email": "email",
+    "telefono": "telefono",
+    "empresa": "empresa",
+    "tipoempresa": "tipoEmpresa",
+    "tipo_empresa": "tipoEmpresa",
+    "mensaje": "mensaje",
+    "created_at": "created_at",
+    **{header.lower(): field for header, field in EXPORT_COLUMNS},
+}
+COLUMN_ALIASES["tipo empresa"] = "tipoEmpresa"
+COLUMN_ALIASES["fecha"] = "created_at"
+
+CREATED_AT = TypeAdapter(datetime)
+
+# (número de fila, valores por campo); la fila se numera desde 1 sin contar encabezados
+Row = Tuple[int, dict]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class ImportFailed(Exception):
+    """
+    La importación se cortó. Si ya se habían leído filas, `report` tiene el resumen
+    de lo que quedó guardado (las filas anteriores al error se importan igual).
+    """
+
+    def __init__(self, message: str, report: Optional[dict] = None):
+        super().__init__(message)
+        self.report = report
+
+
+class ImportTooLarge(ImportFailed):
+    """El archivo supera CONTACT_IMPORT_MAX_BYTES: el llamador debe responder 413"""
+
+
+class InvalidImport(ImportFailed, ValueError):
+    """Archivo ilegible (encabezado o codificación): el llamador debe responder 400"""
+
+
+def get_import_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: el proceso del servidor tiene hilos (Motor) y no es seguro hacer fork
+        _executor = ProcessPoolExecutor(
+            max_workers=IMPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def shutdown_import_pool() -> None:
+    """Cierra el pool de validación (las importaciones en curso ya terminaron con sus requests)"""
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+async def limit_stream(chunks: AsyncIterator[bytes], max_bytes: int = IMPORT_MAX_BYTES) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise ImportTooLarge("Archivo demasiado grande")
+        yield chunk
+
+
+def _map_columns(values: Iterable[Tuple[str, object]]) -> dict:
+    row = {}
+    for column, value in values:
+        field = COLUMN_ALIASES.get(str(column).strip().lower())
+        if field is not None:
+            row[field] = value.strip() if isinstance(value, str) else value
+    return row
+
+
+def _ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """
+    Sigue el estado de comillas del lector csv a lo largo de una línea y devuelve si
+    termina dentro de un campo entre comillas. Como en csv, una comilla abre un campo
+    solo al principio del campo (en el medio es un carácter más) y "" es una comilla
+    escapada. Recorre solo la línea nueva, nunca lo acumulado del registro.
+    """
+    if '"' not in line:
+        return in_quotes
+
+    position = 0
+    if not in_quotes and line.startswith('"'):
+        in_quotes, position = True, 1
+    while True:
+        if in_quotes:
+            close = line.find('"', position)
+            if close == -1:
+                return True
+            if line.startswith('"', close + 1):
+                position = close + 2
+                continue
+            in_quotes, position = False, close + 1
+
+        # Fuera de comillas el resto del campo es literal hasta la próxima coma
+        comma = line.find(",", position)
+        if comma == -1:
+            return False
+        position = comma + 1
+        if line.startswith('"', position):
+            in_quotes, position = True, position + 1
+
+
+class _CsvRecords:
+    """
+    Arma registros CSV a partir de líneas: un campo entre comillas puede tener saltos
+    de línea. Un registro de más de max_chars (típicamente una comilla sin cerrar) se
+    corta en un error de una sola fila; sus líneas, salvo la primera, se vuelven a leer
+    una vez como registros nuevos, así el resto del archivo se importa igual.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        # (línea, ya releída); None es una línea que por sí sola supera el límite
+        self.lines: List[Tuple[Optional[str], bool]] = []
+        self.size = 0
+        self.in_quotes = False
+
+    def push(self, line: Optional[str]) -> Iterator[Optional[str]]:
+        """Emite los registros que cierra la línea; None por cada registro demasiado largo"""
+        queue = deque([(line, False)])
+        while queue:
+            line, replayed = queue.popleft()
+            self.lines.append((line, replayed))
+            if line is None:
+                self.size = self.max_chars + 1
+            else:
+                self.size += len(line)
+                self.in_quotes = _ends_in_quotes(line, self.in_quotes)
+
+            if self.size > self.max_chars:
+                # Cada línea se relee una sola vez: el costo sigue siendo lineal
+                lines = self.lines
+                self._reset()
+                queue.extendleft(reversed([(line, True) for line, replayed in lines[1:] if not replayed]))
+                yield None
+            elif not self.in_quotes:
+                record = "".join(line for line, _ in self.lines)
+                self._reset()
+                yield record
+
+    def finish(self) -> Optional[str]:
+        """El registro que quedó abierto al final del archivo, si hay"""
+        record = "".join(line for line, _ in self.lines) or None
+        self._reset()
+        return record
+
+    def _reset(self) -> None:
+        self.lines = []
+        self.size = 0
+        self.in_quotes = False
+
+
+async def _split_lines(chunks: AsyncIterator, newline, max_length: int) -> AsyncIterator:
+    """
+    Emite las líneas completas (con su salto) a medida que llegan los bloques. Una
+    línea de más de max_length se emite como None y se descarta hasta su salto, sin
+    acumularla en memoria.
+    """
+    parts = []
+    size = 0
+    skipping = False
+
+    async for chunk in chunks:
+        pieces = chunk.split(newline)
+        rest = pieces.pop()
+        for piece in pieces:
+            if skipping:
+                skipping = False
+                continue
+            if size + len(piece) >= max_length:
+                parts, size = [], 0
+                yield None
+                continue
+            parts.append(piece)
+            parts.append(newline)
+            yield newline[:0].join(parts)
+            parts, size = [], 0
+
+        if rest and not skipping:
+            size += len(rest)
+            parts.append(rest)
+            if size >= max_length:
+                parts, size = [], 0
+                skipping = True
+                yield None
+
+    if parts:
+        yield newline[:0].join(parts)
+
+
+async def _decode_utf8(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+async def parse_csv(chunks: AsyncIterator[bytes], max_record_chars: int = IMPORT_MAX_RECORD_CHARS) -> AsyncIterator[Row]:
+    """Lee un CSV (UTF-8, con o sin BOM) por bloques y emite una fila por registro"""
+    splitter = _CsvRecords(max_record_chars)
+    header: Optional[List[str]] = None
+    number = 0
+
+    def rows_from(records: Iterable[Optional[str]]):
+        nonlocal header, number
+        for record in records:
+            if record is None:
+                if header is None:
+                    raise InvalidImport("El encabezado del CSV es demasiado largo")
+                number += 1
+                yield number, {"__error__": "Registro CSV demasiado largo (¿comillas sin cerrar?)"}
+                continue
+
+            # Un registro por lector: un registro mal formado es un error de esa fila
+            # y no corta el resto del archivo
+            try:
+                values = next(csv.reader([record]), [])
+            except csv.Error as e:
+                if header is None:
+                    raise InvalidImport(f"CSV inválido: {str(e)}")
+                number += 1
+                yield number, {"__error__": f"CSV inválido: {str(e)}"}
+                continue
+
+            if header is None:
+                header = values
+                if not any(COLUMN_ALIASES.get(column.strip().lower()) for column in header):
+                    raise InvalidImport("El CSV no tiene un encabezado con columnas reconocidas")
+                continue
+            if not any(value.strip() for value in values):
+                continue
+            number += 1
+            yield number, _map_columns(zip(header, values))
+
+    try:
+        async for line in _split_lines(_decode_utf8(chunks), "\n", max_record_chars):
+            for row in rows_from(splitter.push(line)):
+                yield row
+
+        record = splitter.finish()
+        if record is not None and record.strip():
+            for row in rows_from([record]):
+                yield row
+    except UnicodeDecodeError:
+        raise InvalidImport("El CSV debe estar codificado en UTF-8")
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes], max_record_chars: int = IMPORT_MAX_RECORD_CHARS) -> AsyncIterator[Row]:
+    """Lee NDJSON por bloques: un objeto por línea. Las líneas mal formadas son errores de fila"""
+    number = 0
+
+    def parse(line: Optional[bytes]) -> Row:
+        if line is None:
+            return number, {"__error__": "Línea demasiado larga"}
+        try:
+            payload = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return number, {"__error__": "JSON inválido"}
+        if not isinstance(payload, dict):
+            return number, {"__error__": "Se esperaba un objeto JSON"}
+        return number, _map_columns(payload.items())
+
+    async for line in _split_lines(chunks, b"\n", max_record_chars):
+        if line is None or line.strip():
+            number += 1
+            yield parse(line)
+
+
+def _error_message(error: dict) -> str:
+    field = ".".join(str(part) for part in error["loc"]) or "fila"
+    return f"{field}: {error['msg']}"
+
+
+def _validate_batch(rows: List[Row], valid_types: List[str]) -> Tuple[List[dict], Dict[int, List[str]]]:
+    """
+    Valida un lote con las reglas del formulario (ContactCreate y VALID_COMPANY_TYPES)
+    y arma los documentos. Es CPU puro (la validación de emails es lo más caro), así
+    que corre en el pool de procesos propio de la importación.
+    """
+    errors: Dict[int, List[str]] = {}
+    candidates = []
+    for number, row in rows:
+        if "__error__" in row:
+            errors[number] = [row["__error__"]]
+            continue
+        try:
+            candidates.append((number, row, ContactCreate.model_validate(row)))
+        except ValidationError as e:
+            errors[number] = [_error_message(error) for error in e.errors()]
+
+    now = datetime.utcnow()
+    documents = []
+    for number, row, contact in candidates:
+        if contact.tipoEmpresa not in valid_types:
+            errors[number] = [f"tipoEmpresa: debe ser uno de: {', '.join(valid_types)}"]
+            continue
+
+        created_at = now
+        if row.get("created_at"):
+            try:
+                created_at = to_utc_naive(CREATED_AT.validate_python(row["created_at"]))
+            except ValidationError:
+                errors[number] = ["created_at: fecha inválida"]
+                continue
+
+        # Mismos campos que el modelo Contact, más los tokens de búsqueda
+        document = {
+            "id": str(uuid.uuid4()),
+            "nombre": contact.nombre,
+            "email": contact.email,
+            "telefono": contact.telefono,
+            "empresa": contact.empresa,
+            "tipo_empresa": contact.tipoEmpresa,
+            "mensaje": contact.mensaje or None,
+            "created_at": created_at,
+        }
+        document[SEARCH_FIELD] = search_tokens(document)
+        document["_fila"] = number
+        documents.append(document)
+
+    return documents, errors
+
+
+async def _insert_batch(db, documents: List[dict]) -> Tuple[List[dict], Dict[int, List[str]]]:
+    numbers = [document.pop("_fila") for document in documents]
+    errors: Dict[int, List[str]] = {}
+    try:
+        await db.contactos.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        # Con ordered=False el resto del lote se escribe igual: solo fallan estos índices
+        for error in e.details.get("writeErrors", []):
+            errors[numbers[error["index"]]] = [error.get("errmsg", "Error de escritura")]
+
+    inserted = [document for number, document in zip(numbers, documents) if number not in errors]
+    return inserted, errors
+
+
+async def import_contacts(db, rows: AsyncIterator[Row], valid_types: List[str],
+                          batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Valida y guarda las filas por lotes: mientras unos lotes se validan en el pool de
+    procesos se sigue leyendo el body y se escriben los ya validados. La memoria queda
+    acotada a MAX_BATCHES_IN_FLIGHT lotes más el reporte de errores.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_import_executor()
+    pending = deque()
+    total = 0
+    imported = 0
+    failed = 0
+    report = []
+
+    async def write_oldest():
+        nonlocal imported, failed
+        documents, errors = await pending.popleft()
+        if documents:
+            inserted, write_errors = await _insert_batch(db, documents)
+            errors.update(write_errors)
+            imported += len(inserted)
+            await record_contacts(db, inserted)
+
+        failed += len(errors)
+        for number in sorted(errors):
+            if len(report) < MAX_REPORTED_ERRORS:
+                report.append({"fila": number, "errores": errors[number]})
+
+    def submit(batch: List[Row]):
+        pending.append(loop.run_in_executor(executor, _validate_batch, batch, valid_types))
+
+    def summary() -> dict:
+        return {
+            "total_filas": total,
+            "importados": imported,
+            "con_errores": failed,
+            "errores": report,
+            "errores_truncados": failed > len(report),
+        }
+
+    batch: List[Row] = []
+    try:
+        try:
+            async for row in rows:
+                total += 1
+                batch.append(row)
+                if len(batch) == batch_size:
+                    submit(batch)
+                    batch = []
+                    if len(pending) >= MAX_BATCHES_IN_FLIGHT:
+                        await write_oldest()
+        except ImportFailed as e:
+            # El archivo se cortó a mitad de camino (tamaño o codificación): las filas
+            # leídas hasta ahí se procesan igual y el error informa qué quedó guardado
+            if batch:
+                submit(batch)
+            while pending:
+                await write_oldest()
+            e.report = summary()
+            raise
+
+        if batch:
+            submit(batch)
+        while pending:
+            await write_oldest()
+    finally:
+        # Si el body falla a mitad de camino no quedan validaciones huérfanas
+        for future in pending:
+            future.cancel()
+
+    return summary()
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import Request
+from pymongo.errors import BulkWriteError
+
+from services.contact_stats import record_contacts
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class IngestQueueFull(Exception):
+    """La cola de ingesta está llena: el llamador debe responder 503"""
+
+
+class ContactBatcher:
+    """
+    Ingesta diferida de contactos: los documentos se encolan y una tarea en segundo
+    plano los escribe con insert_many(ordered=False) al juntar `max_batch` documentos
+    o al pasar `max_delay` segundos desde el primero. Cada llamador espera el
+    resultado de su propio insert, así que responder 201 sigue implicando que el
+    contacto quedó guardado.
+    """
+
+    def __init__(self, collection, max_batch: int = 500, max_delay: float = 0.05,
+                 max_queue: int = 5000,
+                 on_flush: Optional[Callable[[List[dict]], Awaitable[None]]] = None):
+        self.collection = collection
+        self.on_flush = on_flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, document: dict) -> None:
+        """Encola el documento y espera a que quede escrito (o falle) en MongoDB"""
+        if self._closing:
+            raise IngestQueueFull("La ingesta se está cerrando")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((document, future))
+        except asyncio.QueueFull:
+            raise IngestQueueFull("Cola de ingesta llena")
+
+        await future
+
+    async def stop(self) -> None:
+        """Deja de aceptar documentos y escribe todo lo que quedó en la cola"""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put((_STOP, None))
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            document, future = await self._queue.get()
+            if document is _STOP:
+                break
+
+            batch = [(document, future)]
+            deadline = loop.time() + self.max_delay
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+
+                if item[0] is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Lo que se encoló antes del cierre también se escribe
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item[0] is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.max_batch):
+            await self._flush(remaining[start:start + self.max_batch])
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        failed = {}
+        try:
+            await self.collection.insert_many([document for document, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            # Con ordered=False el resto del lote se escribe igual: solo fallan estos índices
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = Exception(error.get("errmsg", "Error de escritura"))
+        except Exception as e:
+            failed = {index: e for index in range(len(batch))}
+
+        if failed:
+            logger.error("Lote de contactos con errores: %s de %s", len(failed), len(batch))
+
+        if self.on_flush is not None and len(failed) < len(batch):
+            await self.on_flush([
+                document for index, (document, _) in enumerate(batch) if index not in failed
+            ])
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(None)
+
+
+def create_contact_batcher(db) -> Optional[ContactBatcher]:
+    """Crea el batcher si CONTACT_INGEST_MODE=batched; por defecto se usa insert_one directo"""
+    if os.environ.get("CONTACT_INGEST_MODE", "direct") != "batched":
+        return None
+
+    return ContactBatcher(
+        db.contactos,
+        max_batch=int(os.environ.get("CONTACT_INGEST_BATCH_SIZE", "500")),
+        max_delay=int(os.environ.get("CONTACT_INGEST_MAX_DELAY_MS", "50")) / 1000,
+        max_queue=int(os.environ.get("CONTACT_INGEST_QUEUE_SIZE", "5000")),
+        on_flush=lambda documents: record_contacts(db, documents)
+    )
+
+
+def get_contact_batcher(request: Request) -> Optional[ContactBatcher]:
+    """Dependencia de FastAPI: batcher de contactos (None si la ingesta es directa)"""
+    return request.app.state.contact_batcher
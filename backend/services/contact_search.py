@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from typing import List
+
+from pymongo import UpdateOne
+
+# Campo con los tokens normalizados (sin acentos, en minúsculas) de cada contacto.
+# Tiene un índice multikey: una búsqueda por prefijo ^token recorre solo un rango del índice.
+SEARCH_FIELD = "busqueda"
+SEARCHABLE_FIELDS = ("nombre", "empresa", "email", "mensaje")
+
+# Peso de cada campo en la relevancia: coincidir con el nombre o la empresa pesa más
+FIELD_WEIGHTS = {"nombre": 3, "empresa": 3, "email": 2, "mensaje": 1}
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKENS = 100
+MAX_QUERY_TERMS = 5
+# Candidatos que se traen de MongoDB para ordenar por relevancia
+CANDIDATE_LIMIT = 500
+BACKFILL_BATCH_SIZE = 1000
+
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin acentos: 'Gestión Añón' -> 'gestion anon'"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _NON_ALPHANUMERIC.split(normalize(text)) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def search_tokens(contact: dict) -> List[str]:
+    """Tokens únicos de los campos buscables, en el orden en que aparecen"""
+    tokens = {}
+    for field in SEARCHABLE_FIELDS:
+        for token in tokenize(contact.get(field) or ""):
+            tokens.setdefault(token, None)
+    return list(tokens)[:MAX_TOKENS]
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def search_filter(terms: List[str]) -> dict:
+    """Todos los términos tienen que coincidir como prefijo de algún token"""
+    clauses = [{SEARCH_FIELD: {"$regex": f"^{re.escape(term)}"}} for term in terms]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def relevance(contact: dict, terms: List[str]) -> int:
+    """Coincidencia exacta de token vale el doble que una coincidencia por prefijo"""
+    score = 0
+    for field, weight in FIELD_WEIGHTS.items():
+        tokens = tokenize(contact.get(field) or "")
+        for term in terms:
+            if term in tokens:
+                score += 2 * weight
+            elif any(token.startswith(term) for token in tokens):
+                score += weight
+    return score
+
+
+async def backfill_search_tokens(db, rebuild: bool = False) -> int:
+    """Calcula el campo de búsqueda de los contactos que no lo tienen (o de todos con rebuild)"""
+    query = {} if rebuild else {SEARCH_FIELD: {"$exists": False}}
+    projection = {field: 1 for field in SEARCHABLE_FIELDS}
+    cursor = db.contactos.find(query, projection).batch_size(BACKFILL_BATCH_SIZE)
+
+    updated = 0
+    operations = []
+    async for contact in cursor:
+        operations.append(UpdateOne({"_id": contact["_id"]}, {"$set": {SEARCH_FIELD: search_tokens(contact)}}))
+        if len(operations) == BACKFILL_BATCH_SIZE:
+            result = await db.contactos.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            operations = []
+    if operations:
+        result = await db.contactos.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+
+    return updated
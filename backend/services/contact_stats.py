@@ -0,0 +1,178 @@
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List
+from zoneinfo import ZoneInfo
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Colección de contadores pre-agregados: un documento por día ("YYYY-MM-DD")
+DAILY_COUNTERS_COLLECTION = "contactos_diarios"
+
+WEEK_DAYS = 7
+MONTH_DAYS = 30
+
+
+def stats_timezone() -> ZoneInfo:
+    """Zona horaria que define qué es "hoy" para las estadísticas"""
+    return ZoneInfo(os.environ.get("STATS_TIMEZONE", "UTC"))
+
+
+def _day_key(created_at: datetime, tz: ZoneInfo) -> str:
+    # created_at se guarda como UTC sin tzinfo
+    return created_at.replace(tzinfo=timezone.utc).astimezone(tz).date().isoformat()
+
+
+def _period_starts(tz: ZoneInfo) -> dict:
+    """
+    Inicio de cada período en días calendario de la zona horaria configurada,
+    expresado en UTC sin tzinfo (como created_at en MongoDB)
+    """
+    today = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def to_utc(moment: datetime) -> datetime:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "hoy": to_utc(today),
+        "semana": to_utc(today - timedelta(days=WEEK_DAYS - 1)),
+        "mes": to_utc(today - timedelta(days=MONTH_DAYS - 1)),
+    }
+
+
+async def stats_from_aggregation(db) -> dict:
+    """Cuenta los contactos por período con un pipeline que filtra por el índice de created_at"""
+    starts = _period_starts(stats_timezone())
+
+    def count_since(start: datetime) -> list:
+        return [{"$match": {"created_at": {"$gte": start}}}, {"$count": "n"}]
+
+    pipeline = [
+        {"$match": {"created_at": {"$gte": starts["mes"]}}},
+        {"$facet": {
+            "hoy": count_since(starts["hoy"]),
+            "semana": count_since(starts["semana"]),
+            "mes": [{"$count": "n"}],
+            "por_tipo": [
+                {"$group": {"_id": "$tipo_empresa", "n": {"$sum": 1}}},
+                {"$sort": {"n": -1}},
+            ],
+        }},
+    ]
+
+    result = (await db.contactos.aggregate(pipeline).to_list(1))[0]
+
+    def first_count(rows: list) -> int:
+        return rows[0]["n"] if rows else 0
+
+    return {
+        "hoy": first_count(result["hoy"]),
+        "semana": first_count(result["semana"]),
+        "mes": first_count(result["mes"]),
+        "por_tipo_empresa": [
+            {"tipo_empresa": row["_id"], "total": row["n"]} for row in result["por_tipo"]
+        ],
+    }
+
+
+async def stats_from_counters(db) -> dict:
+    """Lee los contadores diarios: a lo sumo MONTH_DAYS documentos sin importar el volumen"""
+    tz = stats_timezone()
+    today = datetime.now(tz).date()
+    keys = {
+        "hoy": today.isoformat(),
+        "semana": (today - timedelta(days=WEEK_DAYS - 1)).isoformat(),
+        "mes": (today - timedelta(days=MONTH_DAYS - 1)).isoformat(),
+    }
+
+    days = await db[DAILY_COUNTERS_COLLECTION].find(
+        {"_id": {"$gte": keys["mes"]}}
+    ).to_list(MONTH_DAYS + 1)
+
+    totals = Counter()
+    por_tipo = Counter()
+    for day in days:
+        for period, start in keys.items():
+            if day["_id"] >= start:
+                totals[period] += day.get("total", 0)
+        por_tipo.update(day.get("por_tipo", {}))
+
+    return {
+        "hoy": totals["hoy"],
+        "semana": totals["semana"],
+        "mes": totals["mes"],
+        "por_tipo_empresa": [
+            {"tipo_empresa": tipo, "total": total} for tipo, total in por_tipo.most_common()
+        ],
+    }
+
+
+def _counter_updates(contacts: Iterable[dict]) -> List[UpdateOne]:
+    tz = stats_timezone()
+    per_day = {}
+    for contact in contacts:
+        increments = per_day.setdefault(_day_key(contact["created_at"], tz), Counter())
+        increments["total"] += 1
+        increments[f"por_tipo.{contact['tipo_empresa']}"] += 1
+
+    return [
+        UpdateOne({"_id": day}, {"$inc": dict(increments)}, upsert=True)
+        for day, increments in per_day.items()
+    ]
+
+
+async def record_contacts(db, contacts: List[dict]) -> None:
+    """
+    Suma los contactos recién guardados a los contadores diarios (una escritura por día).
+    Es best-effort: un error no afecta al contacto ya guardado y los contadores se
+    pueden reconstruir con `manage.py rebuild-contact-counters`.
+    """
+    updates = _counter_updates(contacts)
+    if not updates:
+        return
+    try:
+        await db[DAILY_COUNTERS_COLLECTION].bulk_write(updates, ordered=False)
+    except Exception as e:
+        logger.error("Error al actualizar contadores diarios de contactos: %s", e)
+
+
+async def rebuild_daily_counters(db) -> int:
+    """Recalcula todos los contadores diarios desde la colección de contactos"""
+    tz_name = stats_timezone().key
+    pipeline = [
+        {"$group": {
+            "_id": {
+                "dia": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at", "timezone": tz_name}},
+                "tipo": "$tipo_empresa",
+            },
+            "n": {"$sum": 1},
+        }},
+    ]
+
+    per_day = {}
+    async for row in db.contactos.aggregate(pipeline, allowDiskUse=True):
+        day = per_day.setdefault(row["_id"]["dia"], {"_id": row["_id"]["dia"], "total": 0, "por_tipo": {}})
+        day["total"] += row["n"]
+        day["por_tipo"][row["_id"]["tipo"]] = row["n"]
+
+    await db[DAILY_COUNTERS_COLLECTION].delete_many({})
+    if per_day:
+        await db[DAILY_COUNTERS_COLLECTION].insert_many(list(per_day.values()))
+    return len(per_day)
+
+
+async def contact_stats(db) -> dict:
+    """Estadísticas del panel, desde los contadores o desde una agregación según CONTACT_STATS_SOURCE"""
+    source = os.environ.get("CONTACT_STATS_SOURCE", "aggregate")
+    if source == "counters":
+        stats = await stats_from_counters(db)
+    else:
+        source = "aggregate"
+        stats = await stats_from_aggregation(db)
+
+    stats["total"] = await db.contactos.estimated_document_count()
+    stats["fuente"] = source
+    return stats
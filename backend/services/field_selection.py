@@ -0,0 +1,49 @@
+from typing import Dict, List, Optional, Tuple
+
+# Campo de salida -> campos de MongoDB necesarios para armarlo
+FieldSources = Dict[str, Tuple[str, ...]]
+
+
+def select_fields(
+    fields: Optional[str],
+    meta: bool,
+    available: FieldSources,
+    heavy: Tuple[str, ...] = (),
+    always: Tuple[str, ...] = ()
+) -> Tuple[List[str], dict]:
+    """
+    Traduce `fields=a,b,c` (validado contra `available`) y `meta=1` (sin los campos
+    pesados) en la lista de campos a devolver y la proyección de MongoDB que los cubre.
+    `always` son campos que el endpoint necesita internamente aunque no se devuelvan.
+    Lanza ValueError si se pide un campo fuera de la lista permitida.
+    """
+    if fields:
+        requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValueError(
+                f"Campos no permitidos: {', '.join(unknown)}. Disponibles: {', '.join(available)}"
+            )
+    else:
+        requested = list(available)
+
+    if meta:
+        requested = [name for name in requested if name not in heavy]
+
+    sources = {source for name in requested for source in available[name]} | set(always)
+    projection = {source: 1 for source in sources}
+    if "_id" not in sources:
+        projection["_id"] = 0
+
+    return requested, projection
+
+
+def trim_fields(document: dict, requested: List[str]) -> dict:
+    return {name: document[name] for name in requested if name in document}
+
+
+def cache_key(prefix: str, requested: List[str], available: FieldSources) -> str:
+    """Clave de caché por selección de campos; la selección completa usa la clave base"""
+    if requested == list(available):
+        return prefix
+    return f"{prefix}:{','.join(requested)}"
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from fastapi import Request
+from pymongo.errors import DuplicateKeyError
+
+from core.serialization import json_response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_COLLECTION = "idempotency_keys"
+MAX_KEY_LENGTH = 255
+
+STATE_PENDING = "pending"
+STATE_DONE = "done"
+
+
+class IdempotentReplay(Exception):
+    """El request ya se procesó con la misma Idempotency-Key: se devuelve la respuesta guardada"""
+
+    def __init__(self, status_code: int, payload: Any):
+        self.status_code = status_code
+        self.payload = payload
+
+
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay):
+    return json_response(exc.payload, status_code=exc.status_code, headers={"Idempotent-Replayed": "true"})
+
+
+def request_fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class MemoryIdempotencyStore:
+    """Respuestas por Idempotency-Key en memoria del proceso, LRU acotado y con vencimiento"""
+
+    def __init__(self, ttl_seconds: int = 86400, max_keys: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._records: "OrderedDict[str, dict]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Registro vigente de la clave, sin reservarla"""
+        record = self._records.get(key)
+        if record is not None and record["expires"] > time.monotonic():
+            return record
+        return None
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[dict]:
+        """
+        Reserva la clave. Devuelve None si quedó reservada para este request, o el
+        registro existente (pendiente o terminado) si otro request ya la usó.
+        """
+        record = self._records.get(key)
+        if record is not None and record["expires"] > time.monotonic():
+            self._records.move_to_end(key)
+            return record
+
+        self._records[key] = {
+            "fingerprint": fingerprint,
+            "state": STATE_PENDING,
+            "expires": time.monotonic() + self.ttl_seconds,
+        }
+        self._records.move_to_end(key)
+        if len(self._records) > self.max_keys:
+            self._records.popitem(last=False)
+        return None
+
+    async def complete(self, key: str, status_code: int, payload: Any) -> None:
+        record = self._records.get(key)
+        if record is not None:
+            record.update(state=STATE_DONE, status_code=status_code, payload=payload)
+
+    async def release(self, key: str) -> None:
+        """Libera una reserva de un request que falló, para que se pueda reintentar"""
+        self._records.pop(key, None)
+
+
+class MongoIdempotencyStore:
+    """Misma interfaz, compartida entre workers. Los registros expiran por TTL (expire_at)"""
+
+    def __init__(self, collection, ttl_seconds: int = 86400):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await self.collection.find_one({"_id": key})
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[dict]:
+        try:
+            await self.collection.insert_one({
+                "_id": key,
+                "fingerprint": fingerprint,
+                "state": STATE_PENDING,
+                "expire_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            })
+            return None
+        except DuplicateKeyError:
+            return await self.collection.find_one({"_id": key})
+
+    async def complete(self, key: str, status_code: int, payload: Any) -> None:
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {"state": STATE_DONE, "status_code": status_code, "payload": payload}}
+        )
+
+    async def release(self, key: str) -> None:
+        await self.collection.delete_one({"_id": key, "state": STATE_PENDING})
+
+
+def create_idempotency_store(db):
+    """IDEMPOTENCY_BACKEND=memory (por defecto) o mongo; IDEMPOTENCY_TTL_SECONDS (24 h)"""
+    ttl_seconds = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    if os.environ.get("IDEMPOTENCY_BACKEND", "memory") == "mongo":
+        return MongoIdempotencyStore(db[IDEMPOTENCY_COLLECTION], ttl_seconds=ttl_seconds)
+    return MemoryIdempotencyStore(
+        ttl_seconds=ttl_seconds,
+        max_keys=int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000"))
+    )
+
+
+def get_idempotency_store(request: Request):
+    """Dependencia de FastAPI: almacén de Idempotency-Key creado en el lifespan"""
+    return request.app.state.idempotency_store
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Set
+
+from services.logo_blob_marks import BLOB_GC_COLLECTION, claimable
+from services.logo_pipeline import variant_names
+from services.logo_storage import LogoStorage
+
+logger = logging.getLogger(__name__)
+
+# Un upload que reutiliza un blob marcado tiene este margen para guardar su logo
+# antes de que el blob se pueda borrar
+BLOB_GC_GRACE_SECONDS = int(os.environ.get("LOGO_BLOB_GC_GRACE_SECONDS", "300"))
+
+_task: Optional[asyncio.Task] = None
+
+
+def logo_hashes(logo: dict) -> Set[str]:
+    """Hashes de los blobs de un logo: la imagen original y sus derivados"""
+    hashes = {logo.get("sha256")} | {
+        variant["sha256"] for variant in (logo.get("variants") or {}).values()
+    }
+    hashes.discard(None)
+    return hashes
+
+
+async def referenced_blobs(logos_collection, hashes: Iterable[str]) -> Set[str]:
+    """Cuáles de los hashes usa algún logo, con una sola consulta"""
+    candidates = list(hashes)
+    if not candidates:
+        return set()
+
+    references = [{"sha256": {"$in": candidates}}] + [
+        {f"variants.{name}.sha256": {"$in": candidates}} for name in variant_names()
+    ]
+    in_use: Set[str] = set()
+    async for logo in logos_collection.find({"$or": references}, {"_id": 0, "sha256": 1, "variants": 1}):
+        in_use |= logo_hashes(logo)
+    return in_use & set(candidates)
+
+
+async def collect_unused_blobs(db, storage: LogoStorage, grace_seconds: int = BLOB_GC_GRACE_SECONDS) -> int:
+    """
+    Borra los blobs marcados hace más de `grace_seconds` que ningún logo usa.
+    Cada marca se toma (deleting_at) antes de verificar las referencias: desde ahí
+    un upload que reutiliza el blob espera en reserve_blobs a que termine el borrado
+    y lo vuelve a escribir. La marca se elimina recién después de borrar el blob, así
+    que si el proceso muere en el medio otro recolector la retoma.
+    """
+    collection = db[BLOB_GC_COLLECTION]
+    deleted = 0
+
+    while True:
+        now = datetime.utcnow()
+        mark = await collection.find_one_and_update(
+            {"marked_at": {"$lte": now - timedelta(seconds=grace_seconds)}, **claimable(now)},
+            {"$set": {"deleting_at": now}}
+        )
+        if mark is None:
+            break
+
+        sha256 = mark["_id"]
+        if not await referenced_blobs(db.logos, [sha256]):
+            await storage.delete(sha256)
+            deleted += 1
+        # Solo si la marca sigue siendo la que se tomó
+        await collection.delete_one({"_id": sha256, "deleting_at": now})
+
+    if deleted:
+        logger.info("Blobs de logos sin uso eliminados: %s", deleted)
+    return deleted
+
+
+async def _run_collector(db, storage: LogoStorage) -> None:
+    while True:
+        await asyncio.sleep(BLOB_GC_GRACE_SECONDS)
+        try:
+            await collect_unused_blobs(db, storage)
+            if await db[BLOB_GC_COLLECTION].find_one({}, {"_id": 1}) is None:
+                return
+        except Exception as e:
+            logger.error("Error al eliminar blobs de logos sin uso: %s", e)
+
+
+def schedule_blob_collection(db, storage: LogoStorage) -> asyncio.Task:
+    """
+    Recolección en segundo plano: cada BLOB_GC_GRACE_SECONDS mientras queden marcas.
+    Las marcas viven en MongoDB, así que las de un worker que se reinició las
+    recolecta cualquier otro (o `manage.py collect-logo-blobs`).
+    """
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run_collector(db, storage))
+    return _task
+
+
+async def shutdown_blob_collector() -> None:
+    """La recolección pendiente se retoma en el próximo arranque"""
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+    _task = None
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from pymongo import UpdateOne
+
+# Blobs que dejaron de usarse y esperan el borrado diferido: un documento por hash
+BLOB_GC_COLLECTION = "logo_blob_gc"
+# Un recolector que tomó una marca y murió la deja tomada: pasado este tiempo otro
+# recolector la retoma y los uploads dejan de esperarla
+BLOB_GC_CLAIM_SECONDS = 60
+# Cada cuánto vuelve a mirar un upload que espera un borrado en curso
+RESERVE_POLL_SECONDS = 0.05
+
+
+def claimable(now: datetime) -> dict:
+    """Filtro de las marcas que ningún recolector está borrando (o cuyo recolector murió)"""
+    return {"$or": [
+        {"deleting_at": None},
+        {"deleting_at": {"$lte": now - timedelta(seconds=BLOB_GC_CLAIM_SECONDS)}}
+    ]}
+
+
+async def mark_unused_blobs(db, hashes: Iterable[str]) -> None:
+    """
+    Marca blobs para el borrado diferido. No se borran en el momento: un upload
+    concurrente de la misma imagen puede estar reutilizando el blob sin haber
+    guardado todavía su logo.
+    """
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne({"_id": sha256}, {"$set": {"marked_at": now}}, upsert=True)
+        for sha256 in set(hashes)
+    ]
+    if operations:
+        await db[BLOB_GC_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def reserve_blobs(db, hashes: Iterable[str]) -> None:
+    """
+    Quita la marca de borrado de blobs que se van a volver a usar. Se llama antes de
+    guardar el blob (put o cierre del writer) y de escribir el logo que lo referencia.
+    Si el recolector lo está borrando en ese momento, espera a que termine: así el
+    guardado lo vuelve a escribir en vez de deduplicarlo contra un archivo que está
+    por desaparecer.
+    """
+    pending = list(set(hashes))
+    collection = db[BLOB_GC_COLLECTION]
+    while pending:
+        await collection.delete_many({"_id": {"$in": pending}, **claimable(datetime.utcnow())})
+        pending = [mark["_id"] async for mark in collection.find({"_id": {"$in": pending}}, {"_id": 1})]
+        if pending:
+            await asyncio.sleep(RESERVE_POLL_SECONDS)
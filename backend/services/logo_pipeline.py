@@ -0,0 +1,187 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+from services.logo_blob_marks import reserve_blobs
+from services.logo_storage import LogoStorage, content_sha256
+
+logger = logging.getLogger(__name__)
+
+# Estados de procesamiento de un logo
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """Derivado a generar: ancho fijo (sin agrandar) y formato de salida"""
+    name: str
+    width: int
+    format: str
+    content_type: str
+    quality: int
+
+
+# El slider muestra los logos a ~120px de ancho: se generan a 2x para pantallas retina
+VARIANT_SPECS: Tuple[VariantSpec, ...] = (
+    VariantSpec("slider", 240, "WEBP", "image/webp", 85),
+    VariantSpec("slider_avif", 240, "AVIF", "image/avif", 60),
+    VariantSpec("thumb", 480, "WEBP", "image/webp", 85),
+)
+
+SLIDER_VARIANT = "slider"
+
+_executor: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _supported_specs() -> Tuple[VariantSpec, ...]:
+    # AVIF depende de cómo se compiló Pillow: si no está disponible se omite
+    return tuple(
+        spec for spec in VARIANT_SPECS
+        if spec.format != "AVIF" or features.check("avif")
+    )
+
+
+def render_variants(data: bytes, specs: Tuple[VariantSpec, ...]) -> List[dict]:
+    """
+    Decodifica la imagen original y genera cada derivado.
+    Corre dentro del pool de procesos: recibe y devuelve solo datos serializables.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        mode = "RGBA" if source.mode in ("RGBA", "LA", "P") else "RGB"
+        source = source.convert(mode)
+
+        variants = []
+        for spec in specs:
+            image = source.copy()
+            if image.width > spec.width:
+                height = max(1, round(image.height * spec.width / image.width))
+                image = image.resize((spec.width, height), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            image.save(buffer, format=spec.format, quality=spec.quality)
+            variants.append({
+                "name": spec.name,
+                "content_type": spec.content_type,
+                "width": image.width,
+                "height": image.height,
+                "data": buffer.getvalue()
+            })
+
+        return variants
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: el proceso del servidor tiene hilos (Motor) y no es seguro hacer fork
+        _executor = ProcessPoolExecutor(
+            max_workers=int(os.environ.get("LOGO_PIPELINE_WORKERS", "2")),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def process_logo_image(
+    logos_collection,
+    storage: LogoStorage,
+    sha256: str,
+    on_change: Optional[Callable[[], None]] = None
+) -> None:
+    """
+    Genera los derivados de una imagen y los asigna a todos los logos que la usan.
+    Es idempotente: si la imagen ya fue procesada se reutilizan sus derivados.
+    `on_change` se llama cuando cambian los documentos (p. ej. para invalidar cachés).
+    """
+    try:
+        processed = await logos_collection.find_one(
+            {"sha256": sha256, "processing_status": STATUS_READY},
+            {"_id": 0, "variants": 1}
+        )
+        if processed:
+            variants = processed["variants"]
+            await reserve_blobs(logos_collection.database, [variant["sha256"] for variant in variants.values()])
+        else:
+            data = await storage.read(sha256)
+            if data is None:
+                raise ValueError("Imagen original no encontrada")
+
+            loop = asyncio.get_running_loop()
+            rendered = await loop.run_in_executor(
+                get_executor(), render_variants, data, _supported_specs()
+            )
+
+            variants = {}
+            for variant in rendered:
+                # Un derivado de una imagen ya eliminada puede estar marcado para borrar
+                await reserve_blobs(logos_collection.database, [content_sha256(variant["data"])])
+                blob = await storage.put(variant["data"], variant["content_type"])
+                variants[variant["name"]] = {
+                    "sha256": blob.sha256,
+                    "content_type": blob.content_type,
+                    "size": blob.size,
+                    "width": variant["width"],
+                    "height": variant["height"]
+                }
+
+        await logos_collection.update_many(
+            {"sha256": sha256},
+            {
+                "$set": {"variants": variants, "processing_status": STATUS_READY},
+                "$unset": {"processing_error": ""}
+            }
+        )
+        logger.info("Derivados generados para la imagen %s", sha256[:12])
+
+    except Exception as e:
+        logger.error("Error al procesar la imagen %s: %s", sha256[:12], e)
+        await logos_collection.update_many(
+            {"sha256": sha256},
+            {"$set": {"processing_status": STATUS_FAILED, "processing_error": str(e)}}
+        )
+
+    if on_change is not None:
+        on_change()
+
+
+def schedule_logo_processing(
+    logos_collection,
+    storage: LogoStorage,
+    sha256: str,
+    on_change: Optional[Callable[[], None]] = None
+) -> asyncio.Task:
+    """
+    Lanza el procesamiento en segundo plano. Las subidas simultáneas de la misma
+    imagen comparten una única tarea.
+    """
+    task = _inflight.get(sha256)
+    if task is None or task.done():
+        task = asyncio.create_task(process_logo_image(logos_collection, storage, sha256, on_change))
+        _inflight[sha256] = task
+        task.add_done_callback(lambda _: _inflight.pop(sha256, None))
+    return task
+
+
+def variant_names() -> Tuple[str, ...]:
+    return tuple(spec.name for spec in VARIANT_SPECS)
+
+
+async def shutdown_pipeline() -> None:
+    """Espera las tareas pendientes y cierra el pool de procesos"""
+    global _executor
+    if _inflight:
+        await asyncio.gather(*list(_inflight.values()), return_exceptions=True)
+    if _executor is not None:
+        executor, _executor = _executor, None
+        # shutdown(wait=True) bloquea: en un hilo, así el loop sigue drenando las otras tareas
+        await asyncio.to_thread(executor.shutdown, wait=True)
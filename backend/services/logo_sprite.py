@@ -0,0 +1,157 @@
+import asyncio
+import io
+import logging
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from services.logo_pipeline import SLIDER_VARIANT, STATUS_FAILED, get_executor
+from services.logo_storage import LogoStorage
+
+logger = logging.getLogger(__name__)
+
+# Manifiesto del sprite actual: un único documento, compartido entre workers
+SPRITES_COLLECTION = "logo_sprites"
+SPRITE_MANIFEST_ID = "slider"
+
+# El slider muestra los logos a 64px de alto: las celdas se generan a 2x para retina
+SPRITE_SCALE = 2
+CELL_HEIGHT = 64 * SPRITE_SCALE
+MAX_CELL_WIDTH = 3 * CELL_HEIGHT
+CELL_PADDING = 4
+MAX_ROW_WIDTH = 4096
+SPRITE_QUALITY = 85
+
+# Orden del slider: el que fija el admin; los logos anteriores a `orden` (sin el
+# campo) quedan primero, por fecha de alta
+LOGO_ORDER = [("orden", 1), ("created_at", 1)]
+
+_task: Optional[asyncio.Task] = None
+_dirty = False
+
+
+def render_sprite(images: List[bytes]) -> Tuple[bytes, int, int, List[Tuple[int, int, int, int]]]:
+    """
+    Arma el sprite en filas de hasta MAX_ROW_WIDTH px, con cada logo escalado a
+    CELL_HEIGHT de alto. Corre en el pool de procesos: devuelve los bytes WEBP, el
+    tamaño total y (x, y, ancho, alto) de cada logo.
+    """
+    cells = []
+    for data in images:
+        with Image.open(io.BytesIO(data)) as source:
+            image = ImageOps.exif_transpose(source).convert("RGBA")
+            image.thumbnail((MAX_CELL_WIDTH, CELL_HEIGHT), Image.LANCZOS)
+            cells.append(image)
+
+    positions = []
+    x = y = 0
+    width = 0
+    for cell in cells:
+        if x and x + cell.width > MAX_ROW_WIDTH:
+            x = 0
+            y += CELL_HEIGHT + CELL_PADDING
+        # Centrado vertical dentro de la fila
+        positions.append((x, y + (CELL_HEIGHT - cell.height) // 2, cell.width, cell.height))
+        x += cell.width + CELL_PADDING
+        width = max(width, x - CELL_PADDING)
+    height = y + CELL_HEIGHT
+
+    sprite = Image.new("RGBA", (max(width, 1), height), (0, 0, 0, 0))
+    for cell, (cell_x, cell_y, _, _) in zip(cells, positions):
+        sprite.paste(cell, (cell_x, cell_y))
+
+    buffer = io.BytesIO()
+    sprite.save(buffer, format="WEBP", quality=SPRITE_QUALITY)
+    return buffer.getvalue(), sprite.width, sprite.height, positions
+
+
+async def get_sprite_manifest(db) -> Optional[dict]:
+    return await db[SPRITES_COLLECTION].find_one({"_id": SPRITE_MANIFEST_ID})
+
+
+async def build_sprite(db, storage: LogoStorage) -> Optional[dict]:
+    """Genera el sprite con los logos actuales y reemplaza el manifiesto"""
+    projection = {"_id": 0, "id": 1, "nombre": 1, "sha256": 1, "variants": 1}
+    logos = await db.logos.find({"processing_status": {"$ne": STATUS_FAILED}}, projection).sort(LOGO_ORDER).to_list(None)
+
+    entries = []
+    images = []
+    for logo in logos:
+        # Se parte del derivado del slider (ya chico) si está listo; si no, del original
+        variant = (logo.get("variants") or {}).get(SLIDER_VARIANT)
+        sha256 = variant["sha256"] if variant else logo.get("sha256")
+        data = await storage.read(sha256) if sha256 else None
+        if data is None:
+            continue
+        entries.append({"id": logo["id"], "nombre": logo["nombre"]})
+        images.append(data)
+
+    previous = await get_sprite_manifest(db)
+
+    if images:
+        loop = asyncio.get_running_loop()
+        data, width, height, positions = await loop.run_in_executor(get_executor(), render_sprite, images)
+        blob = await storage.put(data, "image/webp")
+        for entry, (x, y, cell_width, cell_height) in zip(entries, positions):
+            entry.update(x=x, y=y, width=cell_width, height=cell_height)
+        sprite = {"sha256": blob.sha256, "width": width, "height": height, "size": blob.size}
+    else:
+        sprite = {"sha256": None, "width": 0, "height": 0, "size": 0}
+
+    # Se conserva el sprite anterior una generación más, para los clientes que
+    # todavía tienen el manifiesto viejo
+    previous_sha256 = previous.get("sha256") if previous else None
+    if previous and previous_sha256 == sprite["sha256"]:
+        previous_sha256 = previous.get("previous_sha256")
+
+    manifest = {
+        **sprite,
+        "scale": SPRITE_SCALE,
+        "logos": entries,
+        "previous_sha256": previous_sha256,
+        "updated_at": datetime.utcnow(),
+    }
+    await db[SPRITES_COLLECTION].replace_one({"_id": SPRITE_MANIFEST_ID}, manifest, upsert=True)
+
+    if previous:
+        stale = {previous.get("sha256"), previous.get("previous_sha256")} - {sprite["sha256"], previous_sha256, None}
+        for sha256 in stale:
+            await storage.delete(sha256)
+
+    logger.info("Sprite de logos regenerado: %s logos", len(entries))
+    return manifest
+
+
+async def _run_builds(db, storage: LogoStorage, on_change: Optional[Callable[[], None]]) -> None:
+    global _dirty
+    while _dirty:
+        _dirty = False
+        try:
+            await build_sprite(db, storage)
+        except Exception as e:
+            logger.error("Error al generar el sprite de logos: %s", e)
+        if on_change is not None:
+            on_change()
+
+
+def schedule_sprite_rebuild(
+    db,
+    storage: LogoStorage,
+    on_change: Optional[Callable[[], None]] = None
+) -> asyncio.Task:
+    """
+    Regenera el sprite en segundo plano. Los cambios que llegan durante una
+    generación se agrupan en una sola generación siguiente.
+    """
+    global _task, _dirty
+    _dirty = True
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run_builds(db, storage, on_change))
+    return _task
+
+
+async def shutdown_sprite_builder() -> None:
+    """Espera la generación en curso (usa el pool de procesos de logo_pipeline)"""
+    if _task is not None and not _task.done():
+        await asyncio.gather(_task, return_exceptions=True)
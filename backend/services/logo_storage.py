@@ -0,0 +1,281 @@
+import base64
+import binascii
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+
+def content_sha256(data: bytes) -> str:
+    """Dirección de un contenido en el almacenamiento"""
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class StoredBlob:
+    """Metadatos de un blob guardado, direccionado por su hash SHA-256"""
+    sha256: str
+    size: int
+    content_type: str
+    uploaded_at: Optional[datetime] = None
+
+
+class BlobWriter(ABC):
+    """
+    Escritura incremental de un blob: los chunks se guardan a medida que llegan y el
+    hash se calcula al final. close() devuelve el blob; abort() descarta lo escrito.
+    """
+
+    def __init__(self, content_type: str):
+        self.content_type = content_type
+        self.size = 0
+        self._hasher = hashlib.sha256()
+
+    async def write(self, chunk: bytes) -> None:
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+        await self._write(chunk)
+
+    @property
+    def sha256(self) -> str:
+        """Hash de lo escrito hasta ahora: con la última escritura, el del blob"""
+        return self._hasher.hexdigest()
+
+    @abstractmethod
+    async def _write(self, chunk: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def close(self) -> StoredBlob:
+        ...
+
+    @abstractmethod
+    async def abort(self) -> None:
+        ...
+
+
+class LogoStorage(ABC):
+    """
+    Interfaz mínima para guardar los bytes de los logos fuera de los documentos.
+    Los blobs se identifican por el SHA-256 de su contenido, así que subir dos
+    veces la misma imagen no duplica datos.
+    """
+
+    @abstractmethod
+    async def put(self, data: bytes, content_type: str) -> StoredBlob:
+        ...
+
+    @abstractmethod
+    async def open(self, sha256: str) -> Optional[Tuple[StoredBlob, AsyncIterator[bytes]]]:
+        ...
+
+    @abstractmethod
+    async def delete(self, sha256: str) -> None:
+        ...
+
+    @abstractmethod
+    def open_writer(self, content_type: str) -> BlobWriter:
+        ...
+
+    async def read(self, sha256: str) -> Optional[bytes]:
+        """Lee el blob completo en memoria (solo para procesarlo, no para servirlo)"""
+        stored = await self.open(sha256)
+        if stored is None:
+            return None
+        _, chunks = stored
+        return b"".join([chunk async for chunk in chunks])
+
+
+class GridFSLogoStorage(LogoStorage):
+    """Implementación sobre GridFS: un archivo por hash, con el content type en metadata"""
+
+    def __init__(self, db: AsyncIOMotorDatabase, bucket_name: str = "logo_blobs"):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+
+    async def put(self, data: bytes, content_type: str) -> StoredBlob:
+        sha256 = content_sha256(data)
+        blob = StoredBlob(sha256=sha256, size=len(data), content_type=content_type)
+
+        # Contenido ya almacenado: no se vuelve a subir
+        if await self.files.find_one({"filename": sha256}, {"_id": 1}):
+            return blob
+
+        await self.bucket.upload_from_stream(
+            sha256,
+            data,
+            metadata={"content_type": content_type}
+        )
+        return blob
+
+    async def open(self, sha256: str) -> Optional[Tuple[StoredBlob, AsyncIterator[bytes]]]:
+        try:
+            grid_out = await self.bucket.open_download_stream_by_name(sha256)
+        except NoFile:
+            return None
+
+        metadata = grid_out.metadata or {}
+        blob = StoredBlob(
+            sha256=sha256,
+            size=grid_out.length,
+            content_type=metadata.get("content_type", "application/octet-stream"),
+            uploaded_at=grid_out.upload_date
+        )
+        return blob, _iter_chunks(grid_out)
+
+    async def delete(self, sha256: str) -> None:
+        async for grid_file in self.bucket.find({"filename": sha256}):
+            await self.bucket.delete(grid_file._id)
+
+    def open_writer(self, content_type: str) -> BlobWriter:
+        return GridFSBlobWriter(self, content_type)
+
+
+class GridFSBlobWriter(BlobWriter):
+    """
+    Sube los chunks a un archivo temporal de GridFS y al cerrar lo renombra con el
+    hash del contenido (o lo descarta si ese contenido ya estaba guardado)
+    """
+
+    def __init__(self, storage: GridFSLogoStorage, content_type: str):
+        super().__init__(content_type)
+        self.storage = storage
+        self.grid_in = storage.bucket.open_upload_stream(
+            f"upload-{uuid.uuid4()}",
+            metadata={"content_type": content_type}
+        )
+
+    async def _write(self, chunk: bytes) -> None:
+        await self.grid_in.write(chunk)
+
+    async def close(self) -> StoredBlob:
+        await self.grid_in.close()
+        sha256 = self.sha256
+
+        if await self.storage.files.find_one({"filename": sha256}, {"_id": 1}):
+            await self.storage.bucket.delete(self.grid_in._id)
+        else:
+            await self.storage.bucket.rename(self.grid_in._id, sha256)
+
+        return StoredBlob(sha256=sha256, size=self.size, content_type=self.content_type)
+
+    async def abort(self) -> None:
+        await self.grid_in.abort()
+
+
+class MemoryLogoStorage(LogoStorage):
+    """Implementación en memoria del proceso, para desarrollo y benchmarks sin GridFS"""
+
+    def __init__(self):
+        self._blobs = {}
+
+    async def put(self, data: bytes, content_type: str) -> StoredBlob:
+        sha256 = content_sha256(data)
+        if sha256 not in self._blobs:
+            self._blobs[sha256] = (data, StoredBlob(sha256, len(data), content_type, datetime.utcnow()))
+        return self._blobs[sha256][1]
+
+    async def open(self, sha256: str) -> Optional[Tuple[StoredBlob, AsyncIterator[bytes]]]:
+        if sha256 not in self._blobs:
+            return None
+        data, blob = self._blobs[sha256]
+
+        async def chunks():
+            yield data
+
+        return blob, chunks()
+
+    async def delete(self, sha256: str) -> None:
+        self._blobs.pop(sha256, None)
+
+    def open_writer(self, content_type: str) -> BlobWriter:
+        return MemoryBlobWriter(self, content_type)
+
+
+class MemoryBlobWriter(BlobWriter):
+    def __init__(self, storage: MemoryLogoStorage, content_type: str):
+        super().__init__(content_type)
+        self.storage = storage
+        self._chunks = []
+
+    async def _write(self, chunk: bytes) -> None:
+        self._chunks.append(chunk)
+
+    async def close(self) -> StoredBlob:
+        return await self.storage.put(b"".join(self._chunks), self.content_type)
+
+    async def abort(self) -> None:
+        self._chunks = []
+
+
+def create_logo_storage(db: AsyncIOMotorDatabase) -> LogoStorage:
+    """Almacenamiento de logos según LOGO_STORAGE (gridfs por defecto, o memory)"""
+    if os.environ.get("LOGO_STORAGE", "gridfs") == "memory":
+        return MemoryLogoStorage()
+    return GridFSLogoStorage(db)
+
+
+async def _iter_chunks(grid_out) -> AsyncIterator[bytes]:
+    # Se leen los chunks de GridFS de a uno para no cargar la imagen entera en memoria
+    while True:
+        chunk = await grid_out.readchunk()
+        if not chunk:
+            break
+        yield chunk
+
+
+# Firmas de los formatos aceptados. SVG no se acepta: es texto, puede traer scripts
+# y no se puede procesar para generar los derivados.
+IMAGE_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (4, b"ftypavif", "image/avif"),
+    (4, b"ftypavis", "image/avif"),
+)
+SNIFF_LENGTH = 16
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Content type según los primeros bytes del archivo (None si no es un formato aceptado)"""
+    for offset, signature, content_type in IMAGE_SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            if content_type == "image/webp" and not head.startswith(b"RIFF"):
+                continue
+            return content_type
+    return None
+
+
+def decode_data_uri(value: str) -> Tuple[bytes, str]:
+    """
+    Decodifica una imagen enviada como data URI (data:image/png;base64,...)
+    o como base64 plano. Lanza ValueError si el contenido no es válido.
+    """
+    content_type = "application/octet-stream"
+    payload = value.strip()
+
+    if payload.startswith("data:"):
+        header, sep, payload = payload.partition(",")
+        if not sep or not header.endswith(";base64"):
+            raise ValueError("Data URI sin codificación base64")
+        declared = header[len("data:"):-len(";base64")]
+        if declared:
+            content_type = declared
+
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Contenido base64 inválido")
+
+    if not data:
+        raise ValueError("Imagen vacía")
+
+    return data, content_type
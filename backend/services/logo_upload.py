@@ -0,0 +1,225 @@
+import os
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi import Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+from services.logo_storage import SNIFF_LENGTH, BlobWriter, LogoStorage, StoredBlob, sniff_image_type
+
+LOGO_MAX_BYTES = int(os.environ.get("LOGO_MAX_BYTES", 5 * 1024 * 1024))
+# Margen para los encabezados de las partes y los campos de texto del formulario
+FORM_OVERHEAD_BYTES = 16 * 1024
+MAX_FIELD_LENGTH = 1024
+FILE_FIELD = "imagen"
+
+
+class UploadTooLarge(Exception):
+    """La imagen (o el body) supera el tamaño máximo: el llamador debe responder 413"""
+
+
+class InvalidUpload(ValueError):
+    """Formulario o imagen inválidos: el llamador debe responder 400"""
+
+
+def max_body_bytes(multipart: bool) -> int:
+    """Tamaño máximo aceptable del body, para rechazar por Content-Length sin leerlo"""
+    if multipart:
+        return LOGO_MAX_BYTES + FORM_OVERHEAD_BYTES
+    # En JSON la imagen viaja en base64: 4 bytes por cada 3
+    return LOGO_MAX_BYTES * 4 // 3 + FORM_OVERHEAD_BYTES
+
+
+async def read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """Lee el body completo cortando apenas supera max_bytes (aunque no haya Content-Length)"""
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge("Body demasiado grande")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class ImageUploadSink:
+    """
+    Destino de los bytes de la imagen: junta los primeros bytes para identificar el
+    formato, abre el writer del almacenamiento y a partir de ahí pasa cada chunk
+    directo, sin acumular la imagen en memoria
+    """
+
+    def __init__(
+        self,
+        storage: LogoStorage,
+        max_bytes: int,
+        reserve_blob: Optional[Callable[[str], Awaitable[None]]] = None
+    ):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.reserve_blob = reserve_blob
+        self.received = 0
+        self._head = b""
+        self._writer: Optional[BlobWriter] = None
+
+    async def write(self, chunk: bytes) -> None:
+        self.received += len(chunk)
+        if self.received > self.max_bytes:
+            raise UploadTooLarge("Imagen demasiado grande")
+
+        if self._writer is not None:
+            await self._writer.write(chunk)
+            return
+
+        self._head += chunk
+        if len(self._head) >= SNIFF_LENGTH:
+            await self._open()
+
+    async def _open(self) -> None:
+        content_type = sniff_image_type(self._head)
+        if content_type is None:
+            raise InvalidUpload("Formato no soportado (se aceptan PNG, JPEG, GIF, WEBP y AVIF)")
+        self._writer = self.storage.open_writer(content_type)
+        await self._writer.write(self._head)
+        self._head = b""
+
+    async def finish(self) -> StoredBlob:
+        if self._writer is None:
+            if not self._head:
+                raise InvalidUpload("Imagen vacía")
+            await self._open()
+        if self.reserve_blob is not None:
+            await self.reserve_blob(self._writer.sha256)
+        return await self._writer.close()
+
+    async def abort(self) -> None:
+        if self._writer is not None:
+            await self._writer.abort()
+
+
+async def _discard(
+    sink: Optional[ImageUploadSink],
+    blob: Optional[StoredBlob],
+    release_blob: Optional[Callable[[StoredBlob], Awaitable[None]]]
+) -> None:
+    if blob is not None:
+        if release_blob is not None:
+            await release_blob(blob)
+    elif sink is not None:
+        await sink.abort()
+
+
+async def receive_multipart_logo(
+    request: Request,
+    storage: LogoStorage,
+    max_bytes: int = LOGO_MAX_BYTES,
+    release_blob: Optional[Callable[[StoredBlob], Awaitable[None]]] = None,
+    reserve_blob: Optional[Callable[[str], Awaitable[None]]] = None
+) -> Tuple[Optional[str], StoredBlob]:
+    """
+    Procesa un multipart/form-data con el archivo en el campo `imagen` (y opcionalmente
+    `nombre`) a medida que llega: cada chunk del body se parsea y los bytes del archivo
+    se escriben en el almacenamiento. Devuelve (nombre o nombre del archivo, blob).
+
+    Si el request falla después de guardar el archivo (p. ej. un campo posterior
+    inválido), el blob ya guardado se entrega a `release_blob` para que se borre si
+    ningún logo lo usa. `reserve_blob` se llama con el hash del archivo justo antes
+    de guardarlo (antes de deduplicarlo contra un blob existente).
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise InvalidUpload("Falta el boundary del multipart")
+
+    # El parser es síncrono: sus callbacks solo registran eventos, que se procesan
+    # (con await) después de cada chunk
+    events = []
+    part = {"headers": {}, "field": b"", "value": b""}
+
+    def on_part_begin():
+        part["headers"] = {}
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"] = b""
+        part["value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        events.append(("begin", name, filename.decode("utf-8", "replace") if filename is not None else None))
+
+    def on_part_data(data, start, end):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end",))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    sink: Optional[ImageUploadSink] = None
+    blob: Optional[StoredBlob] = None
+    filename: Optional[str] = None
+    fields = {}
+    current = None
+
+    async def handle(event):
+        nonlocal sink, blob, filename, current
+        if event[0] == "begin":
+            _, name, part_filename = event
+            if name == FILE_FIELD and part_filename is not None:
+                if sink is not None:
+                    raise InvalidUpload("Solo se acepta un archivo por request")
+                sink = ImageUploadSink(storage, max_bytes, reserve_blob)
+                filename = part_filename
+                current = None
+            else:
+                current = name
+                fields[name] = b""
+        elif event[0] == "data":
+            if current is None:
+                await sink.write(event[1])
+            else:
+                fields[current] += event[1]
+                if len(fields[current]) > MAX_FIELD_LENGTH:
+                    raise InvalidUpload(f"Campo demasiado largo: {current}")
+        elif current is None and sink is not None and blob is None:
+            blob = await sink.finish()
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for event in events:
+                await handle(event)
+            events.clear()
+        parser.finalize()
+        for event in events:
+            await handle(event)
+    except MultipartParseError as e:
+        await _discard(sink, blob, release_blob)
+        raise InvalidUpload(f"Multipart inválido: {str(e)}")
+    except BaseException:
+        # También si el cliente se desconecta (el request se cancela)
+        await _discard(sink, blob, release_blob)
+        raise
+
+    if blob is None:
+        raise InvalidUpload(f"Falta el archivo en el campo '{FILE_FIELD}'")
+
+    nombre = fields.get("nombre", b"").decode("utf-8", "replace").strip()
+    return nombre or filename, blob
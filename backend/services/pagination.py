@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from core.timeutil import to_utc_naive
+
+
+def encode_cursor(created_at: datetime, object_id: ObjectId) -> str:
+    """
+    Cursor opaco con la posición del último documento entregado: (created_at, _id)
+    """
+    payload = json.dumps({"t": created_at.isoformat(), "i": str(object_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decodifica un cursor generado por encode_cursor. Lanza ValueError si es inválido.
+    La fecha vuelve sin zona, en UTC, como las de MongoDB y el archivo: un cursor
+    armado a mano con zona no rompe las comparaciones al combinar páginas.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return to_utc_naive(datetime.fromisoformat(payload["t"])), ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Cursor inválido")
+
+
+def after_cursor_filter(created_at: datetime, object_id: ObjectId) -> dict:
+    """
+    Filtro para continuar después del cursor en orden (created_at, _id) descendente.
+    El _id desempata documentos con el mismo created_at.
+    """
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": object_id}}
+        ]
+    }
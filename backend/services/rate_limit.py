@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import Request
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITS_COLLECTION = "rate_limits"
+WINDOW_SECONDS = 60
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets en memoria del proceso, uno por clave (IP o hash de email).
+    El mapa está acotado como LRU: las claves inactivas se descartan primero, y
+    una clave descartada vuelve con el bucket lleno, lo que es aceptable para spam.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def hit(self, key: str, rate_per_minute: float, burst: int) -> float:
+        """Consume un token. Devuelve 0 si se permite, o los segundos a esperar si no"""
+        now = time.monotonic()
+        refill = rate_per_minute / WINDOW_SECONDS
+
+        tokens, updated = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * refill)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class MongoWindowLimiter:
+    """
+    Límite compartido entre workers: un contador por clave y ventana fija de un
+    minuto en MongoDB (expiran por TTL). Permite hasta `rate_per_minute` por ventana;
+    el burst no aplica. Si MongoDB falla se deja pasar el request.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def hit(self, key: str, rate_per_minute: float, burst: int) -> float:
+        now = time.time()
+        window = int(now // WINDOW_SECONDS)
+        try:
+            counter = await self.collection.find_one_and_update(
+                {"_id": f"{key}:{window}"},
+                {
+                    "$inc": {"count": 1},
+                    "$setOnInsert": {"expire_at": datetime.utcnow() + timedelta(seconds=2 * WINDOW_SECONDS)}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            logger.warning("Rate limit en MongoDB no disponible, se omite: %s", e)
+            return 0.0
+
+        if counter["count"] > rate_per_minute:
+            return WINDOW_SECONDS - now % WINDOW_SECONDS
+        return 0.0
+
+
+class RateLimitPolicy:
+    """Límites del formulario de contacto: por IP y por email (guardado solo como hash)"""
+
+    def __init__(self, limiter, ip_rate: float, ip_burst: int, email_rate: float,
+                 email_burst: int, proxy_hops: int = 0):
+        self.limiter = limiter
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.email_rate = email_rate
+        self.email_burst = email_burst
+        self.proxy_hops = proxy_hops
+
+    def client_ip(self, request: Request) -> str:
+        """
+        IP del cliente. Detrás de `proxy_hops` proxies propios se toma la entrada de
+        X-Forwarded-For agregada por el proxy más externo (las anteriores las puede
+        falsificar el cliente).
+        """
+        if self.proxy_hops:
+            forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+            if len(forwarded) >= self.proxy_hops:
+                return forwarded[-self.proxy_hops]
+        return request.client.host if request.client else "desconocido"
+
+    async def check_ip(self, request: Request) -> float:
+        return await self.limiter.hit(f"ip:{self.client_ip(request)}", self.ip_rate, self.ip_burst)
+
+    async def check_email(self, email: str) -> float:
+        return await self.limiter.hit(f"email:{hash_email(email)}", self.email_rate, self.email_burst)
+
+
+def hash_email(email: str) -> str:
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:32]
+
+
+def retry_after_header(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+def create_rate_limit_policy(db) -> Optional[RateLimitPolicy]:
+    """
+    Límites de POST /api/contacto según el entorno. Activos por defecto, con token
+    buckets en memoria del proceso; RATE_LIMIT_ENABLED=0 los desactiva y
+    RATE_LIMIT_BACKEND=mongo los comparte entre workers.
+
+    RATE_LIMIT_PROXY_HOPS es la cantidad de proxies propios delante de la app: 1 por
+    defecto, como en el despliegue detrás del ingress; 0 si está expuesta directo.
+    Con 1 sin proxy un cliente puede esquivar el límite falsificando
+    X-Forwarded-For; con 0 detrás del proxy todos los visitantes compartirían un
+    mismo bucket, que es el error más caro.
+    """
+    if os.environ.get("RATE_LIMIT_ENABLED", "1") != "1":
+        return None
+
+    if os.environ.get("RATE_LIMIT_BACKEND", "memory") == "mongo":
+        limiter = MongoWindowLimiter(db[RATE_LIMITS_COLLECTION])
+    else:
+        limiter = TokenBucketLimiter(max_keys=int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000")))
+
+    return RateLimitPolicy(
+        limiter,
+        ip_rate=float(os.environ.get("RATE_LIMIT_IP_PER_MINUTE", "10")),
+        ip_burst=int(os.environ.get("RATE_LIMIT_IP_BURST", "5")),
+        email_rate=float(os.environ.get("RATE_LIMIT_EMAIL_PER_MINUTE", "2")),
+        email_burst=int(os.environ.get("RATE_LIMIT_EMAIL_BURST", "3")),
+        proxy_hops=int(os.environ.get("RATE_LIMIT_PROXY_HOPS", "1"))
+    )
+
+
+def get_rate_limit_policy(request: Request) -> Optional[RateLimitPolicy]:
+    """Dependencia de FastAPI: límites creados en el lifespan (None si están desactivados)"""
+    return request.app.state.rate_limit_policy
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from core.timeutil import to_utc_naive
+
+logger = logging.getLogger(__name__)
+
+RAW_COLLECTION = "status_checks"
+MIGRATION_BATCH_SIZE = 1000
+MAX_SERIES_POINTS = 20000
+EPOCH = datetime(1970, 1, 1)
+# Con rangos de hasta 2 días la serie por minuto sigue siendo chica (2880 puntos por cliente)
+MINUTE_RESOLUTION_MAX_SPAN = timedelta(days=2)
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    """Nivel de agregación: un documento por client_name y bucket, con vencimiento propio"""
+    collection: str
+    step: timedelta
+    retention: timedelta
+
+
+# Los heartbeats crudos y cada nivel vencen por TTL sobre expire_at
+RAW_RETENTION = timedelta(hours=int(os.environ.get("STATUS_RAW_RETENTION_HOURS", "48")))
+
+TIERS: Dict[str, RollupTier] = {
+    "minute": RollupTier(
+        "status_rollups_minute",
+        timedelta(minutes=1),
+        timedelta(days=int(os.environ.get("STATUS_MINUTE_RETENTION_DAYS", "7")))
+    ),
+    "hour": RollupTier(
+        "status_rollups_hour",
+        timedelta(hours=1),
+        timedelta(days=int(os.environ.get("STATUS_HOUR_RETENTION_DAYS", "365")))
+    ),
+}
+
+
+def bucket_start(moment: datetime, step: timedelta) -> datetime:
+    moment = to_utc_naive(moment)
+    return moment - (moment - EPOCH) % step
+
+
+def raw_expire_at(timestamp: datetime) -> datetime:
+    return to_utc_naive(timestamp) + RAW_RETENTION
+
+
+async def record_heartbeat(db, client_name: str, timestamp: datetime) -> None:
+    """Suma el heartbeat a cada nivel de rollup (upsert por client_name y bucket)"""
+    timestamp = to_utc_naive(timestamp)
+
+    async def increment(tier: RollupTier):
+        bucket = bucket_start(timestamp, tier.step)
+        await db[tier.collection].update_one(
+            {"client_name": client_name, "bucket": bucket},
+            {
+                "$inc": {"count": 1},
+                "$min": {"first_seen": timestamp},
+                "$max": {"last_seen": timestamp},
+                "$setOnInsert": {"expire_at": bucket + tier.retention},
+            },
+            upsert=True
+        )
+
+    await asyncio.gather(*(increment(tier) for tier in TIERS.values()))
+
+
+def choose_resolution(desde: datetime, hasta: datetime, now: Optional[datetime] = None) -> str:
+    """Por minuto para rangos cortos que la retención por minuto todavía cubre; si no, por hora"""
+    now = now or datetime.utcnow()
+    fits_minute_retention = desde >= now - TIERS["minute"].retention
+    if hasta - desde <= MINUTE_RESOLUTION_MAX_SPAN and fits_minute_retention:
+        return "minute"
+    return "hour"
+
+
+async def query_series(db, resolution: str, desde: datetime, hasta: datetime,
+                       client_name: Optional[str] = None) -> List[dict]:
+    tier = TIERS[resolution]
+    query = {"bucket": {"$gte": bucket_start(desde, tier.step), "$lt": hasta}}
+    if client_name:
+        query["client_name"] = client_name
+
+    projection = {"_id": 0, "client_name": 1, "bucket": 1, "count": 1, "first_seen": 1, "last_seen": 1}
+    cursor = db[tier.collection].find(query, projection).sort([("bucket", 1), ("client_name", 1)])
+    return await cursor.limit(MAX_SERIES_POINTS).to_list(MAX_SERIES_POINTS)
+
+
+async def _convert_string_timestamps(db) -> int:
+    """Los heartbeats viejos guardaban timestamp como string ISO: se pasan a fecha"""
+    converted = 0
+    operations = []
+    cursor = db[RAW_COLLECTION].find({"timestamp": {"$type": "string"}}, {"timestamp": 1})
+    async for document in cursor.batch_size(MIGRATION_BATCH_SIZE):
+        try:
+            timestamp = to_utc_naive(datetime.fromisoformat(document["timestamp"]))
+        except ValueError:
+            logger.warning("Timestamp inválido en status_checks %s, se omite", document['_id'])
+            continue
+        operations.append(UpdateOne(
+            {"_id": document["_id"]},
+            {"$set": {"timestamp": timestamp}}
+        ))
+        if len(operations) == MIGRATION_BATCH_SIZE:
+            converted += (await db[RAW_COLLECTION].bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        converted += (await db[RAW_COLLECTION].bulk_write(operations, ordered=False)).modified_count
+    return converted
+
+
+async def _set_missing_expiry(db) -> int:
+    result = await db[RAW_COLLECTION].update_many(
+        {"expire_at": {"$exists": False}, "timestamp": {"$type": "date"}},
+        [{"$set": {"expire_at": {"$add": ["$timestamp", int(RAW_RETENTION.total_seconds() * 1000)]}}}]
+    )
+    return result.modified_count
+
+
+async def _rebuild_tier(db, tier: RollupTier) -> int:
+    """Recalcula un nivel desde los heartbeats crudos dentro de su retención"""
+    since = bucket_start(datetime.utcnow() - tier.retention, tier.step)
+    step_ms = int(tier.step.total_seconds() * 1000)
+    epoch_ms = {"$subtract": ["$timestamp", EPOCH]}
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": since, "$type": "date"}}},
+        {"$group": {
+            # Inicio del bucket: timestamp truncado al múltiplo de step desde epoch
+            "_id": {
+                "client_name": "$client_name",
+                "bucket": {"$subtract": ["$timestamp", {"$mod": [epoch_ms, step_ms]}]},
+            },
+            "count": {"$sum": 1},
+            "first_seen": {"$min": "$timestamp"},
+            "last_seen": {"$max": "$timestamp"},
+        }},
+    ]
+
+    buckets = 0
+    operations = []
+    async for group in db[RAW_COLLECTION].aggregate(pipeline, allowDiskUse=True):
+        key = group["_id"]
+        operations.append(UpdateOne(
+            {"client_name": key["client_name"], "bucket": key["bucket"]},
+            {"$set": {
+                "count": group["count"],
+                "first_seen": group["first_seen"],
+                "last_seen": group["last_seen"],
+                "expire_at": key["bucket"] + tier.retention,
+            }},
+            upsert=True
+        ))
+        if len(operations) == MIGRATION_BATCH_SIZE:
+            await db[tier.collection].bulk_write(operations, ordered=False)
+            buckets += len(operations)
+            operations = []
+    if operations:
+        await db[tier.collection].bulk_write(operations, ordered=False)
+        buckets += len(operations)
+    return buckets
+
+
+async def migrate_status_checks(db) -> dict:
+    """
+    Migra los heartbeats existentes al formato de serie temporal: timestamp como fecha,
+    expire_at para el TTL y rollups reconstruidos. Conviene correrlo sin tráfico de
+    heartbeats, porque los rollups se reescriben con los totales calculados.
+    """
+    converted = await _convert_string_timestamps(db)
+    # Los rollups se reconstruyen antes de poner expire_at: si no, el TTL podría borrar
+    # heartbeats viejos antes de que queden sumados en el nivel por hora
+    rollups = {name: await _rebuild_tier(db, tier) for name, tier in TIERS.items()}
+    expiring = await _set_missing_expiry(db)
+    return {"convertidos": converted, "con_vencimiento": expiring, "rollups": rollups}
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+# Servidor para los tests de integración: un MongoDB local. Los tests de change
+# streams necesitan un replica set (alcanza con uno de un solo nodo:
+# mongod --replSet rs0 y rs.initiate()); el resto corre también en standalone.
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017/?directConnection=true")
+
+
+@pytest.fixture
+def anyio_backend():
+    # Motor solo funciona sobre asyncio
+    return "asyncio"
+
+
+@pytest.fixture
+async def mongo_client():
+    client = AsyncIOMotorClient(TEST_MONGO_URL, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"MongoDB no disponible en {TEST_MONGO_URL}")
+
+    yield client
+    client.close()
+
+
+@pytest.fixture
+async def db(mongo_client):
+    """Base descartable por test"""
+    database = mongo_client[f"test_{uuid.uuid4().hex[:12]}"]
+    yield database
+    await mongo_client.drop_database(database.name)
+
+
+@pytest.fixture
+async def is_replica_set(mongo_client) -> bool:
+    """Si el servidor de los tests es un replica set (los change streams lo necesitan)"""
+    hello = await mongo_client.admin.command("hello")
+    return "setName" in hello
+
+
+async def _wait_for(predicate, timeout: float = 10.0, interval: float = 0.05) -> bool:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(interval)
+    return predicate()
+
+
+@pytest.fixture
+def wait_for():
+    """wait_for(predicate): espera a que sea verdadero; devuelve False si se vence el tiempo"""
+    return _wait_for
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from core.cache import ResponseCache
+from services.cache_sync import CACHE_VERSIONS_COLLECTION, CacheSync
+
+pytestmark = pytest.mark.anyio
+
+NAMESPACE = "logos"
+
+
+@pytest.fixture
+def replica_set(is_replica_set):
+    if not is_replica_set:
+        pytest.skip("Los change streams necesitan un replica set")
+
+
+async def test_change_stream_invalidates_other_worker(db, replica_set, wait_for):
+    # Dos workers con su propia caché sobre la misma base
+    cache_a, cache_b = ResponseCache(), ResponseCache()
+    sync_a, sync_b = CacheSync(db, cache_a), CacheSync(db, cache_b)
+    sync_a.start()
+    sync_b.start()
+    try:
+        assert await wait_for(lambda: sync_a.mode == "change_stream" and sync_b.mode == "change_stream")
+        # Al abrir el stream sin token se invalida todo una vez: se espera a que pase
+        assert await wait_for(lambda: cache_b.version(NAMESPACE) > 0)
+        before = cache_b.version(NAMESPACE)
+
+        # El worker A escribe e invalida su propia caché, como hacen las rutas
+        await db.logos.insert_one({"id": "logo-1", "nombre": "Uno"})
+        cache_a.invalidate(NAMESPACE)
+
+        assert await wait_for(lambda: cache_b.version(NAMESPACE) > before)
+        # Con change streams no hace falta el contador de versiones
+        assert await db[CACHE_VERSIONS_COLLECTION].count_documents({}) == 0
+    finally:
+        await sync_a.stop()
+        await sync_b.stop()
+
+
+async def test_change_stream_resumes_from_token(db, replica_set, wait_for):
+    cache = ResponseCache()
+    sync = CacheSync(db, cache)
+    sync.start()
+    try:
+        assert await wait_for(lambda: sync.mode == "change_stream")
+        await db.logos.insert_one({"id": "logo-1", "nombre": "Uno"})
+        assert await wait_for(lambda: sync._resume_token is not None)
+    finally:
+        await sync.stop()
+    token = sync._resume_token
+
+    # Cambio mientras el worker no escuchaba (reinicio o desconexión)
+    await db.logos.update_one({"id": "logo-1"}, {"$set": {"nombre": "Otro"}})
+
+    restarted_cache = ResponseCache()
+    restarted = CacheSync(db, restarted_cache)
+    restarted._resume_token = token
+    restarted.start()
+    try:
+        # Con token no se invalida todo al abrir: la invalidación viene del cambio perdido
+        assert await wait_for(lambda: restarted_cache.version(NAMESPACE) > 0)
+        assert restarted.mode == "change_stream"
+    finally:
+        await restarted.stop()
+
+
+async def test_polling_fallback_uses_version_counter(db, is_replica_set, wait_for):
+    # En standalone el modo auto tiene que caer a polling; en un replica set se fuerza
+    mode = "polling" if is_replica_set else "auto"
+    cache_a, cache_b = ResponseCache(), ResponseCache()
+    sync_a = CacheSync(db, cache_a, mode=mode, poll_interval=0.1)
+    sync_b = CacheSync(db, cache_b, mode=mode, poll_interval=0.1)
+    sync_a.start()
+    sync_b.start()
+    try:
+        assert await wait_for(lambda: sync_a.mode == "polling" and sync_b.mode == "polling")
+        # Primera lectura de versiones de B: desde ahí compara
+        await asyncio.sleep(0.3)
+        before = cache_b.version(NAMESPACE)
+
+        cache_a.invalidate(NAMESPACE)
+
+        assert await wait_for(lambda: cache_b.version(NAMESPACE) > before)
+        counter = await db[CACHE_VERSIONS_COLLECTION].find_one({"_id": NAMESPACE})
+        assert counter is not None and counter["version"] >= 1
+
+        # Los espacios de nombres que no se sincronizan no tocan el contador
+        cache_a.invalidate("contactos")
+        await asyncio.sleep(0.3)
+        assert await db[CACHE_VERSIONS_COLLECTION].find_one({"_id": "contactos"}) is None
+    finally:
+        await sync_a.stop()
+        await sync_b.stop()
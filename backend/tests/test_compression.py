@@ -0,0 +1,125 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core import compression
+from core.compression import (
+    CompressionMiddleware,
+    Encoding,
+    compress,
+    is_compressible,
+    negotiate_encoding,
+    varies_by_encoding,
+    weak_etag
+)
+
+
+@pytest.fixture
+def encodings(monkeypatch):
+    # Las tres disponibles aunque brotli o zstandard no estén instalados: la negociación
+    # solo mira los nombres y el orden
+    available = {name: Encoding(name, compression._gzip, 6, 9) for name in ("zstd", "br", "gzip")}
+    monkeypatch.setattr(compression, "ENCODINGS", available)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP ; q=0.5", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip, br, zstd", "zstd"),
+    ("gzip;q=1.0, br;q=0.8, zstd;q=0.5", "gzip"),
+    ("br;q=0, gzip;q=0.1", "gzip"),
+    ("*", "zstd"),
+    ("*;q=0.5, gzip", "gzip"),
+    ("*, zstd;q=0", "br"),
+    ("*;q=0", None),
+    ("gzip;q=abc", None),
+])
+def test_negotiate_encoding(encodings, accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_gzip_is_always_available():
+    assert "gzip" in compression.ENCODINGS
+    assert negotiate_encoding("gzip") == "gzip"
+
+
+def test_compress_round_trip_and_is_deterministic():
+    data = b'{"success": true}' * 100
+
+    compressed = compress(data, "gzip")
+
+    assert gzip.decompress(compressed) == data
+    assert compress(data, "gzip") == compressed
+    assert gzip.decompress(compress(data, "gzip", cached=True)) == data
+
+
+@pytest.mark.parametrize("vary, expected", [
+    (None, False),
+    ("Origin", False),
+    ("Origin, accept-encoding", True),
+    ("*", True),
+])
+def test_varies_by_encoding(vary, expected):
+    assert varies_by_encoding({"vary": vary} if vary else {}) is expected
+
+
+def test_is_compressible_and_weak_etag():
+    assert is_compressible("application/json; charset=utf-8")
+    assert is_compressible("text/csv")
+    assert not is_compressible("image/png")
+    assert not is_compressible(None)
+    assert weak_etag('"abc"') == 'W/"abc"'
+    assert weak_etag('W/"abc"') == 'W/"abc"'
+
+
+BIG = b'{"logos": []}' * 200
+
+
+def middleware_client() -> TestClient:
+
+    async def json_body(request):
+        return Response(BIG, media_type="application/json", headers={"ETag": '"v1"'})
+
+    async def small(request):
+        return Response(b"{}", media_type="application/json")
+
+    async def image(request):
+        return Response(BIG, media_type="image/png")
+
+    app = Starlette(routes=[Route("/json", json_body), Route("/small", small), Route("/image", image)])
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+def test_middleware_compresses_json_for_gzip_clients():
+    client = middleware_client()
+
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "accept-encoding" in response.headers["vary"].lower()
+    # httpx descomprime el cuerpo
+    assert response.content == BIG
+
+
+def test_middleware_leaves_other_responses_alone():
+    client = middleware_client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/json", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert "accept-encoding" in small.headers["vary"].lower()
+    assert "content-encoding" not in image.headers
+    assert "vary" not in image.headers
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"v1"'
@@ -0,0 +1,82 @@
+import csv
+import gzip
+import io
+from datetime import datetime
+
+import orjson
+import pytest
+
+from services.contact_export import (
+    EXPORT_COLUMNS,
+    ROWS_PER_CHUNK,
+    gzip_stream,
+    iter_contacts_csv,
+    iter_contacts_ndjson
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def contact(i: int) -> dict:
+    return {
+        "created_at": datetime(2024, 1, 1, 12, 0, i % 60),
+        "nombre": f"Nombre {i}",
+        "email": f"n{i}@example.com",
+        "telefono": "12345",
+        "empresa": "Empresa, S.A.",
+        "tipo_empresa": "Otro",
+        "mensaje": None,
+    }
+
+
+async def cursor(documents):
+    for document in documents:
+        yield document
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+async def test_csv_export_streams_in_chunks():
+    chunks = await collect(iter_contacts_csv(cursor([contact(i) for i in range(ROWS_PER_CHUNK + 1)])))
+
+    # Un bloque por cada ROWS_PER_CHUNK filas y el resto al final
+    assert len(chunks) == 2
+    text = b"".join(chunks).decode("utf-8")
+    assert text.startswith("\ufeff")
+
+    rows = list(csv.reader(io.StringIO(text[1:])))
+    assert rows[0] == [header for header, _ in EXPORT_COLUMNS]
+    assert len(rows) == ROWS_PER_CHUNK + 2
+    assert rows[1] == ["2024-01-01T12:00:00", "Nombre 0", "n0@example.com", "12345", "Empresa, S.A.", "Otro", ""]
+
+
+async def test_csv_export_without_contacts_has_only_the_header():
+    chunks = await collect(iter_contacts_csv(cursor([])))
+
+    assert b"".join(chunks).decode("utf-8") == "\ufeff" + ",".join(h for h, _ in EXPORT_COLUMNS) + "\r\n"
+
+
+async def test_ndjson_export_writes_one_object_per_line():
+    chunks = await collect(iter_contacts_ndjson(cursor([contact(i) for i in range(3)])))
+
+    lines = b"".join(chunks).splitlines()
+    assert len(lines) == 3
+    assert orjson.loads(lines[0]) == {
+        "created_at": "2024-01-01T12:00:00",
+        "nombre": "Nombre 0",
+        "email": "n0@example.com",
+        "telefono": "12345",
+        "empresa": "Empresa, S.A.",
+        "tipo_empresa": "Otro",
+        "mensaje": None,
+    }
+
+
+async def test_gzip_stream_round_trips():
+    chunks = [b"a" * 10000, b"b" * 10000, b""]
+
+    compressed = b"".join(await collect(gzip_stream(cursor(chunks))))
+
+    assert gzip.decompress(compressed) == b"".join(chunks)
@@ -0,0 +1,163 @@
+from datetime import datetime
+
+import pytest
+
+from services.contact_import import (
+    ImportTooLarge,
+    InvalidImport,
+    _validate_batch,
+    limit_stream,
+    parse_csv,
+    parse_ndjson
+)
+
+pytestmark = pytest.mark.anyio
+
+HEADER = "nombre,email,telefono,empresa,tipo_empresa,mensaje\n"
+VALID_TYPES = ["Empresa", "Otro"]
+
+
+async def chunked(data: bytes, size: int = 64 * 1024):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+def contacts(count: int) -> str:
+    return "".join(f"Nombre {i},n{i}@example.com,12345,Empresa,Otro,hola\n" for i in range(count))
+
+
+async def test_csv_quoted_field_spans_lines_and_chunks():
+    data = HEADER + 'Ana,ana@example.com,12345,Empresa,Otro,"línea 1\nlínea ""2"", fin"\n' + contacts(1)
+
+    rows = await collect(parse_csv(chunked(data.encode(), size=7)))
+
+    assert [number for number, _ in rows] == [1, 2]
+    assert rows[0][1]["mensaje"] == 'línea 1\nlínea "2", fin'
+    assert rows[1][1]["nombre"] == "Nombre 0"
+
+
+async def test_csv_quote_inside_field_is_literal():
+    # Como en csv, una comilla en el medio de un campo no abre un campo entre comillas
+    data = HEADER + 'Ana,ana@example.com,12345,Empresa,Otro,monitor de 5" pantalla\n' + contacts(40000)
+
+    rows = await collect(parse_csv(chunked(data.encode())))
+
+    assert len(rows) == 40001
+    assert rows[0][1]["mensaje"] == 'monitor de 5" pantalla'
+    assert not any("__error__" in row for _, row in rows)
+
+
+async def test_csv_unclosed_quote_is_a_single_row_error():
+    # La comilla sin cerrar se come líneas hasta el límite por registro: esa fila es un
+    # error y el resto del archivo se vuelve a leer como registros normales
+    data = HEADER + 'Ana,ana@example.com,12345,Empresa,Otro,"5 pantalla\n' + contacts(40000)
+
+    rows = await collect(parse_csv(chunked(data.encode()), max_record_chars=4096))
+
+    assert len(rows) == 40001
+    assert "demasiado largo" in rows[0][1]["__error__"]
+    assert rows[1] == (2, {
+        "nombre": "Nombre 0",
+        "email": "n0@example.com",
+        "telefono": "12345",
+        "empresa": "Empresa",
+        "tipoEmpresa": "Otro",
+        "mensaje": "hola",
+    })
+    assert sum("__error__" in row for _, row in rows) == 1
+
+
+async def test_csv_overlong_line_is_a_single_row_error():
+    data = HEADER + "x" * 10000 + "\n" + contacts(1)
+
+    rows = await collect(parse_csv(chunked(data.encode(), size=1000), max_record_chars=4096))
+
+    assert [number for number, _ in rows] == [1, 2]
+    assert "__error__" in rows[0][1]
+    assert rows[1][1]["nombre"] == "Nombre 0"
+
+
+async def test_ndjson_reports_bad_lines_and_keeps_going():
+    data = b'{"nombre": "Ana"}\n\n[1]\nno es json\n' + b"x" * 10000 + b'\n{"email": "e@example.com"}'
+
+    rows = await collect(parse_ndjson(chunked(data, size=100), max_record_chars=4096))
+
+    assert rows == [
+        (1, {"nombre": "Ana"}),
+        (2, {"__error__": "Se esperaba un objeto JSON"}),
+        (3, {"__error__": "JSON inválido"}),
+        (4, {"__error__": "Línea demasiado larga"}),
+        (5, {"email": "e@example.com"}),
+    ]
+
+
+async def test_limit_stream_cuts_off_large_files():
+    with pytest.raises(ImportTooLarge):
+        await collect(limit_stream(chunked(b"x" * 100, size=10), max_bytes=99))
+
+    assert len(b"".join(await collect(limit_stream(chunked(b"x" * 100, size=10), max_bytes=100)))) == 100
+
+
+async def test_csv_must_be_utf8():
+    with pytest.raises(InvalidImport):
+        await collect(parse_csv(chunked((HEADER + "José,j@example.com,12345,E,Otro,\n").encode("latin-1"))))
+
+
+async def test_csv_needs_a_recognised_header():
+    with pytest.raises(InvalidImport):
+        await collect(parse_csv(chunked(b"a,b,c\n1,2,3\n")))
+
+
+async def test_csv_export_reimports_with_its_headers():
+    # Mismo encabezado (y BOM) que la exportación
+    data = (
+        "\ufeffFecha,Nombre,Email,Teléfono,Empresa,Tipo Empresa,Mensaje\n"
+        "2024-05-17T13:45:12,Ana,ana@example.com,12345,Empresa,Otro,\n"
+        "\n"
+    )
+
+    rows = await collect(parse_csv(chunked(data.encode())))
+
+    assert rows == [(1, {
+        "created_at": "2024-05-17T13:45:12",
+        "nombre": "Ana",
+        "email": "ana@example.com",
+        "telefono": "12345",
+        "empresa": "Empresa",
+        "tipoEmpresa": "Otro",
+        "mensaje": "",
+    })]
+
+    documents, errors = _validate_batch(rows, VALID_TYPES)
+
+    assert errors == {}
+    assert documents[0]["created_at"] == datetime(2024, 5, 17, 13, 45, 12)
+    assert documents[0]["tipo_empresa"] == "Otro"
+    assert documents[0]["mensaje"] is None
+    assert documents[0]["_fila"] == 1
+
+
+def test_validate_batch_reports_errors_per_row():
+    valid = {"nombre": "Ana", "email": "ana@example.com", "telefono": "12345", "empresa": "Empresa", "tipoEmpresa": "Otro"}
+    rows = [
+        (1, valid),
+        (2, {**valid, "email": "no-es-un-email"}),
+        (3, {**valid, "tipoEmpresa": "Desconocido"}),
+        (4, {**valid, "created_at": "ayer"}),
+        (5, {"__error__": "JSON inválido"}),
+        (6, {**valid, "created_at": "2024-01-01T10:00:00+03:00"}),
+    ]
+
+    documents, errors = _validate_batch(rows, VALID_TYPES)
+
+    assert [document["_fila"] for document in documents] == [1, 6]
+    assert documents[1]["created_at"] == datetime(2024, 1, 1, 7, 0)
+    assert sorted(errors) == [2, 3, 4, 5]
+    assert errors[2][0].startswith("email")
+    assert errors[3][0].startswith("tipoEmpresa")
+    assert errors[4] == ["created_at: fecha inválida"]
+    assert errors[5] == ["JSON inválido"]
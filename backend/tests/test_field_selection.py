@@ -0,0 +1,57 @@
+import pytest
+
+from services.field_selection import cache_key, select_fields, trim_fields
+
+AVAILABLE = {
+    "id": ("_id",),
+    "nombre": ("nombre",),
+    "imagen": ("imagen_sha256", "content_type"),
+    "orden": ("orden",),
+}
+
+
+def test_all_fields_by_default():
+    requested, projection = select_fields(None, False, AVAILABLE)
+
+    assert requested == ["id", "nombre", "imagen", "orden"]
+    assert projection == {"_id": 1, "nombre": 1, "imagen_sha256": 1, "content_type": 1, "orden": 1}
+
+
+def test_requested_fields_keep_order_without_duplicates():
+    requested, projection = select_fields(" orden, nombre,,orden ", False, AVAILABLE)
+
+    assert requested == ["orden", "nombre"]
+    # Sin "id" la proyección tiene que excluir _id explícitamente
+    assert projection == {"orden": 1, "nombre": 1, "_id": 0}
+
+
+def test_unknown_field_raises_value_error():
+    with pytest.raises(ValueError, match="password"):
+        select_fields("nombre,password", False, AVAILABLE)
+
+
+def test_meta_drops_heavy_fields():
+    requested, projection = select_fields(None, True, AVAILABLE, heavy=("imagen",))
+
+    assert requested == ["id", "nombre", "orden"]
+    assert "imagen_sha256" not in projection
+    assert "content_type" not in projection
+
+
+def test_always_fields_are_projected_but_not_returned():
+    requested, projection = select_fields("nombre", False, AVAILABLE, always=("orden", "_id"))
+
+    assert requested == ["nombre"]
+    assert projection == {"nombre": 1, "orden": 1, "_id": 1}
+
+
+def test_trim_fields_keeps_requested_fields_present_in_the_document():
+    document = {"id": "1", "nombre": "Empresa", "orden": 2}
+
+    assert trim_fields(document, ["orden", "imagen", "nombre"]) == {"orden": 2, "nombre": "Empresa"}
+
+
+def test_cache_key_is_the_prefix_for_the_full_selection():
+    assert cache_key("list", list(AVAILABLE), AVAILABLE) == "list"
+    assert cache_key("list", ["nombre", "orden"], AVAILABLE) == "list:nombre,orden"
+    assert cache_key("list", ["orden", "nombre"], AVAILABLE) != cache_key("list", ["nombre", "orden"], AVAILABLE)
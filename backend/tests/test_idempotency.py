@@ -0,0 +1,159 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from routes.contact_routes import guard_contact_submission
+from services import idempotency
+from services.idempotency import (
+    STATE_DONE,
+    STATE_PENDING,
+    IdempotentReplay,
+    MemoryIdempotencyStore,
+    idempotent_replay_handler
+)
+from services.rate_limit import RateLimitPolicy, TokenBucketLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(idempotency.time, "monotonic", clock)
+    return clock
+
+
+async def test_begin_reserves_once_then_returns_the_record(clock):
+    store = MemoryIdempotencyStore()
+
+    assert await store.begin("k", "huella") is None
+    record = await store.begin("k", "huella")
+
+    assert record["state"] == STATE_PENDING
+    assert record["fingerprint"] == "huella"
+
+
+async def test_complete_keeps_the_response_for_replay(clock):
+    store = MemoryIdempotencyStore()
+    await store.begin("k", "huella")
+
+    await store.complete("k", 201, {"id": "1"})
+
+    record = await store.get("k")
+    assert (record["state"], record["status_code"], record["payload"]) == (STATE_DONE, 201, {"id": "1"})
+
+
+async def test_release_frees_the_key_for_a_retry(clock):
+    store = MemoryIdempotencyStore()
+    await store.begin("k", "huella")
+
+    await store.release("k")
+
+    assert await store.get("k") is None
+    assert await store.begin("k", "huella") is None
+
+
+async def test_records_expire(clock):
+    store = MemoryIdempotencyStore(ttl_seconds=60)
+    await store.begin("k", "huella")
+
+    clock.now += 61
+
+    assert await store.get("k") is None
+    assert await store.begin("k", "otra") is None
+    assert (await store.get("k"))["fingerprint"] == "otra"
+
+
+async def test_least_recently_used_key_is_evicted(clock):
+    store = MemoryIdempotencyStore(max_keys=2)
+    await store.begin("a", "huella")
+    await store.begin("b", "huella")
+    # Volver a usar "a" la marca como reciente: la que se descarta es "b"
+    await store.begin("a", "huella")
+    await store.begin("c", "huella")
+
+    assert await store.get("a") is not None
+    assert await store.get("b") is None
+    assert await store.get("c") is not None
+
+
+class CountingStore(MemoryIdempotencyStore):
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    async def get(self, key):
+        self.lookups += 1
+        return await super().get(key)
+
+
+def guard_client(policy=None):
+    app = FastAPI()
+    app.add_exception_handler(IdempotentReplay, idempotent_replay_handler)
+    app.state.rate_limit_policy = policy
+    app.state.idempotency_store = CountingStore()
+
+    @app.post("/contacto")
+    async def contacto(claim=Depends(guard_contact_submission)):
+        return {"claim": claim}
+
+    return TestClient(app), app.state.idempotency_store
+
+
+def test_guard_scopes_the_key_to_the_body():
+    client, store = guard_client()
+
+    first = client.post("/contacto", content=b'{"a": 1}', headers={"Idempotency-Key": "k"}).json()["claim"]
+    other = client.post("/contacto", content=b'{"a": 2}', headers={"Idempotency-Key": "k"}).json()["claim"]
+
+    assert first[0].endswith(":k") and other[0].endswith(":k")
+    assert first[0] != other[0]
+
+
+async def test_guard_replays_a_finished_request_only_for_the_same_body():
+    client, store = guard_client()
+    key, fingerprint = client.post("/contacto", content=b'{"a": 1}', headers={"Idempotency-Key": "k"}).json()["claim"]
+    await store.begin(key, fingerprint)
+    await store.complete(key, 201, {"id": "1"})
+
+    replay = client.post("/contacto", content=b'{"a": 1}', headers={"Idempotency-Key": "k"})
+    other = client.post("/contacto", content=b'{"a": 2}', headers={"Idempotency-Key": "k"})
+
+    assert replay.status_code == 201
+    assert replay.json() == {"id": "1"}
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert other.status_code == 200
+
+
+async def test_guard_rejects_a_key_in_progress():
+    client, store = guard_client()
+    key, fingerprint = client.post("/contacto", content=b"{}", headers={"Idempotency-Key": "k"}).json()["claim"]
+    await store.begin(key, fingerprint)
+
+    assert client.post("/contacto", content=b"{}", headers={"Idempotency-Key": "k"}).status_code == 409
+
+
+def test_guard_rate_limits_before_looking_up_the_key():
+    policy = RateLimitPolicy(TokenBucketLimiter(), 1, 1, 10, 10, proxy_hops=0)
+    client, store = guard_client(policy)
+
+    assert client.post("/contacto", content=b"{}", headers={"Idempotency-Key": "k"}).status_code == 200
+    response = client.post("/contacto", content=b"{}", headers={"Idempotency-Key": "k"})
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert store.lookups == 1
+
+
+def test_guard_rejects_an_overlong_key():
+    client, _ = guard_client()
+
+    assert client.post("/contacto", content=b"{}", headers={"Idempotency-Key": "k" * 256}).status_code == 400
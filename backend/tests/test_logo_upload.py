@@ -0,0 +1,126 @@
+import base64
+
+import pytest
+from starlette.requests import Request
+
+from services.logo_storage import MemoryLogoStorage, content_sha256, decode_data_uri, sniff_image_type
+from services.logo_upload import InvalidUpload, UploadTooLarge, receive_multipart_logo
+
+pytestmark = pytest.mark.anyio
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200
+BOUNDARY = "limite"
+
+
+@pytest.mark.parametrize("head, content_type", [
+    (PNG, "image/png"),
+    (b"\xff\xd8\xff\xe0" + b"\x00" * 12, "image/jpeg"),
+    (b"GIF89a" + b"\x00" * 10, "image/gif"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+    (b"\x00\x00\x00\x1cftypavif" + b"\x00" * 4, "image/avif"),
+    # WEBP sin el contenedor RIFF no es una imagen
+    (b"XXXX\x00\x00\x00\x00WEBPVP8 ", None),
+    (b"<svg xmlns=", None),
+    (b"", None),
+])
+def test_sniff_image_type(head, content_type):
+    assert sniff_image_type(head) == content_type
+
+
+def test_decode_data_uri():
+    encoded = base64.b64encode(PNG).decode()
+
+    assert decode_data_uri(f"data:image/png;base64,{encoded}") == (PNG, "image/png")
+    assert decode_data_uri(f"  {encoded}\n") == (PNG, "application/octet-stream")
+
+
+@pytest.mark.parametrize("value", [
+    "data:image/png,sin-base64",
+    "data:image/png;base64",
+    "no es base64!",
+    "",
+    "data:image/png;base64,",
+])
+def test_decode_data_uri_rejects_invalid_content(value):
+    with pytest.raises(ValueError):
+        decode_data_uri(value)
+
+
+def multipart(*parts) -> bytes:
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + value + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(body: bytes, chunk_size: int = 64) -> Request:
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+
+async def test_multipart_stores_the_file():
+    storage = MemoryLogoStorage()
+    reserved = []
+
+    async def reserve_blob(sha256):
+        reserved.append(sha256)
+
+    body = multipart(("nombre", b"Empresa", None), ("imagen", PNG, "logo.png"))
+    nombre, blob = await receive_multipart_logo(make_request(body), storage, reserve_blob=reserve_blob)
+
+    assert nombre == "Empresa"
+    assert (blob.sha256, blob.size, blob.content_type) == (content_sha256(PNG), len(PNG), "image/png")
+    assert reserved == [blob.sha256]
+    assert await storage.read(blob.sha256) == PNG
+
+
+async def test_multipart_uses_the_filename_without_nombre():
+    nombre, _ = await receive_multipart_logo(
+        make_request(multipart(("imagen", PNG, "logo.png"))), MemoryLogoStorage()
+    )
+
+    assert nombre == "logo.png"
+
+
+async def test_multipart_rejects_a_file_over_the_limit():
+    storage = MemoryLogoStorage()
+
+    with pytest.raises(UploadTooLarge):
+        await receive_multipart_logo(
+            make_request(multipart(("imagen", PNG, "logo.png"))), storage, max_bytes=len(PNG) - 1
+        )
+
+    assert await storage.open(content_sha256(PNG)) is None
+
+
+async def test_multipart_rejects_an_unknown_format():
+    with pytest.raises(InvalidUpload):
+        await receive_multipart_logo(
+            make_request(multipart(("imagen", b"<svg>" + b" " * 100, "logo.svg"))), MemoryLogoStorage()
+        )
+
+
+async def test_multipart_releases_the_blob_when_a_later_field_fails():
+    storage = MemoryLogoStorage()
+    released = []
+
+    async def release_blob(blob):
+        released.append(blob.sha256)
+
+    body = multipart(("imagen", PNG, "logo.png"), ("nombre", b"x" * 2000, None))
+    with pytest.raises(InvalidUpload):
+        await receive_multipart_logo(make_request(body), storage, release_blob=release_blob)
+
+    assert released == [content_sha256(PNG)]
+
+
+async def test_multipart_without_file_is_invalid():
+    with pytest.raises(InvalidUpload):
+        await receive_multipart_logo(make_request(multipart(("nombre", b"Empresa", None))), MemoryLogoStorage())
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from services.pagination import after_cursor_filter, decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 13, 45, 12, 345000)
+    object_id = ObjectId()
+
+    cursor = encode_cursor(created_at, object_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, object_id)
+
+
+def test_cursor_with_timezone_is_normalised_to_naive_utc():
+    object_id = ObjectId()
+    created_at = datetime(2024, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=3)))
+
+    decoded, _ = decode_cursor(raw_cursor({"t": created_at.isoformat(), "i": str(object_id)}))
+
+    assert decoded == datetime(2024, 1, 1, 7, 0)
+    assert decoded.tzinfo is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "no es base64!",
+    base64.urlsafe_b64encode(b"no es json").decode(),
+    raw_cursor([1, 2]),
+    raw_cursor({"t": "2024-01-01T00:00:00"}),
+    raw_cursor({"t": "ayer", "i": str(ObjectId())}),
+    raw_cursor({"t": 5, "i": str(ObjectId())}),
+    raw_cursor({"t": "2024-01-01T00:00:00", "i": "123"}),
+    raw_cursor({"t": "2024-01-01T00:00:00", "i": 123}),
+])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_after_cursor_filter_breaks_ties_by_id():
+    created_at = datetime(2024, 1, 1)
+    object_id = ObjectId()
+
+    assert after_cursor_filter(created_at, object_id) == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": object_id}},
+        ]
+    }
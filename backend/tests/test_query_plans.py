@@ -0,0 +1,33 @@
+import pytest
+
+from core.indexes import HOT_QUERIES, INDEXES, check_query_plans, ensure_indexes
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def indexed_db(db):
+    # Las colecciones se crean explícitamente: sobre una colección inexistente el plan
+    # es EOF y la verificación pasaría aunque faltara el índice
+    for collection in {query["collection"] for query in HOT_QUERIES} | set(INDEXES):
+        await db.create_collection(collection)
+    await ensure_indexes(db)
+    return db
+
+
+async def test_hot_queries_use_indexes(indexed_db):
+    results = await check_query_plans(indexed_db)
+
+    assert len(results) == len(HOT_QUERIES)
+    collscans = [f"{result['name']}: {' > '.join(result['stages'])}" for result in results if not result["ok"]]
+    assert not collscans, "Consultas sin índice:\n" + "\n".join(collscans)
+
+
+async def test_missing_index_is_reported(indexed_db):
+    # La verificación tiene que detectar un índice borrado o renombrado
+    await indexed_db.logos.drop_index("orden_asc")
+
+    results = {result["name"]: result for result in await check_query_plans(indexed_db)}
+
+    assert "COLLSCAN" in results["logos: listado del slider"]["stages"]
+    assert not results["logos: listado del slider"]["ok"]
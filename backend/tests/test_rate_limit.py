@@ -0,0 +1,103 @@
+import pytest
+from starlette.requests import Request
+
+from services import rate_limit
+from services.rate_limit import RateLimitPolicy, TokenBucketLimiter, create_rate_limit_policy, retry_after_header
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def make_request(client_host: str = "10.0.0.1", forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (client_host, 1234)})
+
+
+async def test_token_bucket_allows_the_burst_then_asks_to_wait(clock):
+    limiter = TokenBucketLimiter()
+
+    assert [await limiter.hit("ip:a", 6, 3) for _ in range(3)] == [0, 0, 0]
+    # 6 por minuto: un token cada 10 s
+    assert await limiter.hit("ip:a", 6, 3) == pytest.approx(10)
+    # Otra clave tiene su propio bucket
+    assert await limiter.hit("ip:b", 6, 3) == 0
+
+
+async def test_token_bucket_refills_over_time(clock):
+    limiter = TokenBucketLimiter()
+    for _ in range(3):
+        await limiter.hit("ip:a", 6, 3)
+
+    clock.now += 10
+    assert await limiter.hit("ip:a", 6, 3) == 0
+    assert await limiter.hit("ip:a", 6, 3) > 0
+
+    # Nunca acumula más que el burst
+    clock.now += 3600
+    assert [await limiter.hit("ip:a", 6, 3) for _ in range(4)][-1] > 0
+
+
+async def test_token_bucket_evicts_the_least_recently_used_key(clock):
+    limiter = TokenBucketLimiter(max_keys=2)
+    await limiter.hit("ip:a", 6, 1)
+    await limiter.hit("ip:b", 6, 1)
+    await limiter.hit("ip:c", 6, 1)
+
+    # "a" se descartó y vuelve con el bucket lleno; "c" sigue vacío
+    assert await limiter.hit("ip:a", 6, 1) == 0
+    assert await limiter.hit("ip:c", 6, 1) > 0
+
+
+@pytest.mark.parametrize("proxy_hops, forwarded_for, expected", [
+    (0, "1.1.1.1", "10.0.0.1"),
+    (1, None, "10.0.0.1"),
+    (1, "6.6.6.6, 1.1.1.1", "1.1.1.1"),
+    (2, "6.6.6.6, 1.1.1.1, 172.16.0.1", "1.1.1.1"),
+    (2, "1.1.1.1", "10.0.0.1"),
+])
+def test_client_ip_trusts_only_own_proxies(proxy_hops, forwarded_for, expected):
+    policy = RateLimitPolicy(TokenBucketLimiter(), 10, 5, 2, 3, proxy_hops=proxy_hops)
+
+    assert policy.client_ip(make_request(forwarded_for=forwarded_for)) == expected
+
+
+async def test_email_limit_ignores_case_and_spaces(clock):
+    policy = RateLimitPolicy(TokenBucketLimiter(), 10, 5, 2, 1)
+
+    assert await policy.check_email("Ana@Example.com") == 0
+    assert await policy.check_email(" ana@example.com ") > 0
+
+
+def test_policy_is_on_by_default_behind_one_proxy(monkeypatch):
+    for name in ("RATE_LIMIT_ENABLED", "RATE_LIMIT_PROXY_HOPS", "RATE_LIMIT_BACKEND"):
+        monkeypatch.delenv(name, raising=False)
+
+    policy = create_rate_limit_policy(db=None)
+
+    assert isinstance(policy.limiter, TokenBucketLimiter)
+    assert policy.proxy_hops == 1
+
+
+def test_policy_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "0")
+
+    assert create_rate_limit_policy(db=None) is None
+
+
+def test_retry_after_rounds_up_to_whole_seconds():
+    assert retry_after_header(0.2) == {"Retry-After": "1"}
+    assert retry_after_header(10.01) == {"Retry-After": "11"}
@@ -3,9 +3,12 @@ import axios from 'axios';
 import { Button } from '../components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
+import { Input } from '../components/ui/input';
+import { Checkbox } from '../components/ui/checkbox';
 import { toast } from 'sonner';
 import { 
   ArrowLeft,
+  ArrowRight,
   Mail,
   Phone,
   Building2,
@@ -15,20 +18,35 @@ import {
   Download,
   Upload,
   Trash2,
+  Search,
+  Save,
   Image as ImageIcon
 } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 50;
+const SEARCH_DEBOUNCE_MS = 300;
+const MAX_LOGO_BYTES = 5 * 1024 * 1024;
 
 const AdminPanel = () => {
   const navigate = useNavigate();
   const [contactos, setContactos] = useState([]);
+  const [totalContactos, setTotalContactos] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [stats, setStats] = useState({ total: 0, semana: 0, hoy: 0 });
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
+  const [searching, setSearching] = useState(false);
   const [logos, setLogos] = useState([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
   const [uploadingLogo, setUploadingLogo] = useState(false);
+  const [selectedLogos, setSelectedLogos] = useState([]);
+  const [orderChanged, setOrderChanged] = useState(false);
+  const [savingLogos, setSavingLogos] = useState(false);
 
   // Verificar autenticación
   useEffect(() => {
@@ -47,10 +65,14 @@ const AdminPanel = () => {
   const fetchContactos = async () => {
     try {
       setRefreshing(true);
-      const response = await axios.get(`${API}/contactos`);
+      const response = await axios.get(`${API}/contactos`, {
+        params: { limit: PAGE_SIZE }
+      });
       if (response.data.success) {
         setContactos(response.data.contactos);
-        toast.success(`${response.data.total} contactos cargados`);
+        setTotalContactos(response.data.total);
+        setNextCursor(response.data.next_cursor);
+        toast.success(`${response.data.total} contactos registrados`);
       }
     } catch (error) {
       console.error('Error al cargar contactos:', error);
@@ -61,11 +83,75 @@ const AdminPanel = () => {
     }
   };
 
+  const fetchStats = async () => {
+    try {
+      const response = await axios.get(`${API}/contactos/stats`);
+      if (response.data.success) {
+        setStats(response.data);
+      }
+    } catch (error) {
+      console.error('Error al cargar estadísticas:', error);
+    }
+  };
+
+  const fetchMoreContactos = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await axios.get(`${API}/contactos`, {
+        params: { limit: PAGE_SIZE, after: nextCursor }
+      });
+      if (response.data.success) {
+        setContactos(prev => [...prev, ...response.data.contactos]);
+        setTotalContactos(response.data.total);
+        setNextCursor(response.data.next_cursor);
+      }
+    } catch (error) {
+      console.error('Error al cargar más contactos:', error);
+      toast.error('Error al cargar más contactos');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Búsqueda en el servidor, con debounce mientras se escribe
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (query.length < 2) {
+      setSearchResults(null);
+      return;
+    }
+
+    const timeout = setTimeout(async () => {
+      try {
+        setSearching(true);
+        const response = await axios.get(`${API}/contactos/search`, {
+          params: { q: query, limit: PAGE_SIZE }
+        });
+        if (response.data.success) {
+          setSearchResults(response.data.contactos);
+        }
+      } catch (error) {
+        console.error('Error al buscar contactos:', error);
+        toast.error('Error al buscar contactos');
+      } finally {
+        setSearching(false);
+      }
+    }, SEARCH_DEBOUNCE_MS);
+
+    return () => clearTimeout(timeout);
+  }, [searchQuery]);
+
   const fetchLogos = async () => {
     try {
-      const response = await axios.get(`${API}/logos`);
+      // Solo los campos que usa la grilla de administración
+      const response = await axios.get(`${API}/logos`, {
+        params: { fields: 'id,nombre,imagen_url,variantes' }
+      });
       if (response.data.success) {
         setLogos(response.data.logos);
+        setSelectedLogos([]);
+        setOrderChanged(false);
       }
     } catch (error) {
       console.error('Error al cargar logos:', error);
@@ -82,31 +168,33 @@ const AdminPanel = () => {
       return;
     }
 
-    const reader = new FileReader();
-    reader.onloadend = async () => {
-      try {
-        setUploadingLogo(true);
-        const base64String = reader.result;
-        
-        const response = await axios.post(`${API}/logos`, {
-          nombre: file.name,
-          imagen_base64: base64String
-        });
+    if (file.size > MAX_LOGO_BYTES) {
+      toast.error('La imagen supera el tamaño máximo de 5 MB');
+      event.target.value = '';
+      return;
+    }
 
-        if (response.data.success) {
-          toast.success('Logo agregado exitosamente');
-          fetchLogos();
-        }
-      } catch (error) {
-        console.error('Error al subir logo:', error);
-        toast.error('Error al subir el logo');
-      } finally {
-        setUploadingLogo(false);
-        event.target.value = '';
-      }
-    };
+    // Se envía el archivo tal cual (multipart), sin pasarlo a base64
+    const formData = new FormData();
+    formData.append('nombre', file.name);
+    formData.append('imagen', file);
+
+    try {
+      setUploadingLogo(true);
+      const response = await axios.post(`${API}/logos`, formData);
 
-    reader.readAsDataURL(file);
+      if (response.data.success) {
+        toast.success('Logo agregado exitosamente');
+        fetchLogos();
+      }
+    } catch (error) {
+      console.error('Error al subir logo:', error);
+      const detail = error.response?.data?.detail;
+      toast.error(typeof detail === 'string' ? detail : 'Error al subir el logo');
+    } finally {
+      setUploadingLogo(false);
+      event.target.value = '';
+    }
   };
 
   const handleDeleteLogo = async (logoId, logoNombre) => {
@@ -126,8 +214,70 @@ const AdminPanel = () => {
     }
   };
 
-  useEffect(() => {
+  const toggleLogoSelection = (logoId) => {
+    setSelectedLogos((selected) =>
+      selected.includes(logoId)
+        ? selected.filter((id) => id !== logoId)
+        : [...selected, logoId]
+    );
+  };
+
+  // El orden se cambia localmente y se guarda todo junto con un solo request
+  const moveLogo = (index, offset) => {
+    const target = index + offset;
+    if (target < 0 || target >= logos.length) return;
+
+    const reordered = [...logos];
+    [reordered[index], reordered[target]] = [reordered[target], reordered[index]];
+    setLogos(reordered);
+    setOrderChanged(true);
+  };
+
+  const handleSaveLogoOrder = async () => {
+    try {
+      setSavingLogos(true);
+      const response = await axios.patch(`${API}/logos/order`, {
+        ids: logos.map((logo) => logo.id)
+      });
+      if (response.data.success) {
+        toast.success('Orden de logos guardado');
+        fetchLogos();
+      }
+    } catch (error) {
+      console.error('Error al guardar el orden de logos:', error);
+      toast.error('Error al guardar el orden de los logos');
+    } finally {
+      setSavingLogos(false);
+    }
+  };
+
+  const handleDeleteSelectedLogos = async () => {
+    if (!window.confirm(`¿Seguro que quieres eliminar ${selectedLogos.length} logos?`)) {
+      return;
+    }
+
+    try {
+      setSavingLogos(true);
+      const response = await axios.post(`${API}/logos/batch-delete`, { ids: selectedLogos });
+      if (response.data.success) {
+        toast.success(`${response.data.eliminados} logos eliminados`);
+        fetchLogos();
+      }
+    } catch (error) {
+      console.error('Error al eliminar logos:', error);
+      toast.error('Error al eliminar los logos');
+    } finally {
+      setSavingLogos(false);
+    }
+  };
+
+  const refreshContactos = () => {
     fetchContactos();
+    fetchStats();
+  };
+
+  useEffect(() => {
+    refreshContactos();
     fetchLogos();
   }, []);
 
@@ -143,31 +293,16 @@ const AdminPanel = () => {
   };
 
   const exportToCSV = () => {
-    const headers = ['Fecha', 'Nombre', 'Email', 'Teléfono', 'Empresa', 'Tipo Empresa', 'Mensaje'];
-    const csvData = contactos.map(c => [
-      formatDate(c.created_at),
-      c.nombre,
-      c.email,
-      c.telefono,
-      c.empresa,
-      c.tipo_empresa,
-      c.mensaje || '-'
-    ]);
-    
-    const csvContent = [
-      headers.join(','),
-      ...csvData.map(row => row.map(cell => `"${cell}"`).join(','))
-    ].join('\n');
-    
-    const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+    // El servidor genera el archivo en streaming con todos los contactos
     const link = document.createElement('a');
-    link.href = URL.createObjectURL(blob);
-    link.download = `contactos_vastum_${new Date().toISOString().split('T')[0]}.csv`;
+    link.href = `${API}/contactos/export?format=csv&gzip=true`;
     link.click();
     
-    toast.success('CSV descargado exitosamente');
+    toast.success('Descarga del CSV iniciada');
   };
 
+  const visibleContactos = searchResults || contactos;
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-gray-50">
@@ -213,7 +348,7 @@ const AdminPanel = () => {
             <div className="flex gap-3">
               <Button
                 variant="outline"
-                onClick={fetchContactos}
+                onClick={refreshContactos}
                 disabled={refreshing}
                 className="border-cyan-600 text-cyan-600 hover:bg-cyan-50"
               >
@@ -222,7 +357,7 @@ const AdminPanel = () => {
               </Button>
               <Button
                 onClick={exportToCSV}
-                disabled={contactos.length === 0}
+                disabled={totalContactos === 0}
                 className="bg-cyan-600 hover:bg-cyan-700 text-white"
               >
                 <Download className="h-4 w-4 mr-2" />
@@ -239,7 +374,7 @@ const AdminPanel = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-600 mb-1">Total Contactos</p>
-                  <p className="text-3xl font-bold text-gray-900">{contactos.length}</p>
+                  <p className="text-3xl font-bold text-gray-900">{stats.total}</p>
                 </div>
                 <div className="w-12 h-12 bg-cyan-100 rounded-full flex items-center justify-center">
                   <Mail className="h-6 w-6 text-cyan-600" />
@@ -253,14 +388,7 @@ const AdminPanel = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-600 mb-1">Esta Semana</p>
-                  <p className="text-3xl font-bold text-gray-900">
-                    {contactos.filter(c => {
-                      const contactDate = new Date(c.created_at);
-                      const weekAgo = new Date();
-                      weekAgo.setDate(weekAgo.getDate() - 7);
-                      return contactDate > weekAgo;
-                    }).length}
-                  </p>
+                  <p className="text-3xl font-bold text-gray-900">{stats.semana}</p>
                 </div>
                 <div className="w-12 h-12 bg-green-100 rounded-full flex items-center justify-center">
                   <Calendar className="h-6 w-6 text-green-600" />
@@ -274,13 +402,7 @@ const AdminPanel = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-600 mb-1">Hoy</p>
-                  <p className="text-3xl font-bold text-gray-900">
-                    {contactos.filter(c => {
-                      const contactDate = new Date(c.created_at);
-                      const today = new Date();
-                      return contactDate.toDateString() === today.toDateString();
-                    }).length}
-                  </p>
+                  <p className="text-3xl font-bold text-gray-900">{stats.hoy}</p>
                 </div>
                 <div className="w-12 h-12 bg-blue-100 rounded-full flex items-center justify-center">
                   <Building2 className="h-6 w-6 text-blue-600" />
@@ -316,8 +438,31 @@ const AdminPanel = () => {
                   {uploadingLogo ? 'Subiendo...' : 'Cargar Nuevo Logo'}
                 </label>
                 <p className="text-sm text-gray-500">
-                  Los logos aparecerán en el slider de la landing page
+                  Los logos aparecerán en el slider de la landing page, en este orden
                 </p>
+                <div className="ml-auto flex items-center gap-2">
+                  {orderChanged && (
+                    <Button
+                      onClick={handleSaveLogoOrder}
+                      disabled={savingLogos}
+                      className="bg-cyan-600 hover:bg-cyan-700"
+                    >
+                      <Save className="h-4 w-4 mr-2" />
+                      Guardar orden
+                    </Button>
+                  )}
+                  {selectedLogos.length > 0 && (
+                    <Button
+                      variant="destructive"
+                      onClick={handleDeleteSelectedLogos}
+                      disabled={savingLogos}
+                      className="bg-red-600 hover:bg-red-700"
+                    >
+                      <Trash2 className="h-4 w-4 mr-2" />
+                      Eliminar seleccionados ({selectedLogos.length})
+                    </Button>
+                  )}
+                </div>
               </div>
             </CardContent>
           </Card>
@@ -332,12 +477,39 @@ const AdminPanel = () => {
             </Card>
           ) : (
             <div className="grid grid-cols-2 md:grid-cols-4 gap-4">
-              {logos.map((logo) => (
+              {logos.map((logo, index) => (
                 <Card key={logo.id} className="group relative hover:shadow-lg transition-shadow">
                   <CardContent className="p-4">
+                    <div className="flex items-center justify-between mb-2">
+                      <Checkbox
+                        checked={selectedLogos.includes(logo.id)}
+                        onCheckedChange={() => toggleLogoSelection(logo.id)}
+                        aria-label={`Seleccionar ${logo.nombre}`}
+                      />
+                      <div className="flex gap-1">
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={() => moveLogo(index, -1)}
+                          disabled={index === 0}
+                          aria-label="Mover antes"
+                        >
+                          <ArrowLeft className="h-3 w-3" />
+                        </Button>
+                        <Button
+                          variant="outline"
+                          size="sm"
+                          onClick={() => moveLogo(index, 1)}
+                          disabled={index === logos.length - 1}
+                          aria-label="Mover después"
+                        >
+                          <ArrowRight className="h-3 w-3" />
+                        </Button>
+                      </div>
+                    </div>
                     <div className="aspect-video bg-gray-50 rounded-lg mb-3 flex items-center justify-center overflow-hidden">
                       <img 
-                        src={logo.imagen_base64} 
+                        src={`${BACKEND_URL}${logo.variantes?.thumb || logo.imagen_url}`} 
                         alt={logo.nombre}
                         className="max-h-full max-w-full object-contain"
                       />
@@ -363,21 +535,41 @@ const AdminPanel = () => {
 
         {/* Lista de Contactos */}
         <div>
-          <h2 className="text-xl font-bold text-gray-900 mb-4">
-            Solicitudes Recibidas ({contactos.length})
-          </h2>
+          <div className="flex flex-col md:flex-row md:items-center md:justify-between gap-4 mb-4">
+            <h2 className="text-xl font-bold text-gray-900">
+              {searchResults
+                ? `Resultados de la búsqueda (${searchResults.length})`
+                : `Solicitudes Recibidas (${totalContactos})`}
+            </h2>
+            <div className="relative md:w-80">
+              <Search className={`h-4 w-4 absolute left-3 top-1/2 -translate-y-1/2 text-gray-400 ${searching ? 'animate-pulse' : ''}`} />
+              <Input
+                type="search"
+                value={searchQuery}
+                onChange={(event) => setSearchQuery(event.target.value)}
+                placeholder="Buscar por nombre, empresa, email..."
+                className="pl-9"
+              />
+            </div>
+          </div>
           
-          {contactos.length === 0 ? (
+          {visibleContactos.length === 0 ? (
             <Card>
               <CardContent className="p-12 text-center">
                 <Mail className="h-16 w-16 text-gray-300 mx-auto mb-4" />
-                <p className="text-gray-500 text-lg">No hay contactos registrados aún</p>
-                <p className="text-gray-400 text-sm mt-2">Los nuevos contactos aparecerán aquí</p>
+                {searchResults ? (
+                  <p className="text-gray-500 text-lg">No hay contactos que coincidan con la búsqueda</p>
+                ) : (
+                  <>
+                    <p className="text-gray-500 text-lg">No hay contactos registrados aún</p>
+                    <p className="text-gray-400 text-sm mt-2">Los nuevos contactos aparecerán aquí</p>
+                  </>
+                )}
               </CardContent>
             </Card>
           ) : (
             <div className="space-y-4">
-              {contactos.map((contacto) => (
+              {visibleContactos.map((contacto) => (
                 <Card key={contacto._id} className="hover:shadow-lg transition-shadow">
                   <CardHeader className="pb-3">
                     <div className="flex items-start justify-between">
@@ -431,6 +623,19 @@ const AdminPanel = () => {
                   </CardContent>
                 </Card>
               ))}
+              {nextCursor && !searchResults && (
+                <div className="flex justify-center pt-2">
+                  <Button
+                    variant="outline"
+                    onClick={fetchMoreContactos}
+                    disabled={loadingMore}
+                    className="border-cyan-600 text-cyan-600 hover:bg-cyan-50"
+                  >
+                    <RefreshCw className={`h-4 w-4 mr-2 ${loadingMore ? 'animate-spin' : ''}`} />
+                    {loadingMore ? 'Cargando...' : `Cargar más (${contactos.length} de ${totalContactos})`}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </div>
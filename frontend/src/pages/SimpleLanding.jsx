@@ -49,6 +49,7 @@ const SimpleLanding = () => {
   });
 
   const [logos, setLogos] = useState([]);
+  const [sprite, setSprite] = useState(null);
 
   useEffect(() => {
     fetchLogos();
@@ -56,6 +57,15 @@ const SimpleLanding = () => {
 
   const fetchLogos = async () => {
     try {
+      // Un sprite con todos los logos: un JSON chico y una sola imagen
+      const spriteResponse = await axios.get(`${API}/logos/sprite`);
+      if (spriteResponse.data.success && spriteResponse.data.sprite_url) {
+        setSprite(spriteResponse.data);
+        setLogos(spriteResponse.data.logos);
+        return;
+      }
+
+      // Mientras el sprite no esté generado se usan las imágenes individuales
       const response = await axios.get(`${API}/logos`);
       if (response.data.success) {
         setLogos(response.data.logos);
@@ -65,6 +75,41 @@ const SimpleLanding = () => {
     }
   };
 
+  const renderLogo = (logo, key) => {
+    if (sprite) {
+      const scale = sprite.scale;
+      return (
+        <div
+          key={key}
+          role="img"
+          aria-label={logo.nombre}
+          className="flex-shrink-0 bg-no-repeat"
+          style={{
+            width: logo.width / scale,
+            height: logo.height / scale,
+            backgroundImage: `url(${BACKEND_URL}${sprite.sprite_url})`,
+            backgroundSize: `${sprite.width / scale}px ${sprite.height / scale}px`,
+            backgroundPosition: `-${logo.x / scale}px -${logo.y / scale}px`
+          }}
+        />
+      );
+    }
+
+    return (
+      <picture key={key} className="flex-shrink-0">
+        {logo.variantes?.slider_avif && (
+          <source srcSet={`${BACKEND_URL}${logo.variantes.slider_avif}`} type="image/avif" />
+        )}
+        <img 
+          src={`${BACKEND_URL}${logo.imagen_url}`} 
+          alt={logo.nombre} 
+          loading="lazy"
+          className="h-16 w-auto object-contain" 
+        />
+      </picture>
+    );
+  };
+
   const handleInputChange = (e) => {
     const { name, value } = e.target;
     setFormData(prev => ({ ...prev, [name]: value }));
@@ -281,23 +326,9 @@ const SimpleLanding = () => {
                 <div className="bg-white rounded-xl p-6 shadow-lg">
                   <div className="overflow-hidden relative">
                     <div className="flex animate-scroll gap-12 items-center">
-                      {logos.map((logo) => (
-                        <img 
-                          key={logo.id} 
-                          src={logo.imagen_base64} 
-                          alt={logo.nombre} 
-                          className="h-16 w-auto object-contain flex-shrink-0" 
-                        />
-                      ))}
+                      {logos.map((logo) => renderLogo(logo, logo.id))}
                       {/* Duplicar para efecto infinito */}
-                      {logos.map((logo) => (
-                        <img 
-                          key={`${logo.id}-dup`} 
-                          src={logo.imagen_base64} 
-                          alt={logo.nombre} 
-                          className="h-16 w-auto object-contain flex-shrink-0" 
-                        />
-                      ))}
+                      {logos.map((logo) => renderLogo(logo, `${logo.id}-dup`))}
                     </div>
                   </div>
                 </div>